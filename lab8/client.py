@@ -1,5 +1,23 @@
+import argparse
+import csv
+import gzip
+import io
+import itertools
+import json
+import math
+import queue
+import re
+import statistics
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 import psycopg2
 from psycopg2 import Error
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extras import execute_values
 
 
 # Налаштування підключення до PostgreSQL
@@ -11,6 +29,12 @@ DB_CONFIG = {
     "password": "labpass",
 }
 
+# Скільки рядків серверний курсор передає клієнту за один мережевий обмін
+DEFAULT_ITERSIZE = 2000
+
+# Лічильник для унікальних імен серверних курсорів у межах підключення
+_cursor_seq = itertools.count(1)
+
 
 def get_connection():
     """
@@ -19,9 +43,52 @@ def get_connection():
     return psycopg2.connect(**DB_CONFIG)
 
 
-def init_db(conn):
+def ensure_index(conn, name, definition):
+    """
+    Створює індекс name з визначенням definition ("ON clients ..."), якщо
+    його немає або попередня спроба CREATE INDEX CONCURRENTLY залишила
+    його невалідним. Повертає True, якщо індекс було (пере)створено.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT i.indisvalid
+            FROM pg_class c
+            JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = %s;
+            """,
+            (name,),
+        )
+        row = cur.fetchone()
+    conn.rollback()
+    if row is not None and row[0]:
+        return False
+
+    # CONCURRENTLY не блокує запис у clients, але працює лише поза транзакцією
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            if row is not None:
+                cur.execute(f"DROP INDEX CONCURRENTLY {name};")
+            cur.execute(f"CREATE INDEX CONCURRENTLY {name} {definition};")
+    finally:
+        conn.autocommit = False
+    return True
+
+
+# Триграмні GIN-індекси для нечіткого пошуку (розширення pg_trgm)
+SEARCH_INDEXES = {
+    "clients_name_trgm_idx": "ON clients USING gin (name gin_trgm_ops)",
+    "clients_email_trgm_idx": "ON clients USING gin (email gin_trgm_ops)",
+}
+
+
+def init_db(conn, search_indexes=False):
     """
     На всяк випадок створює таблицю clients, якщо її ще немає.
+    search_indexes=True додатково вмикає pg_trgm і створює
+    GIN-індекси для пошуку за name та email.
+    Повертає True, якщо все потрібне створено (або вже існувало).
     """
     try:
         with conn.cursor() as cur:
@@ -40,6 +107,22 @@ def init_db(conn):
     except Error as e:
         print("Помилка ініціалізації таблиці clients:", e)
         conn.rollback()
+        return False
+
+    if not search_indexes:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        conn.commit()
+        for name, definition in SEARCH_INDEXES.items():
+            if ensure_index(conn, name, definition):
+                print(f"Створено індекс {name}.")
+    except Error as e:
+        print("Помилка створення індексів для пошуку:", e)
+        conn.rollback()
+        return False
+    return True
 
 
 def list_tables(conn):
@@ -118,34 +201,102 @@ def show_table_structure(conn):
 def select_all_clients(conn):
     """
     SELECT: Вивести всі записи з таблиці clients.
+    Рядки читаються серверним курсором пакетами (див. print_streamed),
+    тож пам'ять клієнта не залежить від розміру таблиці.
     """
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, name, email, age, created_at
-                FROM clients
-                ORDER BY id;
-                """
-            )
-            rows = cur.fetchall()
+    printed = print_streamed(
+        conn,
+        """
+        SELECT id, name, email, age, created_at
+        FROM clients
+        ORDER BY id
+        """,
+        format_row=_format_client_row,
+        header="\nКлієнти:\n" + CLIENTS_HEADER,
+    )
+    if printed == 0:
+        print("Таблиця clients порожня.")
 
-        if not rows:
-            print("Таблиця clients порожня.")
-            return
 
-        print("\nКлієнти:")
-        print(f"{'id':4} {'name':20} {'email':25} {'age':5} {'created_at'}")
-        print("-" * 80)
-        for row in rows:
-            cid, name, email, age, created_at = row
-            print(
-                f"{cid:<4} {name:20} {email:25} {str(age):5} {created_at}"
-            )
+# ----------- Prepared statements -----------
+
+class PreparedRegistry:
+    """
+    Реєстр серверних prepared statements одного підключення.
+
+    Кожна унікальна форма SQL (з параметрами $1, $2, ...) проходить
+    PREPARE лише один раз за сесію, далі виконується через EXECUTE —
+    сервер не розбирає і не планує запит повторно.
+    """
+
+    def __init__(self):
+        self._names = {}
+
+    def execute(self, cur, sql, params=()):
+        name = self._names.get(sql)
+        if name is None:
+            name = f"lab8_stmt_{len(self._names) + 1}"
+            cur.execute(f"PREPARE {name} AS {sql}")
+            self._names[sql] = name
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cur.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    def __len__(self):
+        return len(self._names)
+
+
+_registries = weakref.WeakKeyDictionary()
 
-    except Error as e:
-        print("Помилка при виконанні SELECT:")
-        print(e)
+
+def get_prepared(conn):
+    """Повертає (створює за потреби) реєстр prepared statements підключення."""
+    registry = _registries.get(conn)
+    if registry is None:
+        registry = _registries[conn] = PreparedRegistry()
+    return registry
+
+
+INSERT_CLIENT_SQL = (
+    "INSERT INTO clients (name, email, age) VALUES ($1, $2, $3) RETURNING id"
+)
+DELETE_CLIENT_SQL = "DELETE FROM clients WHERE id = $1"
+
+# Колонки, які дозволено змінювати через update_client_row
+UPDATABLE_COLUMNS = ("name", "email", "age")
+
+
+def insert_client_row(cur, name, email, age):
+    """INSERT одного клієнта через prepared statement. Повертає новий id."""
+    get_prepared(cur.connection).execute(cur, INSERT_CLIENT_SQL,
+                                         (name, email, age))
+    return cur.fetchone()[0]
+
+
+def update_client_row(cur, client_id, changes):
+    """
+    UPDATE клієнта через prepared statement.
+    changes — словник {колонка: значення}; для кожного набору колонок
+    готується окрема форма запиту. Повертає кількість змінених рядків.
+    """
+    columns = [col for col in UPDATABLE_COLUMNS if col in changes]
+    if not columns or len(columns) != len(changes):
+        raise ValueError("Некоректний набір полів для оновлення.")
+    assignments = ", ".join(
+        f"{col} = ${n}" for n, col in enumerate(columns, 1)
+    )
+    sql = f"UPDATE clients SET {assignments} WHERE id = ${len(columns) + 1}"
+    params = [changes[col] for col in columns] + [client_id]
+    get_prepared(cur.connection).execute(cur, sql, params)
+    return cur.rowcount
+
+
+def delete_client_row(cur, client_id):
+    """DELETE клієнта через prepared statement. Повертає кількість рядків."""
+    get_prepared(cur.connection).execute(cur, DELETE_CLIENT_SQL, (client_id,))
+    return cur.rowcount
 
 
 def insert_client(conn):
@@ -169,15 +320,7 @@ def insert_client(conn):
 
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO clients (name, email, age)
-                VALUES (%s, %s, %s)
-                RETURNING id;
-                """,
-                (name, email, age),
-            )
-            new_id = cur.fetchone()[0]
+            new_id = insert_client_row(cur, name, email, age)
         conn.commit()
         print(f"Клієнта додано з id = {new_id}")
     except Error as e:
@@ -200,31 +343,24 @@ def update_client(conn):
     new_email = input("Новий email (порожньо = не змінювати): ").strip()
     new_age_str = input("Новий вік (порожньо = не змінювати): ").strip()
 
-    fields = []
-    params = []
+    changes = {}
 
     if new_email:
-        fields.append("email = %s")
-        params.append(new_email)
+        changes["email"] = new_email
 
     if new_age_str:
         if not new_age_str.isdigit():
             print("Вік має бути цілим числом.")
             return
-        fields.append("age = %s")
-        params.append(int(new_age_str))
+        changes["age"] = int(new_age_str)
 
-    if not fields:
+    if not changes:
         print("Немає полів для оновлення.")
         return
 
-    params.append(client_id)
-    query = "UPDATE clients SET " + ", ".join(fields) + " WHERE id = %s;"
-
     try:
         with conn.cursor() as cur:
-            cur.execute(query, tuple(params))
-            affected = cur.rowcount
+            affected = update_client_row(cur, client_id, changes)
         conn.commit()
 
         if affected == 0:
@@ -251,11 +387,7 @@ def delete_client(conn):
 
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM clients WHERE id = %s;",
-                (client_id,),
-            )
-            affected = cur.rowcount
+            affected = delete_client_row(cur, client_id)
         conn.commit()
 
         if affected == 0:
@@ -270,6 +402,230 @@ def delete_client(conn):
         conn.rollback()
 
 
+# ----------- Інструментування запитів -----------
+
+# Нормалізація SQL до "відбитка": літерали та числа замінюються на ?,
+# списки IN (...) згортаються, пробіли стискаються
+_FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint_sql(query):
+    """Відбиток запиту: однакові за формою запити з різними значеннями
+    мають однаковий відбиток."""
+    text = query.strip().rstrip(";").lower()
+    for pattern, replacement in _FINGERPRINT_RULES:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def _percentile(sorted_values, p):
+    """Перцентиль методом найближчого рангу для відсортованого списку."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _format_plan(node, depth=0):
+    """Стисле текстове дерево плану з EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)."""
+    relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+    hit = node.get("Shared Hit Blocks", 0)
+    read = node.get("Shared Read Blocks", 0)
+    lines = [
+        f"{'  ' * depth}-> {node['Node Type']}{relation} "
+        f"(time={node.get('Actual Total Time', 0):.3f} мс "
+        f"rows={node.get('Actual Rows', 0)} loops={node.get('Actual Loops', 0)} "
+        f"buffers hit={hit} read={read})"
+    ]
+    for child in node.get("Plans", []):
+        lines.extend(_format_plan(child, depth + 1))
+    return lines
+
+
+class QueryProfiler:
+    """
+    Інструментування run_custom_query: час кожного запиту по фазах,
+    план і серверний час з EXPLAIN ANALYZE, журнал повільних запитів і
+    перцентилі p50/p95/p99 за відбитками.
+
+    INSERT / UPDATE / DELETE виконуються саме під EXPLAIN ANALYZE (один
+    раз, потім COMMIT), тож серверний час належить тому самому прогону,
+    що й виміряний час. SELECT виводиться звичайним потоковим запитом, а
+    план збирається окремим прогоном уже після нього — ці числа
+    стосуються окремого прогону й від часу основного не віднімаються.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.collect_plans = False
+        self.slow_ms = None
+        self.slow_log = "slow_queries.log"
+        self.rtt_ms = None
+        self.samples = {}
+
+    def measure_rtt(self, conn, probes=5):
+        """Оцінка мережевої затримки як медіани кількох SELECT 1."""
+        timings = []
+        with conn.cursor() as cur:
+            for _ in range(probes):
+                started = time.perf_counter()
+                cur.execute("SELECT 1;")
+                cur.fetchone()
+                timings.append((time.perf_counter() - started) * 1000)
+        conn.rollback()
+        self.rtt_ms = statistics.median(timings)
+        return self.rtt_ms
+
+    @staticmethod
+    def _explain_analyze(cur, query):
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query)
+        plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]
+
+    def execute_analyzed(self, cur, query):
+        """
+        Виконує INSERT / UPDATE / DELETE під EXPLAIN (ANALYZE, BUFFERS):
+        оператор виконується один раз, його зміни залишаються в
+        транзакції (фіксує викликач). Повертає (корінь JSON-плану,
+        кількість оброблених рядків за планом).
+        """
+        plan = self._explain_analyze(cur, query)
+        # вузол ModifyTable не повідомляє кількість змінених рядків —
+        # її дає вузол, що постачає йому рядки
+        source = (plan["Plan"].get("Plans") or [plan["Plan"]])[0]
+        rows = source.get("Actual Rows", 0) * source.get("Actual Loops", 1)
+        return plan, rows
+
+    def collect_plan(self, cur, query):
+        """
+        Окремий профілюючий прогін SELECT під EXPLAIN (ANALYZE, BUFFERS),
+        відкочений до SAVEPOINT. Викликається після основного виконання,
+        щоб не прогрівати для нього кеш. Повертає корінь JSON-плану.
+        """
+        cur.execute("SAVEPOINT query_profiler;")
+        try:
+            return self._explain_analyze(cur, query)
+        finally:
+            cur.execute("ROLLBACK TO SAVEPOINT query_profiler;")
+            cur.execute("RELEASE SAVEPOINT query_profiler;")
+
+    def record(self, query, phases, rows, plan=None, same_run=False):
+        """
+        Запам'ятовує вимір, друкує розбивку часу та, якщо запит
+        повільніший за поріг, дописує його в журнал повільних запитів.
+        phases — {фаза: секунди} для виконання, отримання рядків і commit.
+        same_run=True — plan зібрано з того самого виконання, тож час
+        фази "виконання" можна розкласти на серверний і мережевий.
+        """
+        total_ms = sum(phases.values()) * 1000
+        key = fingerprint_sql(query)
+        self.samples.setdefault(key, []).append(total_ms)
+
+        parts = ", ".join(f"{name} {sec * 1000:.2f}" for name, sec in phases.items())
+        print(f"Час: всього {total_ms:.2f} мс ({parts})")
+
+        server = None
+        if plan is not None:
+            server = {
+                "planning_ms": plan.get("Planning Time", 0.0),
+                "execution_ms": plan.get("Execution Time", 0.0),
+                "separate_run": not same_run,
+            }
+            if same_run:
+                other = phases.get("виконання", 0) * 1000 \
+                    - server["planning_ms"] - server["execution_ms"]
+                print(f"Сервер: планування {server['planning_ms']:.2f} мс, "
+                      f"виконання {server['execution_ms']:.2f} мс; "
+                      f"мережа та драйвер ≈ {max(other, 0):.2f} мс")
+            else:
+                print(f"Окремий профілюючий прогін (EXPLAIN ANALYZE): планування "
+                      f"{server['planning_ms']:.2f} мс, виконання "
+                      f"{server['execution_ms']:.2f} мс")
+            print("\n".join(_format_plan(plan["Plan"])))
+        elif self.rtt_ms is not None:
+            print(f"Мережевий RTT ≈ {self.rtt_ms:.2f} мс")
+
+        if self.slow_ms is not None and total_ms >= self.slow_ms:
+            entry = {
+                "ts": datetime.now().isoformat(timespec="seconds"),
+                "total_ms": round(total_ms, 3),
+                "phases_ms": {k: round(v * 1000, 3) for k, v in phases.items()},
+                "server": server,
+                "rows": rows,
+                "fingerprint": key,
+                "query": query,
+                "plan": plan,
+            }
+            try:
+                with open(self.slow_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                print(f"Повільний запит записано в {self.slow_log}")
+            except OSError as e:
+                print("Не вдалося записати журнал повільних запитів:", e)
+
+    def report(self):
+        """Друкує p50/p95/p99 за відбитками запитів."""
+        if not self.samples:
+            return
+        print("\nСтатистика запитів (мс):")
+        print(f"{'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  запит")
+        print("-" * 80)
+        for key, values in sorted(self.samples.items(),
+                                  key=lambda item: -sum(item[1])):
+            values = sorted(values)
+            short = key if len(key) <= 40 else key[:37] + "..."
+            print(f"{len(values):6} {_percentile(values, 50):9.2f} "
+                  f"{_percentile(values, 95):9.2f} {_percentile(values, 99):9.2f} "
+                  f"{values[-1]:9.2f}  {short}")
+
+
+# Один профайлер на сесію клієнта
+PROFILER = QueryProfiler()
+
+
+def configure_profiling(conn):
+    """
+    Увімкнення / налаштування інструментування run_custom_query.
+    """
+    answer = input("Інструментування запитів (т/н): ").strip().lower()
+    PROFILER.enabled = answer in ("т", "y", "так", "yes", "1")
+    if not PROFILER.enabled:
+        print("Інструментування вимкнено.")
+        return
+
+    answer = input(
+        "Збирати EXPLAIN (ANALYZE, BUFFERS)? Зміни виконуються під ним один "
+        "раз, SELECT профілюється окремим прогоном (т/н): "
+    ).strip().lower()
+    PROFILER.collect_plans = answer in ("т", "y", "так", "yes", "1")
+
+    try:
+        PROFILER.slow_ms = _ask_int(
+            "Поріг повільного запиту, мс (порожньо = без журналу): "
+        )
+    except ValueError as e:
+        print(e)
+        PROFILER.slow_ms = None
+    if PROFILER.slow_ms is not None:
+        path = input(f"Файл журналу [{PROFILER.slow_log}]: ").strip()
+        PROFILER.slow_log = path or PROFILER.slow_log
+
+    try:
+        rtt = PROFILER.measure_rtt(conn)
+        print(f"Мережевий RTT до сервера ≈ {rtt:.2f} мс")
+    except Error as e:
+        print("Не вдалося виміряти RTT:", e)
+        conn.rollback()
+    print("Інструментування увімкнено.")
+
+
 def run_custom_query(conn):
     """
     Виконання довільного SQL‑запиту від користувача
@@ -290,17 +646,28 @@ def run_custom_query(conn):
 
     try:
         with conn.cursor() as cur:
-            cur.execute(query)
-
+            analyze = PROFILER.enabled and PROFILER.collect_plans
+            plan = None
             if first_word == "select":
-                rows = cur.fetchall()
-                print(f"Отримано рядків: {len(rows)}")
-                for row in rows:
-                    print(row)
+                count, phases = _print_query_stream(conn, query)
+                if analyze:
+                    plan = PROFILER.collect_plan(cur, query)
             else:
-                affected = cur.rowcount
+                started = time.perf_counter()
+                if analyze:
+                    plan, count = PROFILER.execute_analyzed(cur, query)
+                else:
+                    cur.execute(query)
+                    count = cur.rowcount
+                phases = {"виконання": time.perf_counter() - started}
+                started = time.perf_counter()
                 conn.commit()
-                print(f"Запит виконано, змінено рядків: {affected}")
+                phases["commit"] = time.perf_counter() - started
+                print(f"Запит виконано, змінено рядків: {count}")
+
+            if PROFILER.enabled:
+                PROFILER.record(query, phases, count, plan,
+                                same_run=first_word != "select")
 
     except Error as e:
         print("Помилка при виконанні запиту!")
@@ -309,22 +676,1775 @@ def run_custom_query(conn):
         conn.rollback()
 
 
-def print_menu():
+def _print_query_stream(conn, query):
     """
-    Вивід меню на екран.
+    Друкує результат SELECT пакетами через серверний курсор.
+    Повертає (кількість рядків, {фаза: секунди}): "виконання" — до
+    першого пакета, "отримання" — решта пакетів (без часу друку).
+    Ctrl+C перериває вивід.
     """
-    print("\n=== Меню клієнта БД ===")
-    print("1. Показати список таблиць")
-    print("2. Показати структуру таблиці")
-    print("3. Показати всі клієнти (SELECT)")
-    print("4. Додати клієнта (INSERT)")
-    print("5. Оновити клієнта (UPDATE)")
-    print("6. Видалити клієнта (DELETE)")
-    print("7. Виконати довільний SQL-запит")
-    print("0. Вихід")
+    phases = {"виконання": 0.0, "отримання": 0.0}
+    count = 0
+    batches = iter_query_batches(conn, query)
+    phase = "виконання"
+    try:
+        while True:
+            started = time.perf_counter()
+            batch = next(batches, None)
+            phases[phase] += time.perf_counter() - started
+            phase = "отримання"
+            if batch is None:
+                break
+            for row in batch:
+                print(row)
+            count += len(batch)
+    except KeyboardInterrupt:
+        batches.close()
+        print(f"\nВивід перервано користувачем після {count} рядків.")
+        return count, phases
+    print(f"Отримано рядків: {count}")
+    return count, phases
+
+
+def _ask_int(prompt, default=None):
+    """
+    Зчитує необов'язкове невід'ємне ціле число.
+    Порожній ввід -> default, некоректний ввід -> ValueError.
+    """
+    value = input(prompt).strip()
+    if not value:
+        return default
+    if not value.isdigit():
+        raise ValueError("Значення має бути цілим невід'ємним числом.")
+    return int(value)
+
+
+def _validate_select(query):
+    """
+    Нормалізує SELECT-запит для вкладення у COPY (...) / DECLARE.
+    Повертає запит без завершальної ';' або кидає ValueError.
+    """
+    query = query.strip().rstrip(";").strip()
+    if not query:
+        raise ValueError("Запит порожній.")
+    if query.split()[0].lower() != "select":
+        raise ValueError("Дозволені лише запити SELECT.")
+    return query
+
+
+def iter_query_batches(conn, query, params=None,
+                       itersize=DEFAULT_ITERSIZE, limit=None):
+    """
+    Генератор пакетів рядків через іменований (серверний) курсор.
+
+    Результат залишається на сервері, клієнт одночасно тримає в пам'яті
+    не більше itersize рядків. limit обмежує загальну кількість рядків.
+    Після завершення (або переривання) курсор закривається. Якщо курсор
+    відкрив нову транзакцію, вона відкочується; якщо на підключенні вже
+    була відкрита транзакція, курсор живе в SAVEPOINT і відкочується лише
+    він — незафіксовані зміни інших операцій не втрачаються.
+    """
+    savepoint = None
+    if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        savepoint = f"stream_sp_{next(_cursor_seq)}"
+        with conn.cursor() as sp:
+            sp.execute(f"SAVEPOINT {savepoint};")
+    cur = conn.cursor(name=f"stream_cur_{next(_cursor_seq)}")
+    cur.itersize = itersize
+    fetched = 0
+    try:
+        cur.execute(query, params)
+        while limit is None or fetched < limit:
+            size = itersize if limit is None else min(itersize, limit - fetched)
+            batch = cur.fetchmany(size)
+            if not batch:
+                break
+            fetched += len(batch)
+            yield batch
+    finally:
+        try:
+            cur.close()
+        except Error:
+            pass
+        if savepoint is None:
+            conn.rollback()
+        else:
+            with conn.cursor() as sp:
+                sp.execute(f"ROLLBACK TO SAVEPOINT {savepoint};")
+                sp.execute(f"RELEASE SAVEPOINT {savepoint};")
+
+
+# Заголовок таблиці для виводу рядків (id, name, email, age, created_at)
+CLIENTS_HEADER = (
+    f"{'id':4} {'name':20} {'email':25} {'age':5} {'created_at'}\n" + "-" * 80
+)
+
+
+def print_streamed(conn, query, params=None, itersize=DEFAULT_ITERSIZE,
+                   limit=None, format_row=str, header=None):
+    """
+    Друкує результат запиту по мірі надходження пакетів; header (якщо
+    задано) друкується перед першим рядком.
+    Ctrl+C перериває вивід, курсор на сервері при цьому закривається.
+    """
+    printed = 0
+    batches = iter_query_batches(conn, query, params, itersize, limit)
+    try:
+        for batch in batches:
+            if header is not None and printed == 0:
+                print(header)
+            for row in batch:
+                print(format_row(row))
+            printed += len(batch)
+    except KeyboardInterrupt:
+        batches.close()
+        print(f"\nВивід перервано користувачем після {printed} рядків.")
+        return printed
+    except Error as e:
+        print("Помилка при потоковому виконанні запиту!")
+        print("Код помилки:", e.pgcode)
+        print("Текст помилки:", e.pgerror)
+        return printed
+
+    print(f"Отримано рядків: {printed}")
+    return printed
+
+
+def _format_client_row(row):
+    cid, name, email, age, created_at = row
+    return f"{cid:<4} {name:20} {email:25} {str(age):5} {created_at}"
+
+
+def _ask_stream_options():
+    """
+    Запитує розмір пакета та ліміт рядків для потокового режиму.
+    Повертає (itersize, limit) або None при некоректному вводі.
+    """
+    try:
+        itersize = _ask_int(
+            f"Розмір пакета (порожньо = {DEFAULT_ITERSIZE}): ",
+            DEFAULT_ITERSIZE,
+        )
+        limit = _ask_int("Максимум рядків (порожньо = без обмежень): ")
+    except ValueError as e:
+        print(e)
+        return None
+    if itersize == 0:
+        print("Розмір пакета має бути більшим за 0.")
+        return None
+    return itersize, limit
+
+
+def stream_all_clients(conn):
+    """
+    SELECT у потоковому режимі: клієнти виводяться пакетами
+    через серверний курсор, пам'ять клієнта не залежить від розміру таблиці.
+    """
+    options = _ask_stream_options()
+    if options is None:
+        return
+    itersize, limit = options
+
+    print("\nКлієнти (Ctrl+C — перервати):")
+    print(CLIENTS_HEADER)
+    print_streamed(
+        conn,
+        """
+        SELECT id, name, email, age, created_at
+        FROM clients
+        ORDER BY id
+        """,
+        itersize=itersize,
+        limit=limit,
+        format_row=_format_client_row,
+    )
+
+
+def stream_custom_query(conn):
+    """
+    Довільний SELECT у потоковому режимі (серверний курсор).
+    """
+    try:
+        query = _validate_select(input("Введіть SELECT-запит: "))
+    except ValueError as e:
+        print(e)
+        return
+
+    options = _ask_stream_options()
+    if options is None:
+        return
+    itersize, limit = options
+
+    print("(Ctrl+C — перервати)")
+    print_streamed(conn, query, itersize=itersize, limit=limit)
+
+
+# ----------- Посторінковий перегляд (keyset pagination) -----------
+
+DEFAULT_PAGE_SIZE = 20
+
+# Порядок перегляду -> колонки ключа сторінки (останньою завжди йде id,
+# щоб ключ був унікальним)
+BROWSE_ORDERS = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+}
+
+CREATED_AT_INDEX = "clients_created_at_id_idx"
+
+
+def ensure_created_at_index(conn):
+    """
+    Створює індекс (created_at, id) для keyset-пагінації, якщо його немає.
+    Повертає True, якщо індекс було (пере)створено.
+    """
+    return ensure_index(conn, CREATED_AT_INDEX, "ON clients (created_at, id)")
+
+
+def _page_key(row, order):
+    """Ключ keyset-пагінації для рядка (id, name, email, age, created_at)."""
+    if order == "created_at":
+        return (row[4], row[0])
+    return (row[0],)
+
+
+def _keyset_ranges(order, after=None, before=None, start=None):
+    """
+    Умови WHERE (з параметрами) для сторінки в порядку order та напрям.
+
+    Для created_at порожні значення йдуть у кінці (NULLS LAST), а
+    порівняння рядків з NULL нічого не повертає, тому сторінка може
+    складатися з двох діапазонів індексу: заповнені created_at і
+    "хвіст" з NULL, упорядкований за id. Діапазони читаються по черзі.
+    """
+    if order == "id":
+        if after is not None:
+            return [("WHERE id > %s", after)], True
+        if before is not None:
+            return [("WHERE id < %s", before)], False
+        if start is not None:
+            return [("WHERE id >= %s", start)], True
+        return [("", ())], True
+
+    if after is not None or start is not None:
+        created_at, client_id = after if after is not None else start
+        op = ">" if after is not None else ">="
+        if created_at is None:
+            return [(f"WHERE created_at IS NULL AND id {op} %s", (client_id,))], True
+        return [
+            (f"WHERE (created_at, id) {op} (%s, %s)", (created_at, client_id)),
+            ("WHERE created_at IS NULL", ()),
+        ], True
+    if before is not None:
+        created_at, client_id = before
+        if created_at is None:
+            return [
+                ("WHERE created_at IS NULL AND id < %s", (client_id,)),
+                ("WHERE created_at IS NOT NULL", ()),
+            ], False
+        return [("WHERE (created_at, id) < (%s, %s)", (created_at, client_id))], False
+    return [("", ())], True
+
+
+def fetch_clients_page(conn, order="id", after=None, before=None, start=None,
+                       page_size=DEFAULT_PAGE_SIZE):
+    """
+    Одна сторінка клієнтів методом keyset (без OFFSET).
+
+    after  -> рядки строго після ключа (наступна сторінка);
+    before -> рядки строго перед ключем (попередня сторінка);
+    start  -> рядки, починаючи з ключа включно (перехід до id).
+    Кожна сторінка — це діапазонне сканування індексу від ключа,
+    тому її вартість не залежить від того, наскільки глибоко ми зайшли.
+    Клієнти без created_at ідуть у кінці (упорядковані за id).
+    """
+    ranges, ascending = _keyset_ranges(order, after, before, start)
+    if order == "id":
+        order_by = "id" if ascending else "id DESC"
+    else:
+        order_by = ("created_at NULLS LAST, id" if ascending
+                    else "created_at DESC NULLS FIRST, id DESC")
+
+    rows = []
+    with conn.cursor() as cur:
+        for where, key in ranges:
+            cur.execute(
+                f"""
+                SELECT id, name, email, age, created_at
+                FROM clients
+                {where}
+                ORDER BY {order_by}
+                LIMIT %s;
+                """,
+                tuple(key) + (page_size - len(rows),),
+            )
+            rows.extend(cur.fetchall())
+            if len(rows) >= page_size:
+                break
+    conn.rollback()
+
+    if not ascending:
+        rows.reverse()
+    return rows
+
+
+def _jump_key(conn, order, client_id):
+    """
+    Ключ сторінки, що починається з клієнта client_id (або None, якщо
+    такого клієнта немає). Порожній created_at — теж коректний ключ.
+    """
+    if order == "id":
+        return (client_id,)
+    with conn.cursor() as cur:
+        cur.execute("SELECT created_at FROM clients WHERE id = %s;", (client_id,))
+        row = cur.fetchone()
+    conn.rollback()
+    return (row[0], client_id) if row else None
+
+
+def browse_clients(conn):
+    """
+    Посторінковий перегляд clients: наступна / попередня сторінка,
+    перехід до id, сортування за id або created_at.
+    """
+    order = "created_at" if input(
+        "Сортувати за: 1 - id, 2 - created_at [1/2]: "
+    ).strip() == "2" else "id"
+    try:
+        page_size = _ask_int(
+            f"Рядків на сторінці (порожньо = {DEFAULT_PAGE_SIZE}): ",
+            DEFAULT_PAGE_SIZE,
+        )
+    except ValueError as e:
+        print(e)
+        return
+    if page_size == 0:
+        print("Розмір сторінки має бути більшим за 0.")
+        return
+
+    try:
+        if order == "created_at" and ensure_created_at_index(conn):
+            print(f"Створено індекс {CREATED_AT_INDEX} (created_at, id).")
+        rows = fetch_clients_page(conn, order, page_size=page_size)
+    except Error as e:
+        print("Помилка при отриманні сторінки:")
+        print(e)
+        conn.rollback()
+        return
+
+    page_no = 1
+    while True:
+        if not rows:
+            print("Таблиця clients порожня.")
+            return
+
+        label = f"Сторінка {page_no}" if page_no else "Сторінка"
+        print(f"\n{label} (сортування за {order}):")
+        print(f"{'id':4} {'name':20} {'email':25} {'age':5} {'created_at'}")
+        print("-" * 80)
+        for row in rows:
+            print(_format_client_row(row))
+
+        command = input(
+            "[n] наступна, [p] попередня, [j ID] перейти до id, [q] вихід: "
+        ).strip().lower()
+
+        try:
+            if command in ("n", ""):
+                page = fetch_clients_page(
+                    conn, order, after=_page_key(rows[-1], order),
+                    page_size=page_size,
+                )
+                if not page:
+                    print("Це остання сторінка.")
+                    continue
+                rows, page_no = page, page_no and page_no + 1
+            elif command == "p":
+                page = fetch_clients_page(
+                    conn, order, before=_page_key(rows[0], order),
+                    page_size=page_size,
+                )
+                if not page:
+                    print("Це перша сторінка.")
+                    continue
+                rows, page_no = page, page_no and max(1, page_no - 1)
+            elif command.startswith("j"):
+                id_str = command[1:].strip()
+                if not id_str.isdigit():
+                    print("ID має бути цілим числом.")
+                    continue
+                key = _jump_key(conn, order, int(id_str))
+                if key is None:
+                    print("Клієнта з таким ID не знайдено.")
+                    continue
+                page = fetch_clients_page(conn, order, start=key,
+                                          page_size=page_size)
+                if not page:
+                    print("Клієнта з таким ID не знайдено.")
+                    continue
+                # після переходу номер сторінки невідомий без підрахунку
+                rows, page_no = page, None
+            elif command == "q":
+                return
+            else:
+                print("Невідома команда.")
+        except Error as e:
+            print("Помилка при отриманні сторінки:")
+            print(e)
+            conn.rollback()
+
+
+# ----------- Нечіткий пошук клієнтів (pg_trgm) -----------
+
+DEFAULT_SEARCH_LIMIT = 20
+DEFAULT_SIMILARITY = 0.3
+
+# Підключення, для яких індекси пошуку вже перевірено
+_search_ready = weakref.WeakSet()
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_clients_by_text(conn, term, limit=DEFAULT_SEARCH_LIMIT,
+                           min_similarity=DEFAULT_SIMILARITY):
+    """
+    Нечіткий пошук за name та email з ранжуванням за триграмною схожістю.
+
+    Умови `%` (схожість) та ILIKE '%term%' (підрядок) обслуговуються
+    GIN-індексами gin_trgm_ops, тож таблиця не сканується повністю.
+    Індекси створюються через init_db при першому пошуку в сесії.
+    Повертає список (id, name, email, age, created_at, score).
+    """
+    if conn not in _search_ready and init_db(conn, search_indexes=True):
+        _search_ready.add(conn)
+
+    pattern = f"%{_escape_like(term)}%"
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL pg_trgm.similarity_threshold = %s;",
+                        (min_similarity,))
+            cur.execute(
+                """
+                SELECT id, name, email, age, created_at,
+                       greatest(similarity(name, %(term)s),
+                                similarity(email, %(term)s)) AS score
+                FROM clients
+                WHERE name %% %(term)s
+                   OR email %% %(term)s
+                   OR name ILIKE %(pattern)s
+                   OR email ILIKE %(pattern)s
+                ORDER BY score DESC, id
+                LIMIT %(limit)s;
+                """,
+                {"term": term, "pattern": pattern, "limit": limit},
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.rollback()
+    return rows
+
+
+def search_clients(conn):
+    """
+    Пошук клієнтів за частиною імені або email (з урахуванням помилок).
+    """
+    term = input("Що шукати (ім'я або email): ").strip()
+    if not term:
+        print("Рядок пошуку порожній.")
+        return
+    try:
+        limit = _ask_int(
+            f"Максимум результатів (порожньо = {DEFAULT_SEARCH_LIMIT}): ",
+            DEFAULT_SEARCH_LIMIT,
+        )
+    except ValueError as e:
+        print(e)
+        return
+
+    started = time.perf_counter()
+    try:
+        rows = search_clients_by_text(conn, term, limit)
+    except Error as e:
+        print("Помилка при пошуку:")
+        print("Код помилки:", e.pgcode)
+        print("Текст помилки:", e.pgerror)
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if not rows:
+        print(f"Нічого не знайдено ({elapsed_ms:.1f} мс).")
+        return
+
+    print(f"\nЗнайдено {len(rows)} ({elapsed_ms:.1f} мс):")
+    print(f"{'id':4} {'name':20} {'email':25} {'age':5} {'score':>6}")
+    print("-" * 66)
+    for cid, name, email, age, _created_at, score in rows:
+        print(f"{cid:<4} {name:20} {email:25} {str(age):5} {score:6.3f}")
+
+
+# ----------- Масовий імпорт через COPY -----------
+
+IMPORT_COLUMNS = ("name", "email", "age")
+
+# Як часто (у секундах) друкувати прогрес довгих операцій
+PROGRESS_INTERVAL = 1.0
+
+
+class _CopyProgress:
+    """
+    Обгортка над файлом для copy_expert: рахує рядки, що пройшли
+    через COPY (в обидва боки), і періодично друкує швидкість у рядках/с.
+    """
+
+    def __init__(self, f, label="Завантажено", stream=None):
+        self.f = f
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.lines = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def _count(self, chunk):
+        self.lines += chunk.count("\n" if isinstance(chunk, str) else b"\n")
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            rate = self.lines / (now - self.started)
+            print(f"\r{self.label}: {self.lines} рядків ({rate:,.0f} рядків/с)",
+                  end="", flush=True, file=self.stream)
+
+    def read(self, size=-1):
+        chunk = self.f.read(size)
+        self._count(chunk)
+        return chunk
+
+    def write(self, data):
+        self._count(data)
+        return self.f.write(data)
+
+
+class _JsonlAsCsv:
+    """
+    Перетворює потік JSONL (один об'єкт на рядок) на CSV для COPY.
+    У пам'яті одночасно лише один порційний буфер.
+    """
+
+    def __init__(self, f, columns=IMPORT_COLUMNS):
+        self.f = f
+        self.columns = columns
+        self.line_no = 0
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf, lineterminator="\n")
+
+    def read(self, size=-1):
+        target = size if size and size > 0 else 64 * 1024
+        while self._buf.tell() < target:
+            line = self.f.readline()
+            if not line:
+                break
+            self.line_no += 1
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Рядок {self.line_no}: некоректний JSON ({e})")
+            if not isinstance(obj, dict):
+                raise ValueError(f"Рядок {self.line_no}: очікується JSON-об'єкт")
+            self._writer.writerow(
+                ["" if obj.get(col) is None else obj.get(col)
+                 for col in self.columns]
+            )
+        data = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+
+def _detect_import_format(path):
+    lower = path.lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def bulk_import_clients(conn, path, fmt=None, on_conflict="report",
+                        report_limit=10):
+    """
+    Масовий імпорт клієнтів з CSV або JSONL через COPY ... FROM STDIN.
+
+    Дані спершу потрапляють у тимчасову staging-таблицю, звідки
+    переносяться в clients одним INSERT ... SELECT. Конфлікти UNIQUE(email)
+    не зупиняють завантаження:
+      on_conflict="report" -> конфліктні рядки пропускаються й виводяться;
+      on_conflict="upsert" -> існуючі клієнти оновлюються (name, age).
+    CSV має містити рядок заголовка з колонками name, email[, age].
+    Повертає словник зі статистикою або кидає Error / ValueError / OSError
+    (транзакцію при цьому відкочено).
+    """
+    if on_conflict not in ("report", "upsert"):
+        raise ValueError("on_conflict має бути 'report' або 'upsert'.")
+    fmt = fmt or _detect_import_format(path)
+
+    started = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8", newline="") as f, \
+                conn.cursor() as cur:
+            if fmt == "jsonl":
+                columns = IMPORT_COLUMNS
+                source = _JsonlAsCsv(f)
+                copy_sql = (
+                    "COPY clients_staging (name, email, age) "
+                    "FROM STDIN WITH (FORMAT csv)"
+                )
+            else:
+                header = next(csv.reader([f.readline()]), [])
+                columns = tuple(col.strip().lower() for col in header)
+                if not {"name", "email"} <= set(columns) \
+                        or not set(columns) <= set(IMPORT_COLUMNS):
+                    raise ValueError(
+                        "Заголовок CSV має містити name, email та "
+                        "необов'язково age."
+                    )
+                source = f
+                copy_sql = (
+                    f"COPY clients_staging ({', '.join(columns)}) "
+                    "FROM STDIN WITH (FORMAT csv)"
+                )
+
+            cur.execute(
+                """
+                CREATE TEMP TABLE clients_staging (
+                    line_no BIGSERIAL,
+                    name TEXT,
+                    email TEXT,
+                    age TEXT
+                ) ON COMMIT DROP;
+                """
+            )
+            progress = _CopyProgress(source)
+            cur.copy_expert(copy_sql, progress)
+            copy_seconds = time.perf_counter() - started
+            print()
+
+            cur.execute("SELECT count(*) FROM clients_staging;")
+            staged = cur.fetchone()[0]
+
+            # Рядки без обов'язкових полів або з нечисловим віком
+            cur.execute(
+                """
+                DELETE FROM clients_staging
+                WHERE coalesce(name, '') = ''
+                   OR coalesce(email, '') = ''
+                   OR length(name) > 100
+                   OR length(email) > 100
+                   OR (coalesce(age, '') <> '' AND age !~ '^\\d{1,9}$');
+                """
+            )
+            invalid = cur.rowcount
+
+            conflicts = []
+            if on_conflict == "report":
+                cur.execute(
+                    """
+                    SELECT s.line_no, s.email
+                    FROM clients_staging s
+                    JOIN clients c ON c.email = s.email
+                    ORDER BY s.line_no
+                    LIMIT %s;
+                    """,
+                    (report_limit,),
+                )
+                conflicts = cur.fetchall()
+                conflict_action = "DO NOTHING"
+            else:
+                conflict_action = (
+                    "DO UPDATE SET name = EXCLUDED.name, age = EXCLUDED.age"
+                )
+
+            # DISTINCT ON: для дублікатів email усередині файлу
+            # перемагає останній рядок
+            cur.execute(
+                f"""
+                WITH ins AS (
+                    INSERT INTO clients (name, email, age)
+                    SELECT DISTINCT ON (email)
+                           name, email, nullif(age, '')::int
+                    FROM clients_staging
+                    ORDER BY email, line_no DESC
+                    ON CONFLICT (email) {conflict_action}
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted),
+                       count(*) FILTER (WHERE NOT inserted)
+                FROM ins;
+                """
+            )
+            inserted, updated = cur.fetchone()
+        conn.commit()
+    except (Error, ValueError, OSError):
+        conn.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "format": fmt,
+        "columns": columns,
+        "staged": staged,
+        "invalid": invalid,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": staged - invalid - inserted - updated,
+        "conflict_samples": conflicts,
+        "copy_seconds": copy_seconds,
+        "seconds": elapsed,
+        "rows_per_second": staged / elapsed if elapsed else 0.0,
+    }
+
+
+def import_clients(conn):
+    """
+    Масовий імпорт клієнтів з CSV/JSONL (COPY через staging-таблицю).
+    """
+    path = input("Шлях до файлу (.csv або .jsonl): ").strip()
+    if not path:
+        print("Шлях не може бути порожнім.")
+        return
+
+    mode = input(
+        "Конфлікти email: 1 - пропустити та показати, 2 - оновити [1/2]: "
+    ).strip()
+    on_conflict = "upsert" if mode == "2" else "report"
+
+    try:
+        stats = bulk_import_clients(conn, path, on_conflict=on_conflict)
+    except Error as e:
+        print("\nПомилка при імпорті, зміни відкочено!")
+        print("Код помилки:", e.pgcode)
+        print("Текст помилки:", e.pgerror)
+        return
+    except (ValueError, OSError) as e:
+        print("\nПомилка при імпорті, зміни відкочено:", e)
+        return
+
+    print(f"Прочитано рядків: {stats['staged']} "
+          f"(COPY {stats['copy_seconds']:.2f} с)")
+    print(f"Некоректних рядків пропущено: {stats['invalid']}")
+    print(f"Додано: {stats['inserted']}, оновлено: {stats['updated']}, "
+          f"пропущено (конфлікти/дублікати): {stats['skipped']}")
+    if stats["conflict_samples"]:
+        print("Приклади конфліктів email (№ запису у файлі, email):")
+        for line_no, email in stats["conflict_samples"]:
+            print(f" - {line_no}: {email}")
+    print(f"Загальний час: {stats['seconds']:.2f} с, "
+          f"{stats['rows_per_second']:,.0f} рядків/с")
+
+
+# ----------- Потоковий експорт через COPY -----------
+
+# Розмір буфера запису у файл під час експорту
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+
+def export_query(conn, query, dest, compress=None, header=True):
+    """
+    Вивантажує результат SELECT у CSV через COPY (query) TO STDOUT.
+
+    Дані йдуть від сервера прямо у файл (або stdout при dest="-")
+    без побудови Python-кортежів; compress=True (або розширення .gz)
+    стискає потік gzip на льоту. Прогрес друкується у stderr, щоб не
+    змішуватися з даними в конвеєрі.
+    Повертає словник зі статистикою.
+    """
+    query = _validate_select(query)
+    if compress is None:
+        compress = dest.endswith(".gz")
+
+    options = "FORMAT csv, HEADER" if header else "FORMAT csv"
+    copy_sql = f"COPY ({query}) TO STDOUT WITH ({options})"
+
+    if dest == "-":
+        raw = sys.stdout.buffer
+    else:
+        raw = open(dest, "wb", buffering=EXPORT_BUFFER_SIZE)
+    out = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) \
+        if compress else raw
+
+    started = time.perf_counter()
+    progress = _CopyProgress(out, label="Вивантажено", stream=sys.stderr)
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(copy_sql, progress)
+            rows = cur.rowcount
+        conn.rollback()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        if compress:
+            out.close()
+        if raw is sys.stdout.buffer:
+            raw.flush()
+        else:
+            raw.close()
+
+    if rows is None or rows < 0:
+        rows = progress.lines - (1 if header else 0)
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "compressed": compress,
+    }
+
+
+def export_clients(conn):
+    """
+    Експорт таблиці clients або довільного SELECT у CSV / CSV.gz.
+    """
+    query = input(
+        "SELECT-запит для експорту (порожньо = уся таблиця clients): "
+    ).strip()
+    if not query:
+        query = "SELECT id, name, email, age, created_at FROM clients ORDER BY id"
+
+    dest = input("Файл призначення (.csv, .csv.gz або '-' для stdout): ").strip()
+    if not dest:
+        print("Шлях не може бути порожнім.")
+        return
+
+    try:
+        stats = export_query(conn, query, dest)
+    except Error as e:
+        print("Помилка при експорті!")
+        print("Код помилки:", e.pgcode)
+        print("Текст помилки:", e.pgerror)
+        return
+    except (ValueError, OSError) as e:
+        print("Помилка при експорті:", e)
+        return
+
+    kind = "CSV.gz" if stats["compressed"] else "CSV"
+    print(f"Вивантажено рядків: {stats['rows']} у {kind} за "
+          f"{stats['seconds']:.2f} с ({stats['rows_per_second']:,.0f} рядків/с)")
+
+
+# ----------- Масові UPDATE / DELETE за списком id -----------
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Типи колонок для UPDATE ... FROM (VALUES ...), щоб NULL і числа
+# з файлу мали однозначний тип
+_COLUMN_TYPES = {"id": "integer", "name": "text", "email": "text", "age": "integer"}
+
+
+def _iter_id_tokens(text):
+    for token in re.split(r"[\s,;]+", text.strip()):
+        if not token:
+            continue
+        if "-" in token:
+            first, _, last = token.partition("-")
+            if not (first.isdigit() and last.isdigit()) or int(first) > int(last):
+                raise ValueError(f"Некоректний діапазон id: {token}")
+            yield from range(int(first), int(last) + 1)
+        elif token.isdigit():
+            yield int(token)
+        else:
+            raise ValueError(f"Некоректний id: {token}")
+
+
+def iter_ids(spec):
+    """
+    Лінивий ітератор id за специфікацією: "1,2,5-10" або "@файл"
+    (у файлі id та діапазони через пробіли, коми чи з нового рядка).
+    """
+    spec = spec.strip()
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as f:
+            for line in f:
+                yield from _iter_id_tokens(line)
+    else:
+        yield from _iter_id_tokens(spec)
+
+
+def _iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_chunked(conn, chunks, execute_chunk, label):
+    """
+    Виконує execute_chunk(cur, chunk) для кожної порції в окремій
+    транзакції та друкує прогрес. Повертає (порцій, змінено рядків).
+    При помилці поточна порція відкочується, а виняток прокидається далі
+    (попередні порції вже зафіксовані).
+    """
+    total = 0
+    done = 0
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for chunk in chunks:
+            try:
+                execute_chunk(cur, chunk)
+                affected = cur.rowcount
+                conn.commit()
+            except Error:
+                conn.rollback()
+                print(f"\nПомилка в порції {done + 1}; попередні "
+                      f"{done} порцій ({total} рядків) зафіксовано.")
+                raise
+            done += 1
+            total += max(affected, 0)
+            print(f"\r{label}: порцій {done}, рядків {total}", end="", flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"\n{label}: усього змінено рядків {total} за {elapsed:.2f} с")
+    return done, total
+
+
+def delete_clients_by_ids(conn, ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """DELETE ... WHERE id = ANY(...) порціями по chunk_size id."""
+    def execute_chunk(cur, chunk):
+        cur.execute("DELETE FROM clients WHERE id = ANY(%s);", (chunk,))
+
+    return _run_chunked(conn, _iter_chunks(ids, chunk_size),
+                        execute_chunk, "Видалено")
+
+
+def update_clients_age_by_ids(conn, ids, age=None, delta=None,
+                              chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Встановлює вік (age) або зсуває його на delta для всіх id зі списку
+    одним UPDATE ... WHERE id = ANY(...) на порцію.
+    """
+    if (age is None) == (delta is None):
+        raise ValueError("Потрібно задати рівно одне з: age або delta.")
+    if age is not None:
+        sql, value = "UPDATE clients SET age = %s WHERE id = ANY(%s);", age
+    else:
+        sql, value = "UPDATE clients SET age = age + %s WHERE id = ANY(%s);", delta
+
+    def execute_chunk(cur, chunk):
+        cur.execute(sql, (value, chunk))
+
+    return _run_chunked(conn, _iter_chunks(ids, chunk_size),
+                        execute_chunk, "Оновлено")
+
+
+def _iter_update_rows(path):
+    """
+    Читає CSV із заголовком id та будь-якими з name, email, age.
+    Повертає (колонки, лінивий ітератор кортежів значень).
+    """
+    f = open(path, encoding="utf-8", newline="")
+    reader = csv.reader(f)
+    header = [col.strip().lower() for col in next(reader, [])]
+    columns = [col for col in header if col != "id"]
+    if "id" not in header or not columns \
+            or not set(columns) <= set(UPDATABLE_COLUMNS) \
+            or len(set(header)) != len(header):
+        f.close()
+        raise ValueError(
+            "Заголовок CSV має містити id та одну або кілька з колонок "
+            "name, email, age."
+        )
+
+    def rows():
+        with f:
+            for line_no, record in enumerate(reader, 2):
+                if not record:
+                    continue
+                if len(record) != len(header):
+                    raise ValueError(f"Рядок {line_no}: очікується "
+                                     f"{len(header)} значень.")
+                values = dict(zip(header, (v.strip() for v in record)))
+                row = []
+                for col in ["id"] + columns:
+                    value = values[col]
+                    if _COLUMN_TYPES[col] == "integer":
+                        if value == "" and col != "id":
+                            value = None
+                        elif not value.isdigit():
+                            raise ValueError(f"Рядок {line_no}: {col} має "
+                                             "бути цілим числом.")
+                        else:
+                            value = int(value)
+                    row.append(value)
+                yield tuple(row)
+
+    return columns, rows()
+
+
+def update_clients_from_rows(conn, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Оновлення з окремими значеннями для кожного рядка:
+    UPDATE clients ... FROM (VALUES ...) одним оператором на порцію.
+    rows — кортежі (id, значення колонок у порядку columns).
+    """
+    assignments = ", ".join(f"{col} = v.{col}" for col in columns)
+    names = ", ".join(["id"] + list(columns))
+    template = "(" + ", ".join(
+        f"%s::{_COLUMN_TYPES[col]}" for col in ["id"] + list(columns)
+    ) + ")"
+    sql = (
+        f"UPDATE clients AS c SET {assignments} "
+        f"FROM (VALUES %s) AS v({names}) WHERE c.id = v.id"
+    )
+
+    def execute_chunk(cur, chunk):
+        # page_size = розмір порції: один оператор, точний rowcount
+        execute_values(cur, sql, chunk, template=template, page_size=len(chunk))
+
+    return _run_chunked(conn, _iter_chunks(rows, chunk_size),
+                        execute_chunk, "Оновлено")
+
+
+def batch_modify_clients(conn):
+    """
+    Масове видалення / оновлення клієнтів за списком id або CSV-файлом.
+    """
+    print("1 - видалити за списком id")
+    print("2 - встановити або змінити вік за списком id")
+    print("3 - оновити поля з CSV (id + name/email/age для кожного рядка)")
+    action = input("Дія [1/2/3]: ").strip()
+    if action not in ("1", "2", "3"):
+        print("Невірна дія.")
+        return
+
+    try:
+        chunk_size = _ask_int(
+            f"Розмір порції (порожньо = {DEFAULT_CHUNK_SIZE}): ",
+            DEFAULT_CHUNK_SIZE,
+        )
+        if chunk_size == 0:
+            raise ValueError("Розмір порції має бути більшим за 0.")
+
+        if action == "3":
+            path = input("Шлях до CSV-файлу: ").strip()
+            columns, rows = _iter_update_rows(path)
+            update_clients_from_rows(conn, columns, rows, chunk_size)
+            return
+
+        spec = input("id (напр. 1,2,10-20) або @файл зі списком id: ").strip()
+        if not spec:
+            print("Список id порожній.")
+            return
+        ids = iter_ids(spec)
+
+        if action == "1":
+            delete_clients_by_ids(conn, ids, chunk_size)
+        else:
+            value = input("Новий вік (напр. 30) або зсув (напр. +1 / -1): ").strip()
+            if value[:1] in ("+", "-") and value[1:].isdigit():
+                update_clients_age_by_ids(conn, ids, delta=int(value),
+                                          chunk_size=chunk_size)
+            elif value.isdigit():
+                update_clients_age_by_ids(conn, ids, age=int(value),
+                                          chunk_size=chunk_size)
+            else:
+                print("Вік має бути цілим числом.")
+    except Error as e:
+        print("Помилка при виконанні масової операції:")
+        print("Код помилки:", e.pgcode)
+        print("Текст помилки:", e.pgerror)
+    except (ValueError, OSError) as e:
+        print("\nПомилка:", e)
+
+
+def run_batch_command(conn, args):
+    """Підкоманда CLI `batch`: масові DELETE / UPDATE за списком id."""
+    if args.chunk_size <= 0:
+        print("--chunk-size має бути більшим за 0.", file=sys.stderr)
+        return 2
+    try:
+        if args.action == "update":
+            columns, rows = _iter_update_rows(args.csv)
+            update_clients_from_rows(conn, columns, rows, args.chunk_size)
+        elif args.action == "delete":
+            delete_clients_by_ids(conn, iter_ids(args.ids), args.chunk_size)
+        else:
+            update_clients_age_by_ids(conn, iter_ids(args.ids), age=args.set,
+                                      delta=args.delta,
+                                      chunk_size=args.chunk_size)
+    except Error as e:
+        print("Код помилки:", e.pgcode, file=sys.stderr)
+        print("Текст помилки:", e.pgerror, file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as e:
+        print("Помилка:", e, file=sys.stderr)
+        return 2
+    return 0
+
+
+# ----------- Пакетне виконання SQL-скриптів -----------
+
+# Скільки операторів скрипта виконується в одній транзакції
+DEFAULT_SCRIPT_BATCH = 1000
+
+# Лексеми, що змінюють стан розбору SQL: кінець оператора, початок
+# рядкового літерала / ідентифікатора, коментаря чи $tag$-рядка
+_SQL_SPECIAL = re.compile(r"""[;'"]|--|/\*|\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$""")
+
+# Усередині E'...': екранований символ, подвоєна лапка або кінець рядка
+_ESCAPE_STRING_TOKEN = re.compile(r"\\.|''|'", re.DOTALL)
+
+# Усередині /* */: вкладений коментар або його кінець
+_COMMENT_TOKEN = re.compile(r"/\*|\*/")
+
+# Оператори, які PostgreSQL не дозволяє виконувати всередині транзакції
+_NO_TRANSACTION_SQL = re.compile(
+    r"^\s*(vacuum\b|(create|drop)\s+(unique\s+)?index\s+concurrently\b"
+    r"|reindex\b.*\bconcurrently\b"
+    r"|reindex\s+(\([^)]*\)\s*)?(database|system)\b"
+    r"|(create|drop)\s+(database|tablespace)\b"
+    r"|alter\s+system\b|alter\s+database\b.*\bset\s+tablespace\b)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _is_escape_string(line, quote):
+    """Чи починає лапка line[quote] рядок E'...' (а не ідентифікатор на e)."""
+    if quote == 0 or line[quote - 1] not in "eE":
+        return False
+    before = line[quote - 2] if quote >= 2 else " "
+    return not (before.isalnum() or before in "_$")
+
+
+def iter_sql_statements(lines):
+    """
+    Потоково розбиває SQL-текст (ітерований по рядках) на оператори за ';'.
+
+    Враховує рядкові літерали (зокрема E'...' з екрануванням \\),
+    ідентифікатори в лапках, $tag$-рядки, коментарі -- та /* */ з
+    вкладеністю (коментарі відкидаються). У пам'яті тримається лише
+    поточний оператор.
+    """
+    buf = []
+    close = None  # очікуваний завершувач поточного літерала / коментаря
+    depth = 0     # глибина вкладених коментарів /* */
+    for line in lines:
+        i = 0
+        while i < len(line):
+            if close == "*/":
+                m = _COMMENT_TOKEN.search(line, i)
+                if m is None:
+                    break
+                depth += 1 if m.group(0) == "/*" else -1
+                if depth == 0:
+                    close = None
+                i = m.end()
+                continue
+
+            if close == "E'":
+                m = _ESCAPE_STRING_TOKEN.search(line, i)
+                if m is None:
+                    buf.append(line[i:])
+                    break
+                buf.append(line[i:m.end()])
+                if m.group(0) == "'":
+                    close = None
+                i = m.end()
+                continue
+
+            if close is not None:
+                j = line.find(close, i)
+                if j < 0:
+                    buf.append(line[i:])
+                    break
+                end = j + len(close)
+                buf.append(line[i:end])
+                close = None
+                i = end
+                continue
+
+            m = _SQL_SPECIAL.search(line, i)
+            if m is None:
+                buf.append(line[i:])
+                break
+            buf.append(line[i:m.start()])
+            token = m.group(0)
+            if token == ";":
+                statement = "".join(buf).strip()
+                buf = []
+                if statement:
+                    yield statement
+            elif token == "--":
+                buf.append("\n")
+                break
+            elif token == "/*":
+                buf.append(" ")
+                close = "*/"
+                depth = 1
+            else:
+                buf.append(token)
+                if token == "'" and _is_escape_string(line, m.start()):
+                    close = "E'"
+                else:
+                    close = token
+            i = m.end()
+
+    statement = "".join(buf).strip()
+    if statement:
+        yield statement
+
+
+def _short_sql(statement, width=70):
+    flat = " ".join(statement.split())
+    return flat if len(flat) <= width else flat[:width - 3] + "..."
+
+
+def _script_batches(statements, batch_size):
+    """
+    Групує потік операторів у пакети: до batch_size звичайних операторів
+    поспіль або один оператор, що виконується поза транзакцією.
+    Повертає пари (поза транзакцією?, список операторів).
+    """
+    batch = []
+    for statement in statements:
+        if _NO_TRANSACTION_SQL.match(statement):
+            if batch:
+                yield False, batch
+                batch = []
+            yield True, [statement]
+            continue
+        batch.append(statement)
+        if len(batch) >= batch_size:
+            yield False, batch
+            batch = []
+    if batch:
+        yield False, batch
+
+
+def run_sql_script(conn, statements, batch_size=DEFAULT_SCRIPT_BATCH,
+                   on_error="stop"):
+    """
+    Виконує потік SQL-операторів пакетами по batch_size в одній транзакції.
+
+    on_error="stop"     -> при помилці поточний пакет відкочується,
+                           виконання зупиняється (попередні пакети
+                           вже зафіксовані);
+    on_error="continue" -> кожен оператор захищений SAVEPOINT, помилковий
+                           відкочується, решта пакета фіксується.
+    Оператори на кшталт VACUUM чи CREATE DATABASE виконуються поза
+    транзакцією окремим пакетом: оператори перед ними фіксуються й
+    звітуються як завершений пакет, після них починається новий.
+    Повертає словник з підсумками.
+    """
+    if on_error not in ("stop", "continue"):
+        raise ValueError("on_error має бути 'stop' або 'continue'.")
+
+    summary = {
+        "statements": 0,
+        "failed": 0,
+        "rows": 0,
+        "batches": 0,
+        "seconds": 0.0,
+        "stopped": False,
+    }
+    started = time.perf_counter()
+
+    with conn.cursor() as cur:
+        for no_transaction, batch in _script_batches(statements, batch_size):
+            summary["batches"] += 1
+            batch_started = time.perf_counter()
+            batch_rows = 0
+            batch_failed = 0
+            savepoints = on_error == "continue" and not no_transaction
+            if no_transaction:
+                conn.autocommit = True
+
+            try:
+                for statement in batch:
+                    summary["statements"] += 1
+                    number = summary["statements"]
+                    if savepoints:
+                        cur.execute("SAVEPOINT script_statement;")
+                    try:
+                        cur.execute(statement)
+                    except Error as e:
+                        batch_failed += 1
+                        print(f"Помилка в операторі #{number} "
+                              f"({_short_sql(statement)}):", file=sys.stderr)
+                        print("Код помилки:", e.pgcode, file=sys.stderr)
+                        print("Текст помилки:", e.pgerror, file=sys.stderr)
+                        if on_error == "stop":
+                            if not no_transaction:
+                                conn.rollback()
+                            summary["stopped"] = True
+                            break
+                        if savepoints:
+                            cur.execute("ROLLBACK TO SAVEPOINT script_statement;")
+                        continue
+
+                    # rowcount для SELECT — кількість повернених, а не змінених рядків
+                    if cur.description is None and cur.rowcount > 0:
+                        batch_rows += cur.rowcount
+                    if savepoints:
+                        cur.execute("RELEASE SAVEPOINT script_statement;")
+            finally:
+                if no_transaction:
+                    conn.autocommit = False
+
+            if no_transaction:
+                status = "поза транзакцією"
+            elif summary["stopped"]:
+                batch_rows = 0
+                status = "відкочено"
+            else:
+                try:
+                    conn.commit()
+                    status = "зафіксовано"
+                except Error as e:
+                    print("Помилка при фіксації пакета:", e, file=sys.stderr)
+                    conn.rollback()
+                    batch_rows = 0
+                    batch_failed = len(batch)
+                    summary["stopped"] = on_error == "stop"
+                    status = "відкочено"
+
+            summary["failed"] += batch_failed
+            summary["rows"] += batch_rows
+            batch_ms = (time.perf_counter() - batch_started) * 1000
+            print(f"Пакет {summary['batches']}: операторів {len(batch)}, "
+                  f"помилок {batch_failed}, змінено рядків {batch_rows}, "
+                  f"{batch_ms:.1f} мс ({status})")
+            if summary["stopped"]:
+                break
+
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+def run_script_command(conn, args):
+    """
+    Підкоманда CLI `script`: виконання SQL-скрипта з файлу або stdin.
+    Повертає код завершення процесу.
+    """
+    if args.batch_size <= 0:
+        print("--batch-size має бути більшим за 0.", file=sys.stderr)
+        return 2
+
+    if args.file == "-":
+        source = sys.stdin
+    else:
+        try:
+            source = open(args.file, encoding="utf-8")
+        except OSError as e:
+            print("Не вдалося відкрити скрипт:", e, file=sys.stderr)
+            return 2
+
+    try:
+        summary = run_sql_script(
+            conn,
+            iter_sql_statements(source),
+            batch_size=args.batch_size,
+            on_error=args.on_error,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"\nПідсумок: операторів {summary['statements']}, "
+          f"помилок {summary['failed']}, пакетів {summary['batches']}, "
+          f"змінено рядків {summary['rows']}, {summary['seconds']:.2f} с")
+    if summary["stopped"]:
+        print("Виконання зупинено через помилку.")
+    return 1 if summary["failed"] else 0
+
+
+# ----------- Паралельне виконання незалежних запитів -----------
+
+DEFAULT_WORKERS = 4
+
+
+def _run_readonly_query(connections, index, query):
+    """
+    Виконує один запит на вільному підключенні з пулу.
+    Повертає словник з результатом або помилкою та затримкою.
+    """
+    conn = connections.get()
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            rows = cur.fetchall() if cur.description else []
+            columns = [col[0] for col in cur.description or ()]
+        return {"index": index, "query": query, "columns": columns,
+                "rows": rows, "error": None,
+                "seconds": time.perf_counter() - started}
+    except Error as e:
+        return {"index": index, "query": query, "columns": [], "rows": [],
+                "error": e, "seconds": time.perf_counter() - started}
+    finally:
+        connections.put(conn)
+
+
+def run_parallel_queries(queries, workers=DEFAULT_WORKERS):
+    """
+    Виконує незалежні SELECT-запити одночасно на workers окремих
+    підключеннях (read-only, autocommit) з пулу потоків.
+
+    psycopg2 відпускає GIL на час очікування відповіді сервера, тож
+    запити справді виконуються паралельно на різних backend-процесах.
+    Повертає (результати у порядку запитів, загальний час у секундах).
+    """
+    queries = [_validate_select(q) for q in queries]
+    if not queries:
+        return [], 0.0
+    workers = max(1, min(workers, len(queries)))
+
+    connections = queue.Queue()
+    opened = []
+    try:
+        for _ in range(workers):
+            conn = get_connection()
+            conn.set_session(readonly=True, autocommit=True)
+            opened.append(conn)
+            connections.put(conn)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_readonly_query, connections, i, query)
+                for i, query in enumerate(queries, 1)
+            ]
+            results = [future.result() for future in futures]
+        wall = time.perf_counter() - started
+    finally:
+        for conn in opened:
+            conn.close()
+
+    return results, wall
+
+
+def print_parallel_results(results, wall, show_rows=0):
+    """Друкує затримку кожного запиту та загальний виграш у часі."""
+    print(f"\n{'#':>3} {'мс':>10} {'рядків':>8}  запит")
+    print("-" * 80)
+    for result in results:
+        status = "ПОМИЛКА" if result["error"] else len(result["rows"])
+        print(f"{result['index']:3} {result['seconds'] * 1000:10.2f} "
+              f"{status:>8}  {_short_sql(result['query'], 55)}")
+        if result["error"]:
+            print("    Код помилки:", result["error"].pgcode)
+            print("    Текст помилки:", result["error"].pgerror)
+        for row in result["rows"][:show_rows]:
+            print("   ", row)
+
+    serial = sum(result["seconds"] for result in results)
+    print(f"\nЗагальний час: {wall * 1000:.2f} мс; сума затримок "
+          f"(послідовне виконання) ≈ {serial * 1000:.2f} мс; "
+          f"прискорення ≈ {serial / wall if wall else 0:.2f}x")
+
+
+def parallel_queries(conn):
+    """
+    Паралельне виконання кількох незалежних SELECT-запитів.
+    """
+    print("Введіть SELECT-запити, кожен в окремому рядку "
+          "(порожній рядок — кінець):")
+    queries = []
+    while True:
+        line = input("> ").strip()
+        if not line:
+            break
+        queries.append(line)
+    if not queries:
+        print("Запитів немає.")
+        return
+
+    try:
+        workers = _ask_int(
+            f"Кількість підключень (порожньо = {DEFAULT_WORKERS}): ",
+            DEFAULT_WORKERS,
+        )
+        if workers == 0:
+            raise ValueError("Кількість підключень має бути більшою за 0.")
+        results, wall = run_parallel_queries(queries, workers)
+    except ValueError as e:
+        print(e)
+        return
+    except Error as e:
+        print("Не вдалося відкрити підключення:")
+        print(e)
+        return
+
+    print_parallel_results(results, wall, show_rows=5)
+
+
+def run_parallel_command(conn, args):
+    """Підкоманда CLI `parallel`: запити з файлу виконуються паралельно."""
+    if args.workers <= 0:
+        print("--workers має бути більшим за 0.", file=sys.stderr)
+        return 2
+    try:
+        if args.file == "-":
+            queries = list(iter_sql_statements(sys.stdin))
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                queries = list(iter_sql_statements(f))
+        results, wall = run_parallel_queries(queries, args.workers)
+    except (ValueError, OSError) as e:
+        print("Помилка:", e, file=sys.stderr)
+        return 2
+    except Error as e:
+        print("Не вдалося відкрити підключення:", e, file=sys.stderr)
+        return 1
+
+    print_parallel_results(results, wall, show_rows=args.show_rows)
+    return 1 if any(result["error"] for result in results) else 0
+
+
+# ----------- Бенчмарк prepared statements -----------
+
+def _bench_crud(cur, prepared, count, tag):
+    """
+    Виконує count INSERT, count UPDATE та count DELETE одним із шляхів:
+    prepared=False — як у початкових функціях (повний текст SQL щоразу),
+    prepared=True  — через PreparedRegistry.
+    Повертає {операція: секунди}.
+    """
+    timings = {}
+    ids = []
+
+    started = time.perf_counter()
+    for i in range(count):
+        name, email, age = f"Bench {i}", f"bench-{tag}-{i}@example.invalid", i % 90
+        if prepared:
+            ids.append(insert_client_row(cur, name, email, age))
+        else:
+            cur.execute(
+                """
+                INSERT INTO clients (name, email, age)
+                VALUES (%s, %s, %s)
+                RETURNING id;
+                """,
+                (name, email, age),
+            )
+            ids.append(cur.fetchone()[0])
+    timings["insert"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i, client_id in enumerate(ids):
+        email, age = f"bench-{tag}-{i}-upd@example.invalid", (i + 1) % 90
+        if prepared:
+            update_client_row(cur, client_id, {"email": email, "age": age})
+        else:
+            fields = ["email = %s", "age = %s"]
+            query = "UPDATE clients SET " + ", ".join(fields) + " WHERE id = %s;"
+            cur.execute(query, (email, age, client_id))
+    timings["update"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for client_id in ids:
+        if prepared:
+            delete_client_row(cur, client_id)
+        else:
+            cur.execute("DELETE FROM clients WHERE id = %s;", (client_id,))
+    timings["delete"] = time.perf_counter() - started
+
+    return timings
+
+
+def benchmark_prepared(conn, operations=100_000, warmup=1000):
+    """
+    Порівнює затримку INSERT/UPDATE/DELETE без і з prepared statements.
+
+    operations ділиться порівну між трьома видами операцій. Кожен прогін
+    виконується в окремій транзакції, яка потім відкочується, тому таблиця
+    clients не змінюється, а fsync при COMMIT не спотворює результат.
+    Повертає (кількість операцій кожного виду, {шлях: {операція: секунди}}).
+    """
+    per_kind = max(1, operations // 3)
+    results = {}
+    try:
+        with conn.cursor() as cur:
+            for prepared in (False, True):
+                _bench_crud(cur, prepared, min(warmup, per_kind), "warmup")
+                conn.rollback()
+            for prepared in (False, True):
+                mode = "prepared" if prepared else "plain"
+                results[mode] = _bench_crud(cur, prepared, per_kind, mode)
+                conn.rollback()
+    except Error:
+        conn.rollback()
+        raise
+    return per_kind, results
+
+
+def run_bench_prepared_command(conn, args):
+    """Підкоманда CLI `bench-prepared`."""
+    if args.ops < 3:
+        print("--ops має бути не меншим за 3.", file=sys.stderr)
+        return 2
+
+    try:
+        per_kind, results = benchmark_prepared(conn, args.ops)
+    except Error as e:
+        print("Помилка під час бенчмарку!", file=sys.stderr)
+        print("Код помилки:", e.pgcode, file=sys.stderr)
+        print("Текст помилки:", e.pgerror, file=sys.stderr)
+        return 1
+
+    print(f"\nОперацій кожного виду: {per_kind} (всього {per_kind * 3})")
+    print(f"{'операція':10} {'звичайний, мкс/оп':>18} "
+          f"{'prepared, мкс/оп':>18} {'прискорення':>12}")
+    print("-" * 62)
+    for op in ("insert", "update", "delete"):
+        plain = results["plain"][op] / per_kind * 1e6
+        prepared = results["prepared"][op] / per_kind * 1e6
+        print(f"{op:10} {plain:18.1f} {prepared:18.1f} "
+              f"{plain / prepared:11.2f}x")
+    return 0
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Клієнт PostgreSQL (лаб. 8). Без аргументів — "
+                    "інтерактивне меню."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    script = subparsers.add_parser(
+        "script",
+        help="виконати SQL-скрипт пакетами транзакцій",
+    )
+    script.add_argument(
+        "file", nargs="?", default="-",
+        help="файл зі SQL-операторами ('-' або порожньо = stdin)",
+    )
+    script.add_argument(
+        "--batch-size", type=int, default=DEFAULT_SCRIPT_BATCH,
+        help=f"операторів на транзакцію (за замовчуванням {DEFAULT_SCRIPT_BATCH})",
+    )
+    script.add_argument(
+        "--on-error", choices=("stop", "continue"), default="stop",
+        help="зупинитися на першій помилці або пропустити оператор",
+    )
+    script.set_defaults(handler=run_script_command)
+
+    bench = subparsers.add_parser(
+        "bench-prepared",
+        help="порівняти CRUD без і з prepared statements",
+    )
+    bench.add_argument(
+        "--ops", type=int, default=100_000,
+        help="загальна кількість операцій (за замовчуванням 100000)",
+    )
+    bench.set_defaults(handler=run_bench_prepared_command)
+
+    batch = subparsers.add_parser(
+        "batch",
+        help="масові DELETE / UPDATE клієнтів за списком id",
+    )
+    batch.add_argument(
+        "action", choices=("delete", "age", "update"),
+        help="delete — видалити, age — змінити вік, update — оновити з CSV",
+    )
+    batch.add_argument(
+        "--ids",
+        help="id та діапазони (1,2,10-20) або @файл; для delete та age",
+    )
+    age_value = batch.add_mutually_exclusive_group()
+    age_value.add_argument("--set", type=int, help="новий вік (для age)")
+    age_value.add_argument("--delta", type=int, help="зсув віку (для age)")
+    batch.add_argument(
+        "--csv", help="CSV із колонками id та name/email/age (для update)",
+    )
+    batch.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"id на один оператор (за замовчуванням {DEFAULT_CHUNK_SIZE})",
+    )
+    batch.set_defaults(handler=run_batch_command)
+
+    parallel = subparsers.add_parser(
+        "parallel",
+        help="виконати незалежні SELECT-запити паралельно",
+    )
+    parallel.add_argument(
+        "file", nargs="?", default="-",
+        help="файл із SELECT-запитами через ';' ('-' = stdin)",
+    )
+    parallel.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"кількість підключень (за замовчуванням {DEFAULT_WORKERS})",
+    )
+    parallel.add_argument(
+        "--show-rows", type=int, default=0,
+        help="скільки рядків результату кожного запиту вивести",
+    )
+    parallel.set_defaults(handler=run_parallel_command)
+
+    return parser
+
+
+def parse_args(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        if args.action == "update" and not args.csv:
+            parser.error("batch update потребує --csv")
+        if args.action != "update" and not args.ids:
+            parser.error(f"batch {args.action} потребує --ids")
+        if args.action == "age" and args.set is None and args.delta is None:
+            parser.error("batch age потребує --set або --delta")
+    return args
+
+
+def run_cli(args):
+    """
+    Неінтерактивний режим: підключення, init_db та виклик підкоманди.
+    """
+    try:
+        conn = get_connection()
+    except Error as e:
+        print("Не вдалося підключитися до БД.", file=sys.stderr)
+        print(e, file=sys.stderr)
+        return 1
+
+    try:
+        init_db(conn)
+        return args.handler(conn, args)
+    finally:
+        conn.close()
+
+
+def print_menu():
+    """
+    Вивід меню на екран.
+    """
+    print("\n=== Меню клієнта БД ===")
+    print("1. Показати список таблиць")
+    print("2. Показати структуру таблиці")
+    print("3. Показати всі клієнти (SELECT)")
+    print("4. Додати клієнта (INSERT)")
+    print("5. Оновити клієнта (UPDATE)")
+    print("6. Видалити клієнта (DELETE)")
+    print("7. Виконати довільний SQL-запит")
+    print("8. Потоковий перегляд клієнтів (серверний курсор)")
+    print("9. Потоковий довільний SELECT (серверний курсор)")
+    print("10. Масовий імпорт клієнтів з CSV/JSONL (COPY)")
+    print("11. Експорт клієнтів / SELECT у CSV або CSV.gz (COPY)")
+    print("12. Посторінковий перегляд клієнтів (keyset)")
+    print("13. Інструментування довільних запитів (час, EXPLAIN, журнал)")
+    print("14. Масове оновлення / видалення за списком id")
+    print("15. Паралельне виконання кількох SELECT-запитів")
+    print("16. Пошук клієнтів за ім'ям / email (pg_trgm)")
+    print("0. Вихід")
+
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command is not None:
+        return run_cli(args)
 
-def main():
     try:
         conn = get_connection()
         print("Підключення до БД успішне.")
@@ -354,7 +2474,26 @@ def main():
             delete_client(conn)
         elif choice == "7":
             run_custom_query(conn)
+        elif choice == "8":
+            stream_all_clients(conn)
+        elif choice == "9":
+            stream_custom_query(conn)
+        elif choice == "10":
+            import_clients(conn)
+        elif choice == "11":
+            export_clients(conn)
+        elif choice == "12":
+            browse_clients(conn)
+        elif choice == "13":
+            configure_profiling(conn)
+        elif choice == "14":
+            batch_modify_clients(conn)
+        elif choice == "15":
+            parallel_queries(conn)
+        elif choice == "16":
+            search_clients(conn)
         elif choice == "0":
+            PROFILER.report()
             print("Вихід...")
             break
         else:
@@ -364,4 +2503,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Тести розбору SQL-скриптів (підкоманда `script`) — без підключення до БД.
+"""
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import psycopg2  # noqa: F401
+except ImportError:
+    # Розбір не звертається до БД; client.py потребує лише імен з psycopg2
+    psycopg2 = types.ModuleType("psycopg2")
+    psycopg2.Error = type("Error", (Exception,), {"pgcode": None, "pgerror": None})
+    psycopg2.connect = None
+    extensions = types.ModuleType("psycopg2.extensions")
+    extensions.TRANSACTION_STATUS_IDLE = 0
+    extras = types.ModuleType("psycopg2.extras")
+    extras.execute_values = None
+    psycopg2.extensions = extensions
+    psycopg2.extras = extras
+    sys.modules["psycopg2"] = psycopg2
+    sys.modules["psycopg2.extensions"] = extensions
+    sys.modules["psycopg2.extras"] = extras
+
+import client  # noqa: E402
+
+
+def split(text):
+    return list(client.iter_sql_statements(text.splitlines(keepends=True)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("SELECT 1; SELECT 2;", ["SELECT 1", "SELECT 2"]),
+    ("SELECT 1;;\n;SELECT 2", ["SELECT 1", "SELECT 2"]),
+    # літерали та ідентифікатори в лапках
+    ("SELECT 'a;b'; SELECT 2;", ["SELECT 'a;b'", "SELECT 2"]),
+    ("SELECT 'it''s;'; SELECT 2;", ["SELECT 'it''s;'", "SELECT 2"]),
+    ('SELECT "a;b" FROM t; SELECT 2;', ['SELECT "a;b" FROM t', "SELECT 2"]),
+    ('SELECT "a"";b" FROM t;', ['SELECT "a"";b" FROM t']),
+    ("SELECT 'a\nb;c';", ["SELECT 'a\nb;c'"]),
+    # E'...' з екрануванням
+    (r"SELECT E'it\'s;'; SELECT 2;", [r"SELECT E'it\'s;'", "SELECT 2"]),
+    (r"SELECT e'\\'; SELECT 2;", [r"SELECT e'\\'", "SELECT 2"]),
+    (r"SELECT E'a''b\';c'; SELECT 2;", [r"SELECT E'a''b\';c'", "SELECT 2"]),
+    ("SELECT E'\\\n;'; SELECT 2;", ["SELECT E'\\\n;'", "SELECT 2"]),
+    # звичайний рядок після ідентифікатора на e: \ не екранує
+    (r"SELECT name='\'; SELECT 2;", [r"SELECT name='\'", "SELECT 2"]),
+    # $tag$-рядки
+    ("DO $$ BEGIN PERFORM 1; END $$; SELECT 2;",
+     ["DO $$ BEGIN PERFORM 1; END $$", "SELECT 2"]),
+    ("SELECT $fn$ a; $$ b; $fn$;", ["SELECT $fn$ a; $$ b; $fn$"]),
+    ("CREATE FUNCTION f() RETURNS int AS $body$\nSELECT 1;\n$body$ LANGUAGE sql;",
+     ["CREATE FUNCTION f() RETURNS int AS $body$\nSELECT 1;\n$body$ LANGUAGE sql"]),
+    # коментарі
+    ("SELECT 1; -- ; коментар\nSELECT 2;", ["SELECT 1", "SELECT 2"]),
+    ("SELECT /* ; */ 1;", ["SELECT   1"]),
+    ("SELECT /* a /* ; */ b; */ 1;", ["SELECT   1"]),
+    ("/* a\n/* b */\n; */ SELECT 1;", ["SELECT 1"]),
+    ("SELECT '--', '/*'; SELECT 2;", ["SELECT '--', '/*'", "SELECT 2"]),
+    ("SELECT 1 -- без завершальної ;", ["SELECT 1"]),
+])
+def test_iter_sql_statements(text, expected):
+    assert split(text) == expected
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("VACUUM ANALYZE clients", True),
+    ("  vacuum", True),
+    ("CREATE INDEX CONCURRENTLY idx ON clients (age)", True),
+    ("create unique index concurrently idx on clients (email)", True),
+    ("DROP INDEX CONCURRENTLY idx", True),
+    ("REINDEX INDEX CONCURRENTLY idx", True),
+    ("REINDEX DATABASE lab8db", True),
+    ("REINDEX (VERBOSE) SYSTEM lab8db", True),
+    ("CREATE DATABASE copy_db", True),
+    ("DROP DATABASE copy_db", True),
+    ("CREATE TABLESPACE fast LOCATION '/ssd'", True),
+    ("DROP TABLESPACE fast", True),
+    ("ALTER SYSTEM SET work_mem = '64MB'", True),
+    ("ALTER DATABASE lab8db SET TABLESPACE fast", True),
+    ("CREATE INDEX idx ON clients (age)", False),
+    ("REINDEX TABLE clients", False),
+    ("ALTER DATABASE lab8db SET work_mem = '64MB'", False),
+    ("SELECT 'VACUUM'", False),
+    ("DELETE FROM vacuum_log", False),
+])
+def test_no_transaction_sql(statement, expected):
+    assert bool(client._NO_TRANSACTION_SQL.match(statement)) is expected
+
+
+class _Cursor:
+    description = None
+    rowcount = -1
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.conn.log.append(("execute", statement, self.conn.autocommit))
+        self.rowcount = 1 if statement.startswith("UPDATE") else -1
+        if statement.startswith("FAIL"):
+            raise client.Error("fail")
+
+
+class _Connection:
+    """Записує виконані оператори та фіксації замість справжньої БД."""
+
+    def __init__(self):
+        self.autocommit = False
+        self.log = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+
+def test_no_transaction_statement_commits_previous_batch(capsys):
+    conn = _Connection()
+    summary = client.run_sql_script(
+        conn, ["UPDATE a", "VACUUM", "UPDATE b", "FAIL"], batch_size=10)
+
+    assert conn.log == [
+        ("execute", "UPDATE a", False),
+        ("commit",),
+        ("execute", "VACUUM", True),
+        ("execute", "UPDATE b", False),
+        ("execute", "FAIL", False),
+        ("rollback",),
+    ]
+    assert summary["batches"] == 3
+    assert summary["rows"] == 1  # UPDATE b відкочено разом з пакетом
+    assert summary["failed"] == 1
+    assert summary["stopped"]
+    out = capsys.readouterr().out
+    assert "(зафіксовано)" in out and "(поза транзакцією)" in out
+    assert "(відкочено)" in out
@@ -0,0 +1,356 @@
+"""
+Асинхронний DAO для таблиці clients (лаб. 9) на драйвері asyncpg.
+
+AsyncClientDAO — відповідник ClientDAO з lab9_client: ті самі операції,
+але кожна — корутина, а підключення береться з асинхронного пулу
+asyncpg. Завдяки цьому багато get_by_id / insert можна виконувати
+одночасно (asyncio.gather), а get_all — читати потоково через
+async for по серверному курсору.
+
+Запуск бенчмарку (порівняння з синхронним ClientDAO):
+    pip install asyncpg
+    python lab9_async.py --configs local docker --ops 2000 --concurrency 1 10 100
+"""
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, List, Optional
+
+from psycopg2 import Error, InterfaceError
+
+try:
+    import asyncpg
+except ImportError:  # необов'язкова залежність: потрібна лише цьому модулю
+    asyncpg = None
+
+import lab9_client as lab9
+import lab9_bench
+
+# Розмір асинхронного пулу за замовчуванням; у бенчмарку такий самий
+# розмір має і синхронний пул, щоб порівнювати лише модель виконання
+ASYNC_POOL_SIZE = 20
+
+DEFAULT_OPS = 2000
+DEFAULT_CONCURRENCY = (1, 10, 100)
+
+SELECT_COLUMNS = "SELECT id, name, email, age, created_at FROM clients"
+
+
+# ----------- Пул -----------
+
+def _connect_kwargs(config: dict) -> dict:
+    """Конфігурація psycopg2 (LOCAL_DB_CONFIG / DOCKER_DB_CONFIG) -> параметри asyncpg."""
+    kwargs = {
+        "host": config["host"],
+        "port": config["port"],
+        "database": config["dbname"],
+        "user": config["user"],
+        "password": config["password"],
+    }
+    # options="-c search_path=..." (як у lab9_bench) -> server_settings
+    settings = {}
+    for option in config.get("options", "").split("-c"):
+        key, sep, value = option.strip().partition("=")
+        if sep:
+            settings[key.strip()] = value.strip()
+    if settings:
+        kwargs["server_settings"] = settings
+    return kwargs
+
+
+async def create_pool(config: dict, min_size: int = 1,
+                      max_size: int = ASYNC_POOL_SIZE) -> "asyncpg.Pool":
+    """
+    Асинхронний пул підключень до БД з конфігурації. asyncpg сам
+    кешує підготовлені оператори на кожному підключенні, тож повторні
+    запити однієї форми не розбираються сервером заново.
+    """
+    if asyncpg is None:
+        raise RuntimeError("Для асинхронного DAO потрібен пакет asyncpg: pip install asyncpg")
+    return await asyncpg.create_pool(min_size=min_size, max_size=max_size,
+                                     **_connect_kwargs(config))
+
+
+# ----------- Асинхронний DAO -----------
+
+@lru_cache(maxsize=None)
+def _update_sql(fields: tuple) -> str:
+    """UPDATE лише для полів fields з плейсхолдерами asyncpg ($1, $2, ...)."""
+    assignments = ", ".join(f"{name} = ${i}" for i, name in enumerate(fields, 1))
+    return f"UPDATE clients SET {assignments} WHERE id = ${len(fields) + 1};"
+
+
+class AsyncClientDAO:
+    """
+    DAO для clients поверх пулу asyncpg. Кожен виклик бере підключення
+    з пулу лише на час свого запиту, тому одночасні корутини працюють
+    на різних підключеннях (не більше розміру пулу).
+    """
+
+    def __init__(self, pool: "asyncpg.Pool"):
+        self.pool = pool
+
+    async def get_by_id(self, client_id: int) -> Optional[lab9.ClientRecord]:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(f"{SELECT_COLUMNS} WHERE id = $1;", client_id)
+        return lab9.ClientRecord.from_row(tuple(row)) if row else None
+
+    async def get_many(self, ids: Iterable[int]) -> List[Optional[lab9.ClientRecord]]:
+        """get_by_id для кожного id одночасно; порядок результатів — як у ids."""
+        return await asyncio.gather(*(self.get_by_id(client_id) for client_id in ids))
+
+    async def insert(self, client: lab9.ClientRecord) -> lab9.ClientRecord:
+        async with self.pool.acquire() as conn:
+            client.id, client.created_at = await conn.fetchrow(
+                "INSERT INTO clients (name, email, age) VALUES ($1, $2, $3) "
+                "RETURNING id, created_at;",
+                client.name, client.email, client.age,
+            )
+        client.mark_clean()
+        return client
+
+    async def insert_concurrently(
+            self, clients: Iterable[lab9.ClientRecord]) -> List[lab9.ClientRecord]:
+        """Окремий INSERT для кожного запису, усі одночасно (кожен — своя транзакція)."""
+        return await asyncio.gather(*(self.insert(client) for client in clients))
+
+    async def update(self, client: lab9.ClientRecord):
+        """UPDATE лише змінених полів; без змін запит не виконується."""
+        changes = client.changed_fields()
+        if not changes:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.execute(_update_sql(tuple(changes)), *changes.values(), client.id)
+        client.mark_clean()
+
+    async def delete(self, client_id: int):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM clients WHERE id = $1;", client_id)
+
+    async def iter_all(self, batch_size: int = lab9.ITER_BATCH_SIZE
+                       ) -> AsyncIterator[lab9.ClientRecord]:
+        """
+        Потоковий обхід усіх клієнтів у порядку id: серверний курсор
+        у транзакції, рядки передаються порціями по batch_size.
+
+        Поки генератор не вичерпано, він тримає підключення з пулу й
+        відкриту транзакцію. Якщо обхід переривається раніше (break,
+        виняток), генератор треба закрити явно — await rows.aclose() —
+        або обходити через stream_all(), інакше підключення повернеться
+        в пул лише при збиранні сміття.
+        """
+        conn = await self.pool.acquire()
+        try:
+            async with conn.transaction():
+                cursor = conn.cursor(f"{SELECT_COLUMNS} ORDER BY id;", prefetch=batch_size)
+                async for row in cursor:
+                    yield lab9.ClientRecord.from_row(tuple(row))
+        finally:
+            await self.pool.release(conn)
+
+    @asynccontextmanager
+    async def stream_all(self, batch_size: int = lab9.ITER_BATCH_SIZE):
+        """
+        iter_all, що гарантовано звільняє підключення при виході з блоку:
+
+            async with dao.stream_all() as clients:
+                async for client in clients:
+                    if ...:
+                        break
+        """
+        rows = self.iter_all(batch_size)
+        try:
+            yield rows
+        finally:
+            await rows.aclose()
+
+    async def get_all(self) -> List[lab9.ClientRecord]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f"{SELECT_COLUMNS} ORDER BY id;")
+        return [lab9.ClientRecord.from_row(tuple(row)) for row in rows]
+
+
+# ----------- Бенчмарк: sync vs async -----------
+
+class _Operations:
+    """Аргументи операцій для серії: випадкові id та унікальні нові клієнти."""
+
+    def __init__(self, size, count, seed, tag):
+        rng = random.Random(seed)
+        self.ids = [rng.randint(1, size) for _ in range(count)]
+        stamp = time.time_ns()
+        self.clients = [
+            lab9.ClientRecord(name=f"Async bench {i}",
+                              email=f"{tag}-{i}-{stamp}@bench.example",
+                              age=rng.randint(18, 90))
+            for i in range(count)
+        ]
+
+
+def run_sync(pool: lab9.ConnectionPool, op, count: int, concurrency: int) -> dict:
+    """count викликів op(dao, i) з concurrency потоків на синхронному пулі."""
+    timings = []
+
+    def task(i):
+        started = time.perf_counter()
+        conn = pool.getconn()
+        if conn is None:
+            raise InterfaceError("Не вдалося отримати підключення.")
+        try:
+            op(lab9.ClientDAO(conn), i)
+        finally:
+            conn.close()
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(task, range(count)))
+    return lab9_bench.latency_stats(timings, time.perf_counter() - started)
+
+
+async def run_async(dao: AsyncClientDAO, op, count: int, concurrency: int) -> dict:
+    """count викликів await op(dao, i), не більше concurrency одночасно."""
+    timings = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def task(i):
+        async with limit:
+            started = time.perf_counter()
+            await op(dao, i)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(task(i) for i in range(count)))
+    return lab9_bench.latency_stats(timings, time.perf_counter() - started)
+
+
+def _cleanup(pool: lab9.ConnectionPool, clients):
+    conn = pool.getconn()
+    if conn is None:
+        print("Не вдалося отримати підключення: вставлені записи не видалено.")
+        return
+    try:
+        lab9.ClientDAO(conn).delete_many(c.id for c in clients if c.id is not None)
+    finally:
+        conn.close()
+
+
+async def benchmark_config(label, config, size, count, levels, pool_size, seed):
+    """get_by_id та insert через ClientDAO і AsyncClientDAO для кожного рівня одночасності."""
+    if not lab9_bench.seed_dataset(config, size, seed):
+        print(f"Пропуск {label}: немає підключення.")
+        return None
+
+    cfg = lab9_bench.bench_config(config)
+    sync_pool = lab9.ConnectionPool(cfg, min_size=1, max_size=pool_size)
+    async_pool = await create_pool(cfg, max_size=pool_size)
+    dao = AsyncClientDAO(async_pool)
+    results = {}
+    try:
+        for level in levels:
+            sync_ops = _Operations(size, count, seed + level, f"sync-{label}-{level}")
+            async_ops = _Operations(size, count, seed + level, f"async-{label}-{level}")
+            try:
+                results[str(level)] = {
+                    "sync": {
+                        "get_by_id": run_sync(
+                            sync_pool, lambda d, i: d.get_by_id(sync_ops.ids[i]),
+                            count, level),
+                        "insert": run_sync(
+                            sync_pool, lambda d, i: d.insert(sync_ops.clients[i]),
+                            count, level),
+                    },
+                    "async": {
+                        "get_by_id": await run_async(
+                            dao, lambda d, i: d.get_by_id(async_ops.ids[i]),
+                            count, level),
+                        "insert": await run_async(
+                            dao, lambda d, i: d.insert(async_ops.clients[i]),
+                            count, level),
+                    },
+                }
+            finally:
+                # вставлені записи видаляються, щоб розмір набору не змінювався
+                _cleanup(sync_pool, sync_ops.clients + async_ops.clients)
+    finally:
+        await async_pool.close()
+        sync_pool.close()
+    return results
+
+
+def print_report(report):
+    for run in report["runs"]:
+        print(f"\n=== {run['config']} | {run['size']} рядків | пул {report['pool_size']} ===")
+        print(f"{'одночасно':>9} {'операція':10} {'sync оп/с':>10} {'async оп/с':>11} "
+              f"{'sync p95':>9} {'async p95':>10} {'async/sync':>11}")
+        print("-" * 78)
+        for level, apis in run["results"].items():
+            for op in ("get_by_id", "insert"):
+                sync, async_ = apis["sync"][op], apis["async"][op]
+                ratio = async_["throughput_ops_s"] / sync["throughput_ops_s"] \
+                    if sync["throughput_ops_s"] else 0.0
+                print(f"{level:>9} {op:10} {sync['throughput_ops_s']:10.1f} "
+                      f"{async_['throughput_ops_s']:11.1f} {sync['p95_ms']:9.3f} "
+                      f"{async_['p95_ms']:10.3f} {ratio:10.2f}x")
+
+
+async def run_suite(config_names=("local", "docker"), size=lab9_bench.DEFAULT_SIZES[0],
+                    count=DEFAULT_OPS, levels=DEFAULT_CONCURRENCY,
+                    pool_size=ASYNC_POOL_SIZE, seed=42, output=None):
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "ops": count,
+        "pool_size": pool_size,
+        "concurrency": list(levels),
+        "seed": seed,
+        "runs": [],
+    }
+    for name in config_names:
+        try:
+            results = await benchmark_config(name, lab9_bench.CONFIGS[name], size,
+                                             count, levels, pool_size, seed)
+        except (Error, asyncpg.PostgresError, OSError) as e:
+            print(f"Помилка бенчмарку для {name}: {e}")
+            continue
+        if results is not None:
+            report["runs"].append({"config": name, "size": size, "results": results})
+
+    print_report(report)
+
+    lab9_bench.write_report(report, "lab9_async", output)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк синхронного і асинхронного DAO (лаб. 9)")
+    parser.add_argument("--configs", nargs="+", choices=sorted(lab9_bench.CONFIGS),
+                        default=["local", "docker"])
+    parser.add_argument("--size", type=int, default=lab9_bench.DEFAULT_SIZES[0],
+                        help="розмір набору даних у lab9_bench.clients")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS,
+                        help="кількість операцій кожного типу на рівень одночасності")
+    parser.add_argument("--concurrency", nargs="+", type=int,
+                        default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--pool-size", type=int, default=ASYNC_POOL_SIZE,
+                        help="розмір пулу підключень (однаковий для sync і async)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл JSON (за замовчуванням bench_results/...)")
+    args = parser.parse_args()
+
+    if args.size <= 0 or args.ops <= 0 or args.pool_size <= 0 \
+            or any(level <= 0 for level in args.concurrency):
+        parser.error("розмір, кількість операцій, пул і одночасність мають бути додатними")
+    if asyncpg is None:
+        parser.error("потрібен пакет asyncpg: pip install asyncpg")
+
+    asyncio.run(run_suite(args.configs, args.size, args.ops, args.concurrency,
+                          args.pool_size, args.seed, args.output))
+
+
+if __name__ == "__main__":
+    main()
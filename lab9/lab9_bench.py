@@ -0,0 +1,337 @@
+"""
+Бенчмарк операцій Active Record та DAO для лабораторної роботи №9.
+
+Для кожної конфігурації БД (локальна / Docker) і кожного розміру набору
+даних бенчмарк:
+  1. створює окрему схему lab9_bench з таблицею clients і заповнює її
+     синтетичними даними (робочі дані в public.clients не зачіпаються);
+  2. виконує операції all / find / save (INSERT і UPDATE) / delete
+     через Active Record і через DAO з прогрівом і багатьма повтореннями;
+  3. рахує пропускну здатність та p50/p95/p99 затримки;
+  4. записує результати в JSON, щоб порівнювати запуски між собою.
+
+Запуск:
+    python lab9_bench.py --sizes 1000 100000 --iterations 1000 --warmup 100
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from psycopg2 import Error
+
+import lab9_client as lab9
+import lab9_dataset
+
+BENCH_SCHEMA = "lab9_bench"
+
+CONFIGS = {
+    "local": lab9.LOCAL_DB_CONFIG,
+    "docker": lab9.DOCKER_DB_CONFIG,
+}
+
+DEFAULT_SIZES = (1_000,)
+DEFAULT_ITERATIONS = 1000
+DEFAULT_WARMUP = 100
+# all() / iter_all() читають всю таблицю, тому для неї окрема (менша) кількість повторень
+DEFAULT_ALL_ITERATIONS = 5
+
+
+# ----------- Статистика -----------
+
+def percentile(sorted_values, p):
+    """Перцентиль методом найближчого рангу для відсортованого списку."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_stats(timings, total_seconds=None):
+    """
+    Підсумок вимірів (у секундах): пропускна здатність і затримки в мс.
+    total_seconds — загальний час серії (для throughput), за замовчуванням
+    сума вимірів.
+    """
+    ordered = sorted(timings)
+    total = total_seconds if total_seconds is not None else sum(ordered)
+    return {
+        "iterations": len(ordered),
+        "throughput_ops_s": len(ordered) / total if total else 0.0,
+        "mean_ms": statistics.mean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def write_report(report, prefix, output=None):
+    """
+    Записує звіт у JSON: у файл output або, за замовчуванням,
+    у bench_results/<prefix>_<дата>.json. Повертає шлях до файлу.
+    """
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = os.path.join("bench_results", f"{prefix}_{stamp}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультати записано в {output}")
+    return output
+
+
+def measure(op, iterations, warmup):
+    """Виконує op() warmup разів без вимірів, потім iterations разів з вимірами."""
+    for _ in range(warmup):
+        op()
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        op_started = time.perf_counter()
+        op()
+        timings.append(time.perf_counter() - op_started)
+    return latency_stats(timings, time.perf_counter() - started)
+
+
+# ----------- Підготовка даних -----------
+
+def bench_config(config: dict) -> dict:
+    """Конфігурація, у якій clients — це таблиця схеми lab9_bench."""
+    return dict(config, options=f"-c search_path={BENCH_SCHEMA}")
+
+
+def seed_dataset(config: dict, size: int, seed: int = 42) -> bool:
+    """
+    Створює схему lab9_bench і заповнює її таблицю clients size рядками
+    (id від 1 до size) генератором lab9_dataset. Якщо таблиця вже містить
+    рівно size рядків, повторне заповнення пропускається. Повертає False,
+    якщо немає підключення.
+    """
+    conn = lab9.get_connection(config)
+    if conn is None:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA};")
+    finally:
+        conn.close()
+
+    cfg = bench_config(config)
+    conn = lab9.get_connection(cfg)
+    if conn is None:
+        return False
+    try:
+        with redirect_stdout(io.StringIO()):
+            lab9.init_db(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*), coalesce(max(id), 0) FROM clients;")
+            count, max_id = cur.fetchone()
+    finally:
+        conn.close()
+    if count == size and max_id == size:
+        return True
+
+    print(f"Заповнення {BENCH_SCHEMA}.clients: {size} рядків...")
+    return lab9_dataset.load_dataset(cfg, size, seed, truncate=True)
+
+
+# ----------- Операції -----------
+
+class _Workload:
+    """
+    Стан для операцій однієї серії: генератор випадкових id та записи,
+    створені операцією save/insert, які далі оновлюються та видаляються
+    (тож розмір набору даних після серії не змінюється).
+    """
+
+    def __init__(self, size, seed, tag):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.tag = tag
+        self.counter = 0
+        self.created = []
+        self.cursor = 0
+
+    def random_id(self):
+        return self.rng.randint(1, self.size)
+
+    def new_client(self):
+        self.counter += 1
+        return lab9.ClientRecord(
+            name=f"Bench {self.counter}",
+            email=f"{self.tag}-{self.counter}-{time.time_ns()}@bench.example",
+            age=self.rng.randint(18, 90),
+        )
+
+    def next_created(self):
+        client = self.created[self.cursor % len(self.created)]
+        self.cursor += 1
+        client.age = (client.age or 0) % 90 + 1
+        return client
+
+
+def _drain(records):
+    for _ in records:
+        pass
+
+
+def active_record_ops(work):
+    def save_insert():
+        client = work.new_client()
+        client.save()
+        work.created.append(client)
+
+    return {
+        "all": lambda: lab9.ClientRecord.all(),
+        "iter_all": lambda: _drain(lab9.ClientRecord.iter_all()),
+        "find": lambda: lab9.ClientRecord.find(work.random_id()),
+        "save_insert": save_insert,
+        "save_update": lambda: work.next_created().save(),
+        "delete": lambda: work.created.pop().delete(),
+    }
+
+
+def dao_ops(work, dao):
+    def insert():
+        work.created.append(dao.insert(work.new_client()))
+
+    return {
+        "all": dao.get_all,
+        "iter_all": lambda: _drain(dao.iter_all()),
+        "find": lambda: dao.get_by_id(work.random_id()),
+        "save_insert": insert,
+        "save_update": lambda: dao.update(work.next_created()),
+        "delete": lambda: dao.delete(work.created.pop().id),
+    }
+
+
+def _run_ops(ops, iterations, warmup, all_iterations):
+    # порядок важливий: delete видаляє рівно ті записи, які створив save_insert
+    results = {}
+    for name, op in ops.items():
+        if name in ("all", "iter_all"):
+            results[name] = measure(op, all_iterations, min(1, warmup))
+        else:
+            results[name] = measure(op, iterations, warmup)
+    return results
+
+
+def benchmark_config(label, config, size, iterations, warmup, all_iterations, seed):
+    """Усі операції AR та DAO для однієї конфігурації та розміру даних."""
+    if not seed_dataset(config, size, seed):
+        print(f"Пропуск {label}: немає підключення.")
+        return None
+
+    cfg = bench_config(config)
+    saved_config = lab9.ACTIVE_DB_CONFIG
+    lab9.ACTIVE_DB_CONFIG = cfg
+    results = {}
+    try:
+        # save()/delete() в Active Record друкують повідомлення — приглушуємо
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            work = _Workload(size, seed, f"ar-{label}")
+            results["active_record"] = _run_ops(
+                active_record_ops(work), iterations, warmup, all_iterations
+            )
+
+            conn = lab9.get_pool(cfg).getconn()
+            if conn is None:
+                raise Error("Не вдалося отримати підключення для DAO.")
+            try:
+                work = _Workload(size, seed, f"dao-{label}")
+                results["dao"] = _run_ops(
+                    dao_ops(work, lab9.ClientDAO(conn)), iterations, warmup,
+                    all_iterations,
+                )
+            finally:
+                conn.close()
+    finally:
+        lab9.ACTIVE_DB_CONFIG = saved_config
+    return results
+
+
+# ----------- Звіт -----------
+
+def print_report(report):
+    for run in report["runs"]:
+        print(f"\n=== {run['config']} | {run['size']} рядків ===")
+        print(f"{'api':14} {'операція':12} {'оп/с':>10} {'p50 мс':>9} "
+              f"{'p95 мс':>9} {'p99 мс':>9}")
+        print("-" * 68)
+        for api, ops in run["results"].items():
+            for op, st in ops.items():
+                print(f"{api:14} {op:12} {st['throughput_ops_s']:10.1f} "
+                      f"{st['p50_ms']:9.3f} {st['p95_ms']:9.3f} {st['p99_ms']:9.3f}")
+
+
+def run_suite(config_names=("local", "docker"), sizes=DEFAULT_SIZES,
+              iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP,
+              all_iterations=DEFAULT_ALL_ITERATIONS, seed=42, output=None):
+    """
+    Запускає бенчмарк для вказаних конфігурацій і розмірів, друкує звіт
+    і записує його в JSON. Повертає словник звіту.
+    """
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "warmup": warmup,
+        "all_iterations": all_iterations,
+        "seed": seed,
+        "runs": [],
+    }
+    for size in sizes:
+        for name in config_names:
+            try:
+                results = benchmark_config(name, CONFIGS[name], size, iterations,
+                                           warmup, all_iterations, seed)
+            except Error as e:
+                print(f"Помилка бенчмарку для {name}: {e}")
+                continue
+            if results is not None:
+                report["runs"].append({"config": name, "size": size, "results": results})
+
+    print_report(report)
+
+    write_report(report, "lab9_bench", output)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк Active Record / DAO (лаб. 9)")
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS),
+                        default=["local", "docker"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="розміри наборів даних, напр. 1000 100000 1000000")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--all-iterations", type=int, default=DEFAULT_ALL_ITERATIONS,
+                        help="повторень для all / get_all")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл JSON (за замовчуванням bench_results/...)")
+    args = parser.parse_args()
+
+    if args.iterations <= 0 or args.warmup < 0 or args.all_iterations <= 0 \
+            or any(size <= 0 for size in args.sizes):
+        parser.error("кількості повторень і розміри мають бути додатними")
+
+    try:
+        run_suite(args.configs, args.sizes, args.iterations, args.warmup,
+                  args.all_iterations, args.seed, args.output)
+    finally:
+        lab9.close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,29 @@
 import psycopg2
-from psycopg2 import Error
-from dataclasses import dataclass
-from typing import List, Optional
+from psycopg2 import Error, InterfaceError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extras import execute_values
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import count, islice
+from typing import Iterable, Iterator, List, Optional, Union
+import heapq
+import json
+import select
+import sys
+import threading
 import time
+import weakref
+import zlib
+
+# ClientRecord оголошено як @dataclass(slots=True), що є лише з Python 3.10
+if sys.version_info < (3, 10):
+    raise RuntimeError("Лаб. 9 потребує Python 3.10 або новішого.")
 
 # Конфігурації для двох БД: локальної та контейнеризованої
 LOCAL_DB_CONFIG = {
@@ -13,208 +34,2419 @@ LOCAL_DB_CONFIG = {
     "password": "labpass",
 }
 
-DOCKER_DB_CONFIG = {
-    "host": "127.0.0.1",   # Docker публікує порт на localhost
-    "port": 5433,          # зовнішній порт з docker-compose
-    "dbname": "lab9db",
-    "user": "labuser",
-    "password": "labpass",
-}
+DOCKER_DB_CONFIG = {
+    "host": "127.0.0.1",   # Docker публікує порт на localhost
+    "port": 5433,          # зовнішній порт з docker-compose
+    "dbname": "lab9db",
+    "user": "labuser",
+    "password": "labpass",
+}
+
+# Глобальна змінна для збереження активної конфігурації
+ACTIVE_DB_CONFIG = LOCAL_DB_CONFIG
+
+
+def get_connection(config: dict):
+    """Повертає нове підключення до БД за вказаною конфігурацією."""
+    try:
+        conn = psycopg2.connect(**config)
+        conn.autocommit = True
+        return conn
+    except Error as e:
+        print("Помилка підключення до бази даних:", e)
+        return None
+
+
+def init_db(conn):
+    """Створення таблиці clients, якщо вона ще не існує."""
+    sql = """
+    CREATE TABLE IF NOT EXISTS clients (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) UNIQUE NOT NULL,
+        age INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    print("Таблиця clients готова до роботи.")
+
+
+# ----------- Пул підключень -----------
+
+# Параметри пулу за замовчуванням (окремий пул для кожної конфігурації БД)
+POOL_SETTINGS = {
+    "min_size": 1,        # скільки підключень тримати відкритими завжди
+    "max_size": 10,       # верхня межа одночасно відкритих підключень
+    "max_idle": 300.0,    # через скільки секунд простою закривати зайві
+    "check_after": 5.0,   # після скількох секунд простою перевіряти SELECT 1
+    "timeout": 30.0,      # скільки чекати вільного підключення
+}
+
+
+class PooledConnection:
+    """
+    Підключення, видане пулом. Поводиться як звичайне підключення psycopg2,
+    але close() не закриває його, а повертає в пул.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    def _raw(self):
+        if self._conn is None:
+            raise InterfaceError("Підключення вже повернуто в пул.")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._raw(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw(), name, value)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.putconn(conn)
+
+    def __enter__(self):
+        self._raw().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw().__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # страховка: забуте підключення повертається в пул, а не "витікає"
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Потокобезпечний пул підключень до однієї БД.
+
+    - підключення видаються у порядку LIFO, тож "гарячі" підключення
+      використовуються повторно, а зайві довго простоюють і закриваються;
+    - при видачі підключення, що простоювало довше check_after секунд,
+      перевіряється запитом SELECT 1, мертві відкидаються;
+    - зайві підключення закриваються при getconn() / putconn(): фонового
+      потоку немає, тож пул, до якого зовсім не звертаються, тримає їх
+      до наступного звернення (або до close());
+    - якщо відкрито max_size підключень, getconn() чекає до timeout секунд.
+    """
+
+    def __init__(self, config, min_size=1, max_size=10, max_idle=300.0,
+                 check_after=5.0, timeout=30.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Потрібно 0 <= min_size <= max_size, max_size >= 1.")
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+        self._idle = []          # [(conn, час повернення)], найстаріші на початку
+        self._size = 0           # відкрито всього (вільні + видані)
+        self._cond = threading.Condition()
+        self._closed = False
+        # скільки разів і як довго getconn() чекав, поки звільниться підключення
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+        for _ in range(min_size):
+            conn = get_connection(config)
+            if conn is None:
+                break
+            self._size += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def _evict_idle(self):
+        """Закриває підключення, що простоюють довше max_idle (під замком)."""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size \
+                and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            conn.close()
+
+    def _is_alive(self, conn, released_at):
+        if conn.closed:
+            return False
+        if time.monotonic() - released_at < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            return True
+        except Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        finally:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+
+    def getconn(self) -> Optional[PooledConnection]:
+        """
+        Видає підключення з пулу (або відкриває нове).
+        Повертає None, якщо підключитися не вдалося або вийшов timeout.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    print("Пул підключень закрито.")
+                    return None
+                self._evict_idle()
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        print("Немає вільних підключень у пулі (timeout).")
+                        return None
+                    wait_started = time.monotonic()
+                    self._cond.wait(remaining)
+                    self.waits += 1
+                    self.wait_seconds += time.monotonic() - wait_started
+                    continue
+
+            if conn is None:
+                conn = get_connection(self.config)
+                if conn is None:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    return None
+                return PooledConnection(self, conn)
+
+            if self._is_alive(conn, released_at):
+                return PooledConnection(self, conn)
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        """Поточний розмір пулу та лічильники очікування вільного підключення."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "timeouts": self.timeouts,
+            }
+
+    def putconn(self, conn):
+        """
+        Повертає підключення в пул: незавершену транзакцію відкочує
+        і відновлює autocommit, як у get_connection.
+        """
+        if not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.autocommit:
+                    conn.autocommit = True
+            except Error:
+                conn.close()
+        with self._cond:
+            if conn.closed or self._closed:
+                self._size -= 1
+                if not conn.closed:
+                    conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._evict_idle()
+            self._cond.notify()
+
+    def close(self):
+        """Закриває всі вільні підключення; видані закриються при поверненні."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                conn.close()
+            self._cond.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config: dict) -> ConnectionPool:
+    """Окремий пул для кожної конфігурації (LOCAL_DB_CONFIG / DOCKER_DB_CONFIG)."""
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(config, **POOL_SETTINGS)
+        return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+# ----------- Prepared statements -----------
+
+# Поля клієнта, які можна змінювати (порядок визначає форму SET-списку)
+TRACKED_FIELDS = ("name", "email", "age")
+
+# Для кожного підключення: текст SQL -> ім'я серверного prepared statement
+_prepared_statements = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=None)
+def _update_sql(fields: tuple) -> str:
+    """Форма UPDATE для набору змінених полів (кешується, не більше 7 форм)."""
+    assignments = ", ".join(f"{name} = ${n}" for n, name in enumerate(fields, 1))
+    return f"UPDATE clients SET {assignments} WHERE id = ${len(fields) + 1}"
+
+
+# Типи колонок для VALUES у масовому UPDATE (щоб NULL мав однозначний тип)
+_COLUMN_TYPES = {"id": "integer", "name": "varchar", "email": "varchar", "age": "integer"}
+
+
+@lru_cache(maxsize=None)
+def _update_many_sql(fields: tuple):
+    """Форма UPDATE ... FROM (VALUES ...) та шаблон рядка VALUES для набору полів."""
+    assignments = ", ".join(f"{name} = v.{name}" for name in fields)
+    columns = ("id",) + fields
+    sql = (
+        f"UPDATE clients AS c SET {assignments} "
+        f"FROM (VALUES %s) AS v({', '.join(columns)}) WHERE c.id = v.id"
+    )
+    template = "(" + ", ".join(f"%s::{_COLUMN_TYPES[name]}" for name in columns) + ")"
+    return sql, template
+
+
+def _execute_prepared(cur, sql: str, params):
+    """
+    Виконує sql (з параметрами $1, $2, ...) через PREPARE / EXECUTE:
+    кожна форма запиту розбирається й планується сервером один раз
+    на підключення.
+    """
+    names = _prepared_statements.setdefault(cur.connection, {})
+    name = names.get(sql)
+    if name is None:
+        name = f"lab9_stmt_{len(names) + 1}"
+        cur.execute(f"PREPARE {name} AS {sql}")
+        names[sql] = name
+    placeholders = ", ".join(["%s"] * len(params))
+    cur.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+
+
+# ----------- Кеш клієнтів за id -----------
+
+# Канал NOTIFY, у який тригер на clients надсилає id змінених / видалених рядків
+CHANGES_CHANNEL = "clients_changed"
+
+CACHE_SETTINGS = {
+    "max_size": 10_000,   # скільки клієнтів тримати в кеші
+    "ttl": 60.0,          # скільки секунд запис вважається свіжим
+}
+
+# Тригери на рівні оператора: одне повідомлення на UPDATE/DELETE зі списком
+# id (через transition table); якщо список задовгий для NOTIFY — "*"
+CHANGES_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION clients_notify_change() RETURNS trigger AS $$
+DECLARE
+    payload text;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        payload := '*';
+    ELSE
+        SELECT string_agg(id::text, ',') INTO payload FROM old_rows;
+        IF payload IS NULL THEN
+            RETURN NULL;
+        END IF;
+        IF length(payload) > 7900 THEN
+            payload := '*';
+        END IF;
+    END IF;
+    PERFORM pg_notify('{CHANGES_CHANNEL}', payload);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS clients_notify_update ON clients;
+CREATE TRIGGER clients_notify_update AFTER UPDATE ON clients
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_notify_change();
+
+DROP TRIGGER IF EXISTS clients_notify_delete ON clients;
+CREATE TRIGGER clients_notify_delete AFTER DELETE ON clients
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_notify_change();
+
+DROP TRIGGER IF EXISTS clients_notify_truncate ON clients;
+CREATE TRIGGER clients_notify_truncate AFTER TRUNCATE ON clients
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_notify_change();
+"""
+
+CHANGES_DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS clients_notify_update ON clients;
+DROP TRIGGER IF EXISTS clients_notify_delete ON clients;
+DROP TRIGGER IF EXISTS clients_notify_truncate ON clients;
+DROP FUNCTION IF EXISTS clients_notify_change();
+"""
+
+
+class ClientCache:
+    """
+    Обмежений LRU-кеш клієнтів за id з TTL.
+
+    Зберігаються значення полів, а не об'єкти: get() щоразу повертає
+    новий ClientRecord, тож зміни в одного викликача не видно іншим.
+    Запис, завантажений з БД, кладеться в кеш лише якщо між початком
+    завантаження (load_token) і put() не було інвалідацій — інакше
+    в кеш могло б потрапити застаріле значення.
+    """
+
+    def __init__(self, max_size=10_000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()   # id -> (термін дії, рядок)
+        self._lock = threading.Lock()
+        self._invalidation_seq = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, client_id: int) -> Optional["ClientRecord"]:
+        with self._lock:
+            entry = self._data.get(client_id)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._data[client_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(client_id)
+            self.hits += 1
+        return ClientRecord.from_row(entry[1])
+
+    def load_token(self) -> int:
+        with self._lock:
+            return self._invalidation_seq
+
+    def put(self, client: "ClientRecord", token: Optional[int] = None):
+        row = (client.id, client.name, client.email, client.age, client.created_at)
+        with self._lock:
+            if token is not None and token != self._invalidation_seq:
+                return
+            self._data[client.id] = (time.monotonic() + self.ttl, row)
+            self._data.move_to_end(client.id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *client_ids: int):
+        with self._lock:
+            self._invalidation_seq += 1
+            for client_id in client_ids:
+                if self._data.pop(client_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._invalidation_seq += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def apply_notification(self, payload: str):
+        """Обробляє payload з каналу clients_changed ("1,2,3" або "*")."""
+        if payload == "*":
+            self.clear()
+        else:
+            self.invalidate(*(int(part) for part in payload.split(",") if part))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def _execute_script(conn, sql):
+    """Виконує кілька операторів в одній транзакції на autocommit-підключенні."""
+    with conn.cursor() as cur:
+        cur.execute("BEGIN;")
+        try:
+            cur.execute(sql)
+        except Error:
+            cur.execute("ROLLBACK;")
+            raise
+        cur.execute("COMMIT;")
+
+
+def install_change_notifications(conn):
+    """Встановлює (або оновлює) тригери NOTIFY на таблиці clients."""
+    _execute_script(conn, CHANGES_TRIGGER_SQL)
+
+
+def uninstall_change_notifications(conn):
+    """Видаляє тригери NOTIFY кешу з таблиці clients та їхню функцію."""
+    _execute_script(conn, CHANGES_DROP_TRIGGERS_SQL)
+
+
+def _drop_change_notifications(config):
+    """Видаляє тригери кешу через окреме підключення; помилку лише друкує."""
+    conn = get_connection(config)
+    if conn is None:
+        return
+    try:
+        uninstall_change_notifications(conn)
+    except Error as e:
+        print("Не вдалося видалити тригери NOTIFY:", e)
+    finally:
+        conn.close()
+
+
+class ChangeListener(threading.Thread):
+    """
+    Фоновий потік: LISTEN на каналі змін і передача кожного payload
+    у callback. При втраті з'єднання перепідключається і викликає
+    on_reconnect — повідомлення за час розриву могли загубитися.
+    Якщо callback падає, стан отримувача невідомий: помилка друкується,
+    і on_reconnect теж викликається для повного перезавантаження.
+    """
+
+    def __init__(self, config, channel, callback, on_reconnect=None):
+        super().__init__(daemon=True, name=f"listen-{channel}")
+        self.config = config
+        self.channel = channel
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _deliver(self, payload) -> bool:
+        """Передає payload у callback; False, якщо обробник упав."""
+        try:
+            self.callback(payload)
+        except Exception as e:
+            print(f"Помилка обробки повідомлення {self.channel}: {e!r}")
+            return False
+        return True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                conn = psycopg2.connect(**self.config)
+            except Error:
+                self._stop_event.wait(5.0)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                if self.on_reconnect is not None:
+                    self.on_reconnect()
+                while not self._stop_event.is_set():
+                    if not select.select([conn], [], [], 1.0)[0]:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        if not self._deliver(conn.notifies.pop(0).payload):
+                            # LISTEN активний, тож перезавантаження побачить
+                            # усе, що зафіксовано до нього, а нові зміни
+                            # прийдуть наступними повідомленнями
+                            conn.notifies.clear()
+                            if self.on_reconnect is not None:
+                                self.on_reconnect()
+            except (Error, OSError, ValueError):
+                self._stop_event.wait(1.0)
+            except Exception as e:
+                # непередбачена помилка (зокрема в on_reconnect) не зупиняє
+                # потік: після паузи — перепідключення і повторний on_reconnect
+                print(f"Помилка слухача {self.channel}: {e!r}")
+                self._stop_event.wait(1.0)
+            finally:
+                conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def enable_cache(config: dict, listen: bool = True, drop_triggers: bool = True,
+                 **settings) -> Optional[ClientCache]:
+    """
+    Вмикає кеш get_by_id / find для конфігурації. При listen=True
+    встановлює тригери NOTIFY на clients і запускає фоновий LISTEN,
+    тож зміни з інших процесів теж інвалідують кеш. При listen=False
+    тригери не потрібні і з drop_triggers=True видаляються, якщо
+    залишилися від попереднього ввімкнення.
+    """
+    key = tuple(sorted(config.items()))
+    with _caches_lock:
+        if key in _caches:
+            return _caches[key][0]
+    cache = ClientCache(**{**CACHE_SETTINGS, **settings})
+    listener = None
+    if not listen and drop_triggers:
+        _drop_change_notifications(config)
+    if listen:
+        conn = get_connection(config)
+        if conn is None:
+            return None
+        try:
+            install_change_notifications(conn)
+        except Error as e:
+            print("Не вдалося встановити тригери NOTIFY:", e)
+            return None
+        finally:
+            conn.close()
+        listener = ChangeListener(config, CHANGES_CHANNEL,
+                                  cache.apply_notification, cache.clear)
+        listener.start()
+    with _caches_lock:
+        _caches[key] = (cache, listener)
+    return cache
+
+
+def disable_cache(config: dict, drop_triggers: bool = True):
+    """
+    Вимикає кеш конфігурації та зупиняє його слухача. Тригери додають
+    NOTIFY до кожного UPDATE / DELETE / TRUNCATE clients, тому з
+    drop_triggers=True вони видаляються разом із функцією;
+    drop_triggers=False — якщо кеші інших процесів ще ними користуються.
+    """
+    with _caches_lock:
+        entry = _caches.pop(tuple(sorted(config.items())), None)
+    if entry is None:
+        return
+    if entry[1] is not None:
+        entry[1].stop()
+    if drop_triggers:
+        _drop_change_notifications(config)
+
+
+def get_cache(config: dict) -> Optional[ClientCache]:
+    """Кеш для конфігурації або None, якщо кеш не ввімкнено."""
+    entry = _caches.get(tuple(sorted(config.items())))
+    return entry[0] if entry else None
+
+
+# ----------- Active Record -----------
+
+# Скільки рядків серверний курсор передає за один мережевий обмін
+ITER_BATCH_SIZE = 2000
+
+# Лічильник для унікальних імен серверних курсорів
+_cursor_seq = count(1)
+
+
+@dataclass(slots=True)  # slots=True — Python 3.10+
+class ClientRecord:
+    """
+    Active Record: клас = таблиця, об'єкт = рядок.
+    Вміє сам себе зберігати / видаляти у БД.
+
+    Поля зберігаються в __slots__ (без __dict__ на кожен об'єкт),
+    а знімок для відстеження змін — кортежем, а не словником.
+    """
+    id: Optional[int] = None
+    name: str = ""
+    email: str = ""
+    age: Optional[int] = None
+    created_at: Optional[str] = None
+    # Значення TRACKED_FIELDS у БД на момент завантаження / останнього
+    # збереження; None — запис не завантажений з БД, усі поля вважаються зміненими
+    _original: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_row(cls, row) -> "ClientRecord":
+        """Об'єкт з рядка (id, name, email, age, created_at), позначений як незмінений."""
+        client = cls(*row)
+        client.mark_clean()
+        return client
+
+    def mark_clean(self):
+        """Запам'ятовує поточні значення полів як збережені в БД."""
+        self._original = tuple(getattr(self, name) for name in TRACKED_FIELDS)
+
+    def changed_fields(self) -> dict:
+        """Поля, змінені після завантаження: {поле: нове значення}."""
+        if self._original is None:
+            return {name: getattr(self, name) for name in TRACKED_FIELDS}
+        return {
+            name: getattr(self, name)
+            for name, original in zip(TRACKED_FIELDS, self._original)
+            if getattr(self, name) != original
+        }
+
+    @staticmethod
+    def _get_conn():
+        """
+        Отримати підключення до поточної активної БД з пулу.
+        close() повертає його в пул замість закриття.
+        """
+        return get_pool(ACTIVE_DB_CONFIG).getconn()
+
+    @classmethod
+    def all(cls) -> List["ClientRecord"]:
+        conn = cls._get_conn()
+        if conn is None:
+            return []
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+        return [cls.from_row(row) for row in rows]
+
+    @classmethod
+    def all_columnar(cls) -> "ClientResultSet":
+        """Усі клієнти як компактний набір колонок (див. ClientResultSet)."""
+        conn = cls._get_conn()
+        if conn is None:
+            return ClientResultSet()
+        try:
+            return ClientDAO(conn).get_all_columnar()
+        finally:
+            conn.close()
+
+    @classmethod
+    def iter_where(cls, query: Optional["ClientQuery"] = None,
+                   batch_size: int = ITER_BATCH_SIZE) -> Iterator["ClientRecord"]:
+        """
+        Лінивий обхід клієнтів активної БД за ClientQuery через серверний
+        курсор (див. ClientDAO.iter_where). Підключення повертається в пул,
+        коли генератор вичерпано або закрито.
+        """
+        conn = cls._get_conn()
+        if conn is None:
+            return
+        try:
+            yield from ClientDAO(conn).iter_where(query, batch_size)
+        finally:
+            conn.close()
+
+    @classmethod
+    def iter_all(cls, batch_size: int = ITER_BATCH_SIZE) -> Iterator["ClientRecord"]:
+        return cls.iter_where(batch_size=batch_size)
+
+    @classmethod
+    def find(cls, client_id: int) -> Optional["ClientRecord"]:
+        cache = get_cache(ACTIVE_DB_CONFIG)
+        token = None
+        if cache is not None:
+            cached = cache.get(client_id)
+            if cached is not None:
+                return cached
+            token = cache.load_token()
+        conn = cls._get_conn()
+        if conn is None:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT id, name, email, age, created_at FROM clients WHERE id = %s;",
+                    (client_id,),
+                )
+                row = cur.fetchone()
+        finally:
+            conn.close()
+        if row:
+            client = cls.from_row(row)
+            if cache is not None:
+                cache.put(client, token)
+            return client
+        return None
+
+    def save(self):
+        """
+        Якщо self.id порожній -> INSERT.
+        Якщо self.id заданий -> UPDATE лише змінених полів
+        (якщо нічого не змінилося, запит не виконується).
+        """
+        changes = self.changed_fields()
+        if self.id is not None and not changes:
+            print(f"Клієнт з id={self.id} не змінився, UPDATE пропущено.")
+            return
+        conn = self._get_conn()
+        if conn is None:
+            return
+        try:
+            with conn.cursor() as cur:
+                if self.id is None:
+                    cur.execute(
+                        """
+                        INSERT INTO clients (name, email, age)
+                        VALUES (%s, %s, %s)
+                        RETURNING id, created_at;
+                        """,
+                        (self.name, self.email, self.age),
+                    )
+                    self.id, self.created_at = cur.fetchone()
+                    print(f"Створено клієнта з id={self.id}")
+                else:
+                    _execute_prepared(
+                        cur,
+                        _update_sql(tuple(changes)),
+                        [*changes.values(), self.id],
+                    )
+                    print(f"Оновлено клієнта з id={self.id} "
+                          f"(поля: {', '.join(changes)})")
+                self.mark_clean()
+        finally:
+            conn.close()
+        cache = get_cache(ACTIVE_DB_CONFIG)
+        if cache is not None:
+            cache.invalidate(self.id)
+
+    def delete(self):
+        """Видалити поточний запис з БД."""
+        if self.id is None:
+            print("Неможливо видалити: id не встановлено.")
+            return
+        conn = self._get_conn()
+        if conn is None:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM clients WHERE id = %s;", (self.id,))
+        finally:
+            conn.close()
+        cache = get_cache(ACTIVE_DB_CONFIG)
+        if cache is not None:
+            cache.invalidate(self.id)
+        print(f"Клієнта з id={self.id} видалено.")
+
+
+# ----------- Набір результатів по колонках -----------
+
+class ClientResultSet(Sequence):
+    """
+    Результат запиту до clients, збережений по колонках: id — у масиві
+    array('q') (8 байт на рядок замість окремого int-об'єкта), решта
+    полів — у списках. Об'єкт ClientRecord створюється лише при
+    зверненні до рядка, тож великий результат не тримає в пам'яті
+    мільйон екземплярів класу.
+    """
+
+    __slots__ = ("ids", "names", "emails", "ages", "created_at")
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        self.ids = array("q")
+        self.names = []
+        self.emails = []
+        self.ages = []
+        self.created_at = []
+        self.extend(rows)
+
+    def extend(self, rows: Iterable[tuple]):
+        """Додає рядки (id, name, email, age, created_at)."""
+        for client_id, name, email, age, created_at in rows:
+            self.ids.append(client_id)
+            self.names.append(name)
+            self.emails.append(email)
+            self.ages.append(age)
+            self.created_at.append(created_at)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, index: int) -> tuple:
+        """Рядок як кортеж (id, name, email, age, created_at)."""
+        return (self.ids[index], self.names[index], self.emails[index],
+                self.ages[index], self.created_at[index])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            part = ClientResultSet()
+            part.ids = self.ids[index]
+            part.names = self.names[index]
+            part.emails = self.emails[index]
+            part.ages = self.ages[index]
+            part.created_at = self.created_at[index]
+            return part
+        return ClientRecord.from_row(self.row(index))
+
+    def __iter__(self) -> Iterator[ClientRecord]:
+        for row in zip(self.ids, self.names, self.emails, self.ages, self.created_at):
+            yield ClientRecord.from_row(row)
+
+    def __repr__(self):
+        return f"<ClientResultSet: {len(self)} рядків>"
+
+
+# ----------- Запити за критеріями -----------
+
+# Стовпці, за якими можна сортувати (і гортати keyset-курсором)
+ORDERABLE_COLUMNS = ("id", "email", "age", "created_at")
+NULLABLE_COLUMNS = ("age", "created_at")
+
+# Домен email як вираз: саме для нього радник пропонує індекс за виразом
+EMAIL_DOMAIN_SQL = "lower(split_part(email, '@', 2))"
+
+
+@dataclass(frozen=True)
+class ClientQuery:
+    """
+    Опис вибірки клієнтів, з якого генерується параметризований SQL:
+
+        query = (ClientQuery().age_between(18, 30).email_domain("gmail.com")
+                 .order_by("created_at", descending=True).limit(50))
+        page, cursor = dao.find_page(query)
+        next_page, cursor = dao.find_page(query.after(cursor))
+
+    Умови записуються так, щоб їх міг використати B-tree індекс:
+    діапазони — через >= / <, домен — через той самий вираз, що й
+    у запропонованому індексі, курсор — порівнянням рядків (стовпець, id).
+    Сортування за стовпцем, що допускає NULL, пропускає рядки з NULL
+    у ньому, інакше keyset-курсор був би неоднозначним.
+    """
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    domain: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    order: str = "id"
+    descending: bool = False
+    limit_rows: Optional[int] = None
+    cursor: Optional[tuple] = None
+
+    def age_between(self, min_age: Optional[int] = None,
+                    max_age: Optional[int] = None) -> "ClientQuery":
+        """Вік у межах [min_age, max_age]; None — без межі."""
+        return replace(self, min_age=min_age, max_age=max_age)
+
+    def email_domain(self, domain: str) -> "ClientQuery":
+        return replace(self, domain=domain.strip().lstrip("@").lower())
+
+    def created_between(self, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> "ClientQuery":
+        """created_at у [start, end); None — без межі."""
+        return replace(self, created_from=start, created_to=end)
+
+    def order_by(self, column: str, descending: bool = False) -> "ClientQuery":
+        if column not in ORDERABLE_COLUMNS:
+            raise ValueError(f"Сортування можливе лише за {', '.join(ORDERABLE_COLUMNS)}.")
+        return replace(self, order=column, descending=descending, cursor=None)
+
+    def limit(self, rows: Optional[int]) -> "ClientQuery":
+        if rows is not None and rows <= 0:
+            raise ValueError("limit має бути додатним.")
+        return replace(self, limit_rows=rows)
+
+    def after(self, cursor: Optional[tuple]) -> "ClientQuery":
+        """Наступна сторінка після cursor (значення з find_page / cursor_of)."""
+        return replace(self, cursor=cursor)
+
+    def cursor_of(self, client: ClientRecord) -> tuple:
+        """Keyset-курсор, що вказує на запис client."""
+        if self.order == "id":
+            return (client.id,)
+        return (getattr(client, self.order), client.id)
+
+    def to_sql(self):
+        """(sql, params) для psycopg2."""
+        conditions, params = [], []
+        if self.min_age is not None:
+            conditions.append("age >= %s")
+            params.append(self.min_age)
+        if self.max_age is not None:
+            conditions.append("age <= %s")
+            params.append(self.max_age)
+        if self.domain:
+            conditions.append(f"{EMAIL_DOMAIN_SQL} = %s")
+            params.append(self.domain)
+        if self.created_from is not None:
+            conditions.append("created_at >= %s")
+            params.append(self.created_from)
+        if self.created_to is not None:
+            conditions.append("created_at < %s")
+            params.append(self.created_to)
+        if self.order in NULLABLE_COLUMNS:
+            conditions.append(f"{self.order} IS NOT NULL")
+        if self.cursor is not None:
+            op = "<" if self.descending else ">"
+            if self.order == "id":
+                conditions.append(f"id {op} %s")
+            else:
+                conditions.append(f"({self.order}, id) {op} (%s, %s)")
+            params.extend(self.cursor)
+
+        direction = " DESC" if self.descending else ""
+        order_sql = f"{self.order}{direction}"
+        if self.order != "id":
+            order_sql += f", id{direction}"
+        sql = "SELECT id, name, email, age, created_at FROM clients"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_sql}"
+        if self.limit_rows is not None:
+            sql += " LIMIT %s"
+            params.append(self.limit_rows)
+        return sql + ";", params
+
+    def index_columns(self) -> tuple:
+        """
+        Стовпці індексу, який найкраще підходить запиту: спершу рівність
+        (домен), потім стовпець сортування з id, щоб індекс віддавав рядки
+        вже впорядкованими для LIMIT і курсора; якщо сортування за id
+        і рівності немає — перший діапазон. () — достатньо первинного ключа.
+        """
+        columns = [EMAIL_DOMAIN_SQL] if self.domain else []
+        if self.order != "id":
+            columns += [self.order, "id"]
+        elif columns:
+            columns.append("id")
+        elif self.min_age is not None or self.max_age is not None:
+            columns.append("age")
+        elif self.created_from is not None or self.created_to is not None:
+            columns.append("created_at")
+        return tuple(columns)
+
+    def describe(self) -> str:
+        parts = []
+        if self.min_age is not None or self.max_age is not None:
+            low = "" if self.min_age is None else self.min_age
+            high = "" if self.max_age is None else self.max_age
+            parts.append(f"вік {low}..{high}")
+        if self.domain:
+            parts.append(f"домен {self.domain}")
+        if self.created_from is not None or self.created_to is not None:
+            start = self.created_from.date() if self.created_from else ""
+            end = self.created_to.date() if self.created_to else ""
+            parts.append(f"created_at {start}..{end}")
+        parts.append(f"order {self.order}{' desc' if self.descending else ''}")
+        if self.limit_rows is not None:
+            parts.append(f"limit {self.limit_rows}")
+        if self.cursor is not None:
+            parts.append("після курсора")
+        return ", ".join(parts)
+
+
+def suggested_index_sql(columns: tuple) -> str:
+    """CREATE INDEX для стовпців / виразів з ClientQuery.index_columns()."""
+    names = ["domain" if c == EMAIL_DOMAIN_SQL else c for c in columns]
+    parts = [f"({c})" if c == EMAIL_DOMAIN_SQL else c for c in columns]
+    return (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS clients_{'_'.join(names)}_idx "
+            f"ON clients ({', '.join(parts)});")
+
+
+# ----------- DAO -----------
+
+# Скільки записів передається в одному багаторядковому операторі
+BULK_CHUNK_SIZE = 1000
+
+ISOLATION_LEVELS = ("READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE")
+
+# Лічильник для унікальних імен SAVEPOINT вкладених транзакцій
+_savepoint_seq = count(1)
+
+
+def _chunked(iterable, size):
+    """Розбиває ітерований об'єкт на списки довжиною не більше size."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ClientDAO:
+    """
+    DAO: окремий клас для доступу до даних.
+    Тільки SQL-операції, без бізнес-логіки.
+    """
+
+    def __init__(self, conn, cache: Optional[ClientCache] = None):
+        self.conn = conn
+        self.cache = cache
+        # глибина транзакцій, відкритих цим DAO (зовнішня + SAVEPOINT)
+        self._tx_depth = 0
+        # id, змінені в транзакції DAO; інвалідуються після її завершення
+        self._pending_invalidation: Optional[set] = None
+
+    def _invalidate(self, *client_ids):
+        if self.cache is None:
+            return
+        if self._pending_invalidation is not None:
+            # до COMMIT інший потік ще бачить старий рядок і міг би
+            # закешувати його вже після інвалідації
+            self._pending_invalidation.update(client_ids)
+        else:
+            self.cache.invalidate(*client_ids)
+
+    def get_all(self) -> List[ClientRecord]:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
+            rows = cur.fetchall()
+        return [ClientRecord.from_row(row) for row in rows]
+
+    def get_all_columnar(self, batch_size: int = ITER_BATCH_SIZE) -> ClientResultSet:
+        """
+        Усі клієнти як ClientResultSet. Рядки читаються серверним
+        курсором порціями, тож повний список кортежів теж не будується.
+        """
+        result = ClientResultSet()
+        with self._atomic():
+            with self.conn.cursor(name=f"clients_iter_{next(_cursor_seq)}") as cur:
+                cur.itersize = batch_size
+                cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    result.extend(rows)
+        return result
+
+    def iter_where(self, query: Optional[ClientQuery] = None,
+                   batch_size: int = ITER_BATCH_SIZE) -> Iterator[ClientRecord]:
+        """
+        Лінивий обхід клієнтів, що відповідають query (за замовчуванням —
+        усі), у порядку, заданому query (за замовчуванням — за id). SQL
+        будує ClientQuery.to_sql(), значення передаються лише параметрами.
+
+        Рядки читаються іменованим серверним курсором пакетами по
+        batch_size, тож у пам'яті одночасно не більше одного пакета,
+        а перший запис доступний одразу. Курсор живе в транзакції,
+        яка завершується, коли генератор вичерпано або закрито.
+
+        Поки генератор не завершено, DAO перебуває в цій транзакції:
+        get_by_id / find на тому ж DAO обходять кеш, а інвалідація кешу
+        після update / delete відкладається до кінця обходу. Для змін
+        під час обходу варто взяти окремий DAO з власним підключенням.
+        """
+        sql, params = (query or ClientQuery()).to_sql()
+        with self._atomic():
+            with self.conn.cursor(name=f"clients_iter_{next(_cursor_seq)}") as cur:
+                cur.itersize = batch_size
+                cur.execute(sql, params)
+                for row in cur:
+                    yield ClientRecord.from_row(row)
+
+    def iter_all(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[ClientRecord]:
+        """Лінивий обхід усіх клієнтів (див. iter_where)."""
+        return self.iter_where(batch_size=batch_size)
+
+    def get_by_id(self, client_id: int) -> Optional[ClientRecord]:
+        # у відкритій транзакції кеш не використовується: вона може бачити
+        # власні незафіксовані зміни, які не можна віддавати іншим
+        cache = self.cache if self.conn.autocommit else None
+        token = None
+        if cache is not None:
+            cached = cache.get(client_id)
+            if cached is not None:
+                return cached
+            token = cache.load_token()
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, name, email, age, created_at FROM clients WHERE id = %s;",
+                (client_id,),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        client = ClientRecord.from_row(row)
+        if cache is not None:
+            cache.put(client, token)
+        return client
+
+    def find(self, query: ClientQuery) -> List[ClientRecord]:
+        """Клієнти, що відповідають ClientQuery."""
+        sql, params = query.to_sql()
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        return [ClientRecord.from_row(row) for row in rows]
+
+    def find_page(self, query: ClientQuery):
+        """
+        Сторінка за ClientQuery з limit і курсор для наступної сторінки
+        (None, якщо сторінка остання): find_page(query.after(cursor)).
+        """
+        if query.limit_rows is None:
+            raise ValueError("find_page потребує query.limit(...).")
+        page = self.find(query)
+        cursor = query.cursor_of(page[-1]) if len(page) == query.limit_rows else None
+        return page, cursor
+
+    def get_page(self, after_id: int = 0, limit: int = 100) -> List[ClientRecord]:
+        """Сторінка з limit клієнтів з id > after_id (keyset-пагінація за id)."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, name, email, age, created_at FROM clients "
+                "WHERE id > %s ORDER BY id LIMIT %s;",
+                (after_id, limit),
+            )
+            rows = cur.fetchall()
+        return [ClientRecord.from_row(row) for row in rows]
+
+    def get_by_email(self, email: str) -> Optional[ClientRecord]:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, name, email, age, created_at FROM clients WHERE email = %s;",
+                (email,),
+            )
+            row = cur.fetchone()
+        return ClientRecord.from_row(row) if row else None
+
+    def insert(self, client: ClientRecord) -> ClientRecord:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO clients (name, email, age)
+                VALUES (%s, %s, %s)
+                RETURNING id, created_at;
+                """,
+                (client.name, client.email, client.age),
+            )
+            client.id, client.created_at = cur.fetchone()
+        client.mark_clean()
+        return client
+
+    def update(self, client: ClientRecord):
+        """UPDATE лише змінених полів; без змін запит не виконується."""
+        changes = client.changed_fields()
+        if not changes:
+            return
+        with self.conn.cursor() as cur:
+            _execute_prepared(
+                cur,
+                _update_sql(tuple(changes)),
+                [*changes.values(), client.id],
+            )
+        client.mark_clean()
+        self._invalidate(client.id)
+
+    def delete(self, client_id: int):
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM clients WHERE id = %s;", (client_id,))
+        self._invalidate(client_id)
+
+    # --- Транзакції ---
+
+    @contextmanager
+    def transaction(self, isolation_level: Optional[str] = None, read_only: bool = False):
+        """
+        Явна транзакція замість autocommit на кожен оператор:
+
+            with dao.transaction():
+                dao.insert(a)
+                dao.update(b)      # COMMIT один раз, при виході з блоку
+
+        Помилка всередині блоку відкочує всю транзакцію. Вкладений
+        transaction() (або виклик усередині iter_where / масової операції)
+        стає SAVEPOINT: його помилка відкочує лише зміни вкладеного блоку,
+        а зовнішня транзакція триває.
+
+        Зовнішній блок завершується COMMIT і на підключенні з вимкненим
+        autocommit — тоді фіксується й усе, що вже виконано на ньому до блоку.
+
+        isolation_level — "READ COMMITTED", "REPEATABLE READ" або
+        "SERIALIZABLE"; read_only=True забороняє зміни. Обидва параметри
+        діють лише для зовнішньої транзакції.
+        """
+        if isolation_level is not None and isolation_level.upper() not in ISOLATION_LEVELS:
+            raise ValueError(f"Невідомий рівень ізоляції: {isolation_level!r}")
+
+        if self._tx_depth:
+            if isolation_level is not None or read_only:
+                raise ValueError(
+                    "Рівень ізоляції та read_only задаються лише для зовнішньої транзакції."
+                )
+            savepoint = f"sp_{next(_savepoint_seq)}"
+            with self.conn.cursor() as cur:
+                cur.execute(f"SAVEPOINT {savepoint};")
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                with self.conn.cursor() as cur:
+                    cur.execute(f"ROLLBACK TO SAVEPOINT {savepoint};")
+                    cur.execute(f"RELEASE SAVEPOINT {savepoint};")
+                raise
+            finally:
+                self._tx_depth -= 1
+            with self.conn.cursor() as cur:
+                cur.execute(f"RELEASE SAVEPOINT {savepoint};")
+            return
+
+        modes = []
+        if isolation_level is not None:
+            modes.append(f"ISOLATION LEVEL {isolation_level.upper()}")
+        if read_only:
+            modes.append("READ ONLY")
+        if modes and not self.conn.autocommit \
+                and self.conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            raise ValueError(
+                "Рівень ізоляції та read_only задаються на початку транзакції, "
+                "а на підключенні вже виконувалися оператори без COMMIT."
+            )
+        with self._own_transaction():
+            if modes:
+                # має бути першим оператором транзакції
+                with self.conn.cursor() as cur:
+                    cur.execute(f"SET TRANSACTION {', '.join(modes)};")
+            yield self
+
+    # --- Масові операції ---
+
+    @contextmanager
+    def _own_transaction(self):
+        """
+        Транзакція, яку DAO відкриває й завершує сам (COMMIT або ROLLBACK).
+        autocommit на час блоку вимикається й потім відновлюється; записи
+        кешу, змінені в блоці, інвалідуються після завершення транзакції.
+        """
+        autocommit = self.conn.autocommit
+        if autocommit:
+            self.conn.autocommit = False
+        self._tx_depth += 1
+        self._pending_invalidation = set()
+        try:
+            yield
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._tx_depth -= 1
+            if autocommit:
+                self.conn.autocommit = True
+            pending, self._pending_invalidation = self._pending_invalidation, None
+            if pending:
+                self._invalidate(*pending)
+
+    @contextmanager
+    def _atomic(self):
+        """
+        Блок в одній транзакції. Підключення з get_connection працюють
+        в autocommit, тому для блоку відкривається власна транзакція DAO;
+        якщо транзакція вже відкрита (autocommit вимкнено), блок стає її частиною.
+        """
+        if not self.conn.autocommit:
+            yield
+            return
+        with self._own_transaction():
+            yield
+
+    def insert_many(self, clients: Iterable[ClientRecord],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Вставляє записи багаторядковим INSERT ... VALUES (execute_values),
+        один запит на порцію, все в одній транзакції. id та created_at
+        заповнюються в кожному переданому об'єкті. Повертає кількість записів.
+        """
+        total = 0
+        with self._atomic(), self.conn.cursor() as cur:
+            for chunk in _chunked(clients, chunk_size):
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO clients (name, email, age)
+                    VALUES %s
+                    RETURNING email, id, created_at;
+                    """,
+                    [(c.name, c.email, c.age) for c in chunk],
+                    page_size=len(chunk),
+                    fetch=True,
+                )
+                # email унікальний, тож зіставлення не залежить від порядку RETURNING
+                returned = {email: (cid, created_at) for email, cid, created_at in rows}
+                for client in chunk:
+                    client.id, client.created_at = returned[client.email]
+                    client.mark_clean()
+                total += len(chunk)
+        return total
+
+    def update_many(self, clients: Iterable[ClientRecord],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Оновлює записи через UPDATE ... FROM (VALUES ...), усі порції —
+        в одній транзакції. Записи без змін пропускаються, решта
+        групується за набором змінених полів: один оператор на групу
+        в порції, SET лише для цих полів. Повертає кількість змінених рядків.
+        """
+        total = 0
+        with self._atomic(), self.conn.cursor() as cur:
+            for chunk in _chunked(clients, chunk_size):
+                groups = {}
+                for client in chunk:
+                    if client.id is None:
+                        raise ValueError("update_many: у запису не встановлено id.")
+                    changes = client.changed_fields()
+                    if changes:
+                        groups.setdefault(tuple(changes), []).append(client)
+                for fields, group in groups.items():
+                    sql, template = _update_many_sql(fields)
+                    execute_values(
+                        cur,
+                        sql,
+                        [(c.id, *(getattr(c, name) for name in fields)) for c in group],
+                        template=template,
+                        page_size=len(group),
+                    )
+                    total += cur.rowcount
+                    for client in group:
+                        client.mark_clean()
+                    self._invalidate(*(c.id for c in group))
+        return total
+
+    def delete_many(self, clients: Iterable[Union[ClientRecord, int]],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Видаляє записи (об'єкти ClientRecord або id) через
+        DELETE ... WHERE id = ANY(...) в одній транзакції.
+        Повертає кількість видалених рядків.
+        """
+        ids = (c.id if isinstance(c, ClientRecord) else c for c in clients)
+        total = 0
+        with self._atomic(), self.conn.cursor() as cur:
+            for chunk in _chunked(ids, chunk_size):
+                cur.execute("DELETE FROM clients WHERE id = ANY(%s);", (chunk,))
+                total += cur.rowcount
+                self._invalidate(*chunk)
+        return total
+
+
+# ----------- Радник індексів -----------
+
+# Таблиця, менша за цю кількість рядків, читається повністю швидше за індекс
+SMALL_TABLE_ROWS = 10_000
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def advise_indexes(conn, queries: Iterable[ClientQuery], analyze: bool = False) -> dict:
+    """
+    Для кожного запиту будує план (EXPLAIN, з analyze=True — EXPLAIN ANALYZE)
+    і визначає, чи допоміг би індекс: у плані є Seq Scan по clients або
+    окреме сортування рядків. Разом зі статистикою pg_stat_user_tables
+    (кількість seq / index scan, рядків) та наявними індексами повертає
+    звіт із запропонованими CREATE INDEX.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT n_live_tup, seq_scan, seq_tup_read, coalesce(idx_scan, 0)
+            FROM pg_stat_user_tables WHERE relid = 'clients'::regclass;
+            """
+        )
+        row = cur.fetchone() or (0, 0, 0, 0)
+        table = dict(zip(("live_rows", "seq_scan", "seq_tup_read", "idx_scan"), row))
+        cur.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = 'clients' AND schemaname = current_schema() ORDER BY indexname;"
+        )
+        table["indexes"] = dict(cur.fetchall())
+
+        explain = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " if analyze else "EXPLAIN (FORMAT JSON) "
+        advice = []
+        for query in queries:
+            sql, params = query.to_sql()
+            cur.execute(explain + sql, params)
+            plan = cur.fetchone()[0][0]["Plan"]
+            nodes = list(_plan_nodes(plan))
+            seq_scan = any(n["Node Type"] == "Seq Scan" and n.get("Relation Name") == "clients"
+                           for n in nodes)
+            sort = any(n["Node Type"] in ("Sort", "Incremental Sort") for n in nodes)
+            columns = query.index_columns()
+            item = {
+                "query": query.describe(),
+                "sql": sql,
+                "plan": " -> ".join(n["Node Type"] for n in nodes),
+                "index_used": sorted({n["Index Name"] for n in nodes if "Index Name" in n}),
+                "total_cost": plan["Total Cost"],
+                "seq_scan": seq_scan,
+                "sort": sort,
+                "suggestion": None,
+            }
+            if analyze:
+                item["actual_ms"] = plan["Actual Total Time"]
+            if (seq_scan or sort) and columns:
+                item["suggestion"] = suggested_index_sql(columns)
+            advice.append(item)
+    return {"table": table, "queries": advice}
+
+
+def print_index_advice(report: dict):
+    table = report["table"]
+    print(f"\nclients: ~{table['live_rows']} рядків, seq scan: {table['seq_scan']} "
+          f"(прочитано {table['seq_tup_read']} рядків), index scan: {table['idx_scan']}")
+    print("Індекси: " + (", ".join(table["indexes"]) or "немає"))
+    if table["live_rows"] < SMALL_TABLE_ROWS:
+        print(f"Таблиця менша за {SMALL_TABLE_ROWS} рядків: Seq Scan для неї очікуваний, "
+              f"і індекси можуть не використовуватися.")
+    for item in report["queries"]:
+        print(f"\n- {item['query']}")
+        print(f"  план: {item['plan']} (cost {item['total_cost']:.1f}"
+              + (f", {item['actual_ms']:.3f} мс" if "actual_ms" in item else "") + ")")
+        if item["index_used"]:
+            print(f"  використано індекс: {', '.join(item['index_used'])}")
+        if item["suggestion"]:
+            reason = "Seq Scan" if item["seq_scan"] else "сортування рядків"
+            print(f"  {reason} -> варто створити індекс:\n    {item['suggestion']}")
+        else:
+            print("  індекс не потрібен")
+
+
+def sample_queries() -> List[ClientQuery]:
+    """Типові вибірки для радника (пункт меню 14)."""
+    month_ago = datetime.now().replace(microsecond=0) - timedelta(days=30)
+    return [
+        ClientQuery().age_between(25, 35).limit(50),
+        ClientQuery().email_domain("gmail.com").order_by("created_at", descending=True).limit(50),
+        ClientQuery().created_between(month_ago).order_by("created_at").limit(100),
+        ClientQuery().email_domain("ukr.net").age_between(18, 30).limit(50),
+        ClientQuery().order_by("age").limit(20),
+    ]
+
+
+def run_index_advisor():
+    conn = get_pool(ACTIVE_DB_CONFIG).getconn()
+    if conn is None:
+        return
+    try:
+        analyze = input("Виконати запити (EXPLAIN ANALYZE)? [т/н]: ").strip().lower() in ("т", "y")
+        print_index_advice(advise_indexes(conn, sample_queries(), analyze))
+    except Error as e:
+        print(f"Помилка радника індексів: {e}")
+    finally:
+        conn.close()
+
+
+# ----------- Unit of Work -----------
+
+class ClientSession:
+    """
+    Unit of Work та identity map для ClientRecord.
+
+    - get()/all() повертають той самий об'єкт для того самого id,
+      повторне звернення не йде в БД;
+    - зміни полів завантажених об'єктів відстежуються автоматично
+      (ClientRecord.changed_fields), у БД йдуть лише змінені поля;
+    - add() реєструє нові записи, delete() — видалені;
+    - flush() записує все масовими операціями DAO в одній транзакції.
+
+    Використання:
+        with ClientSession() as session:
+            c = session.get(1)
+            c.age += 1
+            session.add(ClientRecord(name="A", email="a@x.com"))
+        # при виході з блоку без помилок виконується flush()
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or ACTIVE_DB_CONFIG
+        self._identity = {}    # id -> ClientRecord
+        self._new = []
+        self._deleted = {}     # id -> ClientRecord
+
+    def _register(self, loaded: ClientRecord) -> ClientRecord:
+        """Повертає об'єкт з identity map або реєструє щойно завантажений."""
+        client = self._identity.get(loaded.id)
+        if client is None:
+            client = loaded
+            self._identity[client.id] = client
+        return client
+
+    @contextmanager
+    def _dao(self):
+        conn = get_pool(self.config).getconn()
+        if conn is None:
+            raise InterfaceError("Не вдалося отримати підключення до БД.")
+        try:
+            yield ClientDAO(conn, cache=get_cache(self.config))
+        finally:
+            conn.close()
+
+    def get(self, client_id: int) -> Optional[ClientRecord]:
+        if client_id in self._deleted:
+            return None
+        client = self._identity.get(client_id)
+        if client is not None:
+            return client
+        with self._dao() as dao:
+            loaded = dao.get_by_id(client_id)
+        if loaded is None:
+            return None
+        return self._register(loaded)
+
+    def all(self) -> List[ClientRecord]:
+        """
+        Усі клієнти з БД; вже відомі сесії об'єкти повертаються як є
+        (з незбереженими змінами), видалені в сесії — пропускаються.
+        """
+        with self._dao() as dao:
+            loaded = dao.get_all()
+        return [self._register(c) for c in loaded if c.id not in self._deleted]
+
+    def add(self, client: ClientRecord) -> ClientRecord:
+        """Реєструє новий запис (id ще немає) або приєднує існуючий до сесії."""
+        if client.id is None:
+            if not any(c is client for c in self._new):
+                self._new.append(client)
+            return client
+        known = self._identity.get(client.id)
+        if known is not None and known is not client:
+            raise ValueError(f"Сесія вже містить інший об'єкт з id={client.id}.")
+        if known is None:
+            self._identity[client.id] = client
+        return client
+
+    def delete(self, client: ClientRecord):
+        """Позначає запис для видалення (новий запис просто забувається)."""
+        if client.id is None:
+            self._new = [c for c in self._new if c is not client]
+            return
+        self._identity.pop(client.id, None)
+        self._deleted[client.id] = client
+
+    def dirty(self) -> List[ClientRecord]:
+        return [client for client in self._identity.values() if client.changed_fields()]
+
+    def flush(self):
+        """
+        Записує всі зміни в одній транзакції: спочатку DELETE
+        (щоб звільнити email), потім UPDATE, потім INSERT.
+        Повертає (видалено, оновлено, додано).
+        """
+        dirty = self.dirty()
+        if not (self._new or dirty or self._deleted):
+            return 0, 0, 0
+        originals = [(client, client._original) for client in dirty]
+        try:
+            with self._dao() as dao, dao.transaction():
+                deleted = dao.delete_many(list(self._deleted)) if self._deleted else 0
+                updated = dao.update_many(dirty) if dirty else 0
+                inserted = dao.insert_many(self._new) if self._new else 0
+        except BaseException:
+            # транзакцію відкочено: повертаємо об'єктам стан "не збережено"
+            for client in self._new:
+                client.id = client.created_at = None
+                client._original = None
+            for client, original in originals:
+                client._original = original
+            raise
+
+        for client in self._new:
+            self._identity[client.id] = client
+        self._new = []
+        self._deleted = {}
+        return deleted, updated, inserted
+
+    def clear(self):
+        """Забуває всі об'єкти та незбережені зміни."""
+        self._identity.clear()
+        self._new = []
+        self._deleted = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.clear()
+        return False
+
+
+# ----------- Шардинг -----------
+
+# Шарди за замовчуванням: порядок визначає номер шарду
+SHARD_CONFIGS = (LOCAL_DB_CONFIG, DOCKER_DB_CONFIG)
+
+# Шардована таблиця clients живе в окремій схемі: prepare_shards змінює її
+# послідовність id, і public.clients (меню, бенчмарки, lab9_dataset) це не зачіпає
+SHARD_SCHEMA = "lab9_shard"
+
+
+def shard_config(config: dict) -> dict:
+    """Конфігурація, у якій clients — це таблиця схеми lab9_shard."""
+    return dict(config, options=f"-c search_path={SHARD_SCHEMA}")
+
+
+def shard_for_email(email: str, shard_count: int) -> int:
+    """
+    Номер шарду для email. crc32 замість hash(), бо hash() рядків
+    відрізняється між запусками Python (PYTHONHASHSEED).
+    """
+    return zlib.crc32(email.strip().lower().encode("utf-8")) % shard_count
+
+
+def shard_for_id(client_id: int, shard_count: int) -> int:
+    """Номер шарду, закодований в id: шард k видає id, де (id - 1) % N == k."""
+    return (client_id - 1) % shard_count
+
+
+def prepare_shards(configs=SHARD_CONFIGS) -> bool:
+    """
+    Готує таблиці lab9_shard.clients у всіх шардах: створює схему й таблицю
+    і налаштовує її послідовність id так, щоб шард k видавав лише id з
+    (id - 1) % N == k (INCREMENT BY N, наступне значення — перше
+    відповідне після max(id)). Попереджає про рядки, id яких не відповідає
+    шарду. Повертає False, якщо якийсь шард недоступний.
+    """
+    shard_count = len(configs)
+    for index, config in enumerate(configs):
+        conn = get_connection(config)
+        if conn is None:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE SCHEMA IF NOT EXISTS {SHARD_SCHEMA};")
+        finally:
+            conn.close()
+        conn = get_connection(shard_config(config))
+        if conn is None:
+            return False
+        try:
+            init_db(conn)
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_get_serial_sequence('clients', 'id');")
+                sequence = cur.fetchone()[0]
+                cur.execute("SELECT coalesce(max(id), 0) FROM clients;")
+                max_id = cur.fetchone()[0]
+                next_id = max_id + 1 + (index - max_id) % shard_count
+                cur.execute(f"ALTER SEQUENCE {sequence} INCREMENT BY {shard_count};")
+                cur.execute("SELECT setval(%s, %s, false);", (sequence, next_id))
+                cur.execute(
+                    "SELECT count(*) FROM clients WHERE (id - 1) %% %s <> %s;",
+                    (shard_count, index),
+                )
+                misplaced = cur.fetchone()[0]
+        finally:
+            conn.close()
+        if misplaced:
+            print(f"Шард {index}: {misplaced} рядків не відповідають правилу "
+                  f"розподілу (дані, створені до шардингу).")
+    return True
+
 
-# Глобальна змінна для збереження активної конфігурації
-ACTIVE_DB_CONFIG = LOCAL_DB_CONFIG
+class ShardedClientDAO:
+    """
+    DAO поверх кількох незалежних БД. Новий клієнт потрапляє в шард
+    crc32(email) % N; номер шарду закодований у його id (див. prepare_shards),
+    тож get_by_id / update / delete йдуть одразу в потрібну БД без таблиці
+    маршрутизації. get_all / iter_all опитують усі шарди й зливають
+    відсортовані за id потоки. Дані лежать у схемі lab9_shard кожної БД.
 
+    Вставка перевіряє, що видані послідовністю id відповідають шарду;
+    якщо ні (prepare_shards не викликано або послідовність скинуто, як
+    TRUNCATE ... RESTART IDENTITY), вставку відкочено і піднято RuntimeError.
 
-def get_connection(config: dict):
-    """Повертає нове підключення до БД за вказаною конфігурацією."""
+    email є ключем шардингу, тому зміна email, що переносить клієнта
+    в інший шард, не підтримується (ValueError).
+    """
+
+    def __init__(self, configs=SHARD_CONFIGS):
+        self.configs = tuple(configs)
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.configs)
+
+    @contextmanager
+    def _shard(self, index: int):
+        config = shard_config(self.configs[index])
+        conn = get_pool(config).getconn()
+        if conn is None:
+            raise InterfaceError(f"Не вдалося підключитися до шарду {index}.")
+        try:
+            yield ClientDAO(conn, cache=get_cache(config))
+        finally:
+            conn.close()
+
+    def _shard_of(self, client: ClientRecord) -> int:
+        return shard_for_email(client.email, self.shard_count)
+
+    def get_by_id(self, client_id: int) -> Optional[ClientRecord]:
+        with self._shard(shard_for_id(client_id, self.shard_count)) as dao:
+            return dao.get_by_id(client_id)
+
+    def get_by_email(self, email: str) -> Optional[ClientRecord]:
+        with self._shard(shard_for_email(email, self.shard_count)) as dao:
+            return dao.get_by_email(email)
+
+    def _check_ids(self, index: int, clients: List[ClientRecord]):
+        """Піднімає RuntimeError, якщо шард видав id, що вказує на інший шард."""
+        wrong = [c.id for c in clients if shard_for_id(c.id, self.shard_count) != index]
+        if not wrong:
+            return
+        for client in clients:
+            client.id = None
+        raise RuntimeError(
+            f"Шард {index} видав id {wrong[0]}, що не відповідає правилу розподілу; "
+            f"вставку відкочено. Викличте prepare_shards()."
+        )
+
+    def insert(self, client: ClientRecord) -> ClientRecord:
+        index = self._shard_of(client)
+        with self._shard(index) as dao, dao.transaction():
+            dao.insert(client)
+            self._check_ids(index, [client])
+        return client
+
+    def insert_many(self, clients: Iterable[ClientRecord]) -> int:
+        """Групує записи за шардом; кожна група — одна транзакція свого шарду."""
+        groups = {}
+        for client in clients:
+            groups.setdefault(self._shard_of(client), []).append(client)
+        total = 0
+        for index, group in groups.items():
+            with self._shard(index) as dao, dao.transaction():
+                total += dao.insert_many(group)
+                self._check_ids(index, group)
+        return total
+
+    def update(self, client: ClientRecord):
+        index = shard_for_id(client.id, self.shard_count)
+        if self._shard_of(client) != index:
+            raise ValueError(
+                f"Новий email переносить клієнта id={client.id} в інший шард; "
+                f"видаліть запис і створіть новий."
+            )
+        with self._shard(index) as dao:
+            dao.update(client)
+
+    def delete(self, client_id: int):
+        with self._shard(shard_for_id(client_id, self.shard_count)) as dao:
+            dao.delete(client_id)
+
+    def iter_all(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[ClientRecord]:
+        """
+        Усі клієнти всіх шардів у порядку id: кожен шард читається
+        серверним курсором, потоки зливаються heapq.merge без
+        завантаження таблиць цілком.
+        """
+        with ExitStack() as stack:
+            streams = [
+                stack.enter_context(self._shard(index)).iter_all(batch_size)
+                for index in range(self.shard_count)
+            ]
+            try:
+                yield from heapq.merge(*streams, key=lambda c: c.id)
+            finally:
+                for stream in streams:
+                    stream.close()
+
+    def get_all(self) -> List[ClientRecord]:
+        return list(self.iter_all())
+
+    def distribution(self) -> List[int]:
+        """Кількість клієнтів у кожному шарді."""
+        counts = []
+        for index in range(self.shard_count):
+            with self._shard(index) as dao, dao.conn.cursor() as cur:
+                cur.execute("SELECT count(*) FROM clients;")
+                counts.append(cur.fetchone()[0])
+        return counts
+
+
+def manage_shards():
+    """Підготовка шардів (локальна + контейнерна БД) і розподіл клієнтів."""
+    if not prepare_shards():
+        print("Не всі шарди доступні.")
+        return
+    dao = ShardedClientDAO()
     try:
-        conn = psycopg2.connect(**config)
-        conn.autocommit = True
-        return conn
+        counts = dao.distribution()
     except Error as e:
-        print("Помилка підключення до бази даних:", e)
-        return None
+        print(f"Помилка шардингу: {e}")
+        return
+    for index, clients in enumerate(counts):
+        print(f"Шард {index} ({dao.configs[index]['port']}): {clients} клієнтів")
+    print(f"Усього: {sum(counts)}")
 
 
-def init_db(conn):
-    """Створення таблиці clients, якщо вона ще не існує."""
-    sql = """
-    CREATE TABLE IF NOT EXISTS clients (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        email VARCHAR(100) UNIQUE NOT NULL,
-        age INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
-    with conn.cursor() as cur:
-        cur.execute(sql)
-    print("Таблиця clients готова до роботи.")
+# ----------- Репліка clients у пам'яті -----------
 
+# Канал NOTIFY, у який тригер надсилає повний рядок кожної зміни
+REPLICA_CHANNEL = "clients_rows"
 
-# ----------- Active Record -----------
+# Тригер на рівні рядка: payload — JSON з операцією і новим рядком (або id
+# видаленого). clock_timestamp() робить payload унікальним: однакові
+# повідомлення в одній транзакції PostgreSQL інакше об'єднав би в одне.
+# created_at передається у фіксованому форматі REPLICA_TIME_FORMAT:
+# row_to_json відкидає кінцеві нулі дробової частини секунд, а такі рядки
+# datetime.fromisoformat до Python 3.11 не розбирає.
+REPLICA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 
-@dataclass
-class ClientRecord:
+REPLICA_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION clients_notify_row() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('{REPLICA_CHANNEL}',
+            json_build_object('op', TG_OP, 'at', clock_timestamp())::text);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('{REPLICA_CHANNEL}',
+            json_build_object('op', TG_OP, 'at', clock_timestamp(), 'id', OLD.id)::text);
+    ELSE
+        PERFORM pg_notify('{REPLICA_CHANNEL}',
+            json_build_object('op', TG_OP, 'at', clock_timestamp(),
+                              'old_id', CASE WHEN TG_OP = 'UPDATE' THEN OLD.id END,
+                              'row', json_build_object(
+                                  'id', NEW.id, 'name', NEW.name, 'email', NEW.email,
+                                  'age', NEW.age,
+                                  'created_at', to_char(NEW.created_at,
+                                                        'YYYY-MM-DD"T"HH24:MI:SS.US')))::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS clients_replica_rows ON clients;
+CREATE TRIGGER clients_replica_rows AFTER INSERT OR UPDATE OR DELETE ON clients
+    FOR EACH ROW EXECUTE FUNCTION clients_notify_row();
+
+DROP TRIGGER IF EXISTS clients_replica_truncate ON clients;
+CREATE TRIGGER clients_replica_truncate AFTER TRUNCATE ON clients
+    FOR EACH STATEMENT EXECUTE FUNCTION clients_notify_row();
+"""
+
+REPLICA_DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS clients_replica_rows ON clients;
+DROP TRIGGER IF EXISTS clients_replica_truncate ON clients;
+DROP FUNCTION IF EXISTS clients_notify_row();
+"""
+
+
+class ClientReplica:
     """
-    Active Record: клас = таблиця, об'єкт = рядок.
-    Вміє сам себе зберігати / видаляти у БД.
+    Повна копія таблиці clients у пам'яті процесу з індексами за email
+    та віком. Рядки зберігаються кортежами (id, name, email, age,
+    created_at), запити повертають нові ClientRecord.
+
+    Наповнюється одним потоковим читанням (bootstrap) і далі оновлюється
+    з payload-ів тригера на каналі clients_rows. bootstrap виконується в
+    потоці слухача вже після LISTEN, тож повідомлення, що надходять під
+    час читання, чекають у черзі підключення й застосовуються після нього
+    по порядку: зміни, зафіксовані під час bootstrap, не губляться, а
+    повторне застосування вже прочитаних змін нічого не змінює.
     """
-    id: Optional[int] = None
-    name: str = ""
-    email: str = ""
-    age: Optional[int] = None
-    created_at: Optional[str] = None
+
+    def __init__(self, config: dict, batch_size: int = ITER_BATCH_SIZE):
+        self.config = config
+        self.batch_size = batch_size
+        self._rows = {}          # id -> рядок
+        self._by_email = {}      # email -> id
+        self._by_age = {}        # вік -> set(id); NULL у індекс не потрапляє
+        self._ages = []          # відсортовані значення віку, що є в _by_age
+        self._lock = threading.RLock()
+        self.ready = threading.Event()
+        self.bootstraps = 0
+        self.bootstrap_seconds = 0.0
+        self.applied = 0
+
+    # --- індекси ---
 
     @staticmethod
-    def _get_conn():
-        """Отримати підключення до поточної активної БД."""
-        return get_connection(ACTIVE_DB_CONFIG)
+    def _index_row(rows, by_email, by_age, ages, row):
+        """Додає рядок у вказані структури (поточні індекси або нові в bootstrap)."""
+        client_id, _, email, age, _ = row
+        rows[client_id] = row
+        by_email[email] = client_id
+        if age is not None:
+            ids = by_age.get(age)
+            if ids is None:
+                ids = by_age[age] = set()
+                insort(ages, age)
+            ids.add(client_id)
 
-    @classmethod
-    def all(cls) -> List["ClientRecord"]:
-        conn = cls._get_conn()
-        if conn is None:
-            return []
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
-            rows = cur.fetchall()
-        conn.close()
-        return [cls(*row) for row in rows]
+    def _add(self, row):
+        self._index_row(self._rows, self._by_email, self._by_age, self._ages, row)
 
-    @classmethod
-    def find(cls, client_id: int) -> Optional["ClientRecord"]:
-        conn = cls._get_conn()
-        if conn is None:
-            return None
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, name, email, age, created_at FROM clients WHERE id = %s;",
-                (client_id,),
-            )
-            row = cur.fetchone()
-        conn.close()
-        if row:
-            return cls(*row)
-        return None
+    def _remove(self, client_id):
+        row = self._rows.pop(client_id, None)
+        if row is None:
+            return
+        _, _, email, age, _ = row
+        if self._by_email.get(email) == client_id:
+            del self._by_email[email]
+        if age is not None:
+            ids = self._by_age[age]
+            ids.discard(client_id)
+            if not ids:
+                del self._by_age[age]
+                del self._ages[bisect_left(self._ages, age)]
 
-    def save(self):
+    # --- наповнення та оновлення ---
+
+    def bootstrap(self):
         """
-        Якщо self.id порожній -> INSERT.
-        Якщо self.id заданий -> UPDATE.
+        (Пере)завантажує всю таблицю одним проходом серверного курсора.
+        Пакети fetchmany одразу розкладаються в нові індекси, тож окремого
+        списку всіх рядків немає; під блокуванням індекси лише підміняються.
+        Поки рядки читаються, запити обслуговує попередній вміст; при
+        помилці він і залишається.
         """
-        conn = self._get_conn()
+        started = time.perf_counter()
+        rows, by_email, by_age, ages = {}, {}, {}, []
+        conn = get_connection(self.config)
         if conn is None:
-            return
-        with conn.cursor() as cur:
-            if self.id is None:
-                cur.execute(
-                    """
-                    INSERT INTO clients (name, email, age)
-                    VALUES (%s, %s, %s)
-                    RETURNING id, created_at;
-                    """,
-                    (self.name, self.email, self.age),
-                )
-                self.id, self.created_at = cur.fetchone()
-                print(f"Створено клієнта з id={self.id}")
-            else:
-                cur.execute(
-                    """
-                    UPDATE clients
-                    SET name = %s, email = %s, age = %s
-                    WHERE id = %s;
-                    """,
-                    (self.name, self.email, self.age, self.id),
-                )
-                print(f"Оновлено клієнта з id={self.id}")
-        conn.close()
+            raise InterfaceError("Не вдалося підключитися для bootstrap репліки.")
+        try:
+            dao = ClientDAO(conn)
+            with dao._atomic(), conn.cursor(name=f"clients_replica_{next(_cursor_seq)}") as cur:
+                cur.itersize = self.batch_size
+                cur.execute("SELECT id, name, email, age, created_at FROM clients;")
+                while True:
+                    batch = cur.fetchmany(self.batch_size)
+                    if not batch:
+                        break
+                    for row in batch:
+                        self._index_row(rows, by_email, by_age, ages, row)
+        finally:
+            conn.close()
 
-    def delete(self):
-        """Видалити поточний запис з БД."""
-        if self.id is None:
-            print("Неможливо видалити: id не встановлено.")
-            return
-        conn = self._get_conn()
+        with self._lock:
+            self._rows, self._by_email, self._by_age, self._ages = rows, by_email, by_age, ages
+        self.bootstraps += 1
+        self.bootstrap_seconds = time.perf_counter() - started
+        self.ready.set()
+
+    def apply_notification(self, payload: str):
+        """Застосовує payload з каналу clients_rows."""
+        with self._lock:
+            self._apply(payload)
+
+    def _apply(self, payload: str):
+        change = json.loads(payload)
+        op = change["op"]
+        if op == "TRUNCATE":
+            self._rows, self._by_email, self._by_age, self._ages = {}, {}, {}, []
+        elif op == "DELETE":
+            self._remove(change["id"])
+        else:
+            data = change["row"]
+            created_at = data["created_at"]
+            row = (data["id"], data["name"], data["email"], data["age"],
+                   datetime.strptime(created_at, REPLICA_TIME_FORMAT) if created_at else None)
+            self._remove(change.get("old_id") or data["id"])
+            self._add(row)
+        self.applied += 1
+
+    # --- запити ---
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def sample_ids(self, n: int) -> List[int]:
+        """До n id клієнтів, що є в репліці (для вимірів і перевірок)."""
+        with self._lock:
+            return list(islice(self._rows, n))
+
+    def get_by_id(self, client_id: int) -> Optional[ClientRecord]:
+        with self._lock:
+            row = self._rows.get(client_id)
+        return ClientRecord.from_row(row) if row else None
+
+    def get_by_email(self, email: str) -> Optional[ClientRecord]:
+        with self._lock:
+            client_id = self._by_email.get(email)
+            row = self._rows.get(client_id) if client_id is not None else None
+        return ClientRecord.from_row(row) if row else None
+
+    def find_by_age(self, min_age: Optional[int] = None,
+                    max_age: Optional[int] = None) -> List[ClientRecord]:
+        """Клієнти з віком у [min_age, max_age], упорядковані за віком і id."""
+        with self._lock:
+            start = 0 if min_age is None else bisect_left(self._ages, min_age)
+            stop = len(self._ages) if max_age is None else bisect_right(self._ages, max_age)
+            rows = [self._rows[client_id]
+                    for age in self._ages[start:stop]
+                    for client_id in sorted(self._by_age[age])]
+        return [ClientRecord.from_row(row) for row in rows]
+
+    # --- перевірки ---
+
+    def verify(self, sample_size: int = 10) -> dict:
+        """
+        Порівнює репліку з БД потоковим читанням таблиці: рядки, яких
+        немає в репліці, зайві рядки та рядки з іншими значеннями (до
+        sample_size id кожного виду). Зміни, що відбуваються під час
+        перевірки, можуть дати тимчасові розбіжності — перевірку варто
+        повторити.
+        """
+        with self._lock:
+            snapshot = dict(self._rows)
+        missing, mismatched = [], []
+        db_rows = 0
+        conn = get_pool(self.config).getconn()
         if conn is None:
-            return
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM clients WHERE id = %s;", (self.id,))
+            raise InterfaceError("Не вдалося підключитися для перевірки репліки.")
+        try:
+            for client in ClientDAO(conn).iter_all(self.batch_size):
+                db_rows += 1
+                row = snapshot.pop(client.id, None)
+                if row is None:
+                    missing.append(client.id)
+                elif row != (client.id, client.name, client.email, client.age,
+                             client.created_at):
+                    mismatched.append(client.id)
+        finally:
+            conn.close()
+        return {
+            "consistent": not (missing or mismatched or snapshot),
+            "db_rows": db_rows,
+            "replica_rows": db_rows - len(missing) + len(snapshot),
+            "missing": len(missing),
+            "extra": len(snapshot),
+            "mismatched": len(mismatched),
+            "sample_missing": missing[:sample_size],
+            "sample_extra": sorted(snapshot)[:sample_size],
+            "sample_mismatched": mismatched[:sample_size],
+        }
+
+    def memory_usage(self) -> dict:
+        """
+        Оцінка пам'яті (sys.getsizeof) за складовими: рядки-кортежі з
+        їхніми значеннями та кожен з індексів. Значення, спільні з рядками
+        (email у ключах індексу), рахуються один раз.
+        """
+        with self._lock:
+            rows = sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+                       for row in self._rows.values())
+            by_id = sys.getsizeof(self._rows)
+            by_email = sys.getsizeof(self._by_email)
+            by_age = (sys.getsizeof(self._by_age) + sys.getsizeof(self._ages)
+                      + sum(sys.getsizeof(ids) for ids in self._by_age.values()))
+            total_rows = len(self._rows)
+        total = rows + by_id + by_email + by_age
+        return {
+            "rows": total_rows,
+            "row_bytes": rows,
+            "id_index_bytes": by_id,
+            "email_index_bytes": by_email,
+            "age_index_bytes": by_age,
+            "total_bytes": total,
+            "bytes_per_row": total / total_rows if total_rows else 0.0,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self),
+            "bootstraps": self.bootstraps,
+            "bootstrap_seconds": self.bootstrap_seconds,
+            "applied_changes": self.applied,
+        }
+
+
+def install_replica_notifications(conn):
+    """Встановлює (або оновлює) рядкові тригери NOTIFY для репліки."""
+    _execute_script(conn, REPLICA_TRIGGER_SQL)
+
+
+def uninstall_replica_notifications(conn):
+    """Видаляє рядкові тригери NOTIFY репліки та їхню функцію."""
+    _execute_script(conn, REPLICA_DROP_TRIGGERS_SQL)
+
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+
+def enable_replica(config: dict, timeout: float = 300.0) -> Optional[ClientReplica]:
+    """
+    Створює репліку clients для конфігурації: встановлює тригери,
+    запускає LISTEN (bootstrap виконується після кожного підключення
+    слухача) і чекає першого наповнення до timeout секунд.
+    """
+    key = tuple(sorted(config.items()))
+    with _replicas_lock:
+        if key in _replicas:
+            return _replicas[key][0]
+    conn = get_connection(config)
+    if conn is None:
+        return None
+    try:
+        install_replica_notifications(conn)
+    except Error as e:
+        print("Не вдалося встановити тригери NOTIFY:", e)
+        return None
+    finally:
         conn.close()
-        print(f"Клієнта з id={self.id} видалено.")
 
+    replica = ClientReplica(config)
+    listener = ChangeListener(config, REPLICA_CHANNEL,
+                              replica.apply_notification, replica.bootstrap)
+    listener.start()
+    if not replica.ready.wait(timeout):
+        listener.stop()
+        print("Репліка не встигла завантажитися.")
+        return None
+    with _replicas_lock:
+        _replicas[key] = (replica, listener)
+    return replica
 
-# ----------- DAO -----------
 
-class ClientDAO:
+def disable_replica(config: dict, drop_triggers: bool = True):
     """
-    DAO: окремий клас для доступу до даних.
-    Тільки SQL-операції, без бізнес-логіки.
+    Зупиняє слухача репліки конфігурації. Рядкові тригери додають NOTIFY
+    до кожної зміни clients, тому з drop_triggers=True вони видаляються;
+    drop_triggers=False — якщо репліки інших процесів ще ними користуються.
     """
+    with _replicas_lock:
+        entry = _replicas.pop(tuple(sorted(config.items())), None)
+    if entry is None:
+        return
+    entry[1].stop()
+    if not drop_triggers:
+        return
+    conn = get_connection(config)
+    if conn is None:
+        return
+    try:
+        uninstall_replica_notifications(conn)
+    except Error as e:
+        print("Не вдалося видалити тригери NOTIFY:", e)
+    finally:
+        conn.close()
 
-    def __init__(self, conn):
-        self.conn = conn
 
-    def get_all(self) -> List[ClientRecord]:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
-            rows = cur.fetchall()
-        return [ClientRecord(*row) for row in rows]
+def get_replica(config: dict) -> Optional[ClientReplica]:
+    entry = _replicas.get(tuple(sorted(config.items())))
+    return entry[0] if entry else None
 
-    def get_by_id(self, client_id: int) -> Optional[ClientRecord]:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, name, email, age, created_at FROM clients WHERE id = %s;",
-                (client_id,),
-            )
-            row = cur.fetchone()
-        return ClientRecord(*row) if row else None
 
-    def insert(self, client: ClientRecord) -> ClientRecord:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO clients (name, email, age)
-                VALUES (%s, %s, %s)
-                RETURNING id, created_at;
-                """,
-                (client.name, client.email, client.age),
-            )
-            client.id, client.created_at = cur.fetchone()
-        return client
+# ----------- Вимірювання часу запитів -----------
 
-    def update(self, client: ClientRecord):
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE clients
-                SET name = %s, email = %s, age = %s
-                WHERE id = %s;
-                """,
-                (client.name, client.email, client.age, client.id),
-            )
+def run_benchmarks():
+    """
+    Бенчмарк AR / DAO для обох БД (див. lab9_bench.py): прогрів, багато
+    повторень, p50/p95/p99 і JSON-звіт. Розміри та кількість повторень
+    задаються інтерактивно; повний набір параметрів — у CLI lab9_bench.py.
+    """
+    import lab9_bench
 
-    def delete(self, client_id: int):
-        with self.conn.cursor() as cur:
-            cur.execute("DELETE FROM clients WHERE id = %s;", (client_id,))
+    size = input("Розмір набору даних [1000]: ").strip()
+    iterations = input(f"Повторень на операцію [{lab9_bench.DEFAULT_ITERATIONS}]: ").strip()
+    if (size and not size.isdigit()) or (iterations and not iterations.isdigit()):
+        print("Потрібно ввести ціле число.")
+        return
+    iterations = int(iterations) if iterations else lab9_bench.DEFAULT_ITERATIONS
+    lab9_bench.run_suite(
+        sizes=(int(size) if size else 1000,),
+        iterations=iterations,
+        warmup=min(lab9_bench.DEFAULT_WARMUP, iterations),
+    )
 
 
-# ----------- Вимірювання часу запитів -----------
+def measure_pool_latency(config: dict, label: str, iterations: int = 200):
+    """
+    Затримка однієї операції (get_by_id) з новим підключенням на кожен
+    виклик (як було до пулу) та з підключенням з пулу.
+    """
+    import lab9_bench
 
-def measure_query_time(config: dict, label: str):
-    print(f"\nВимірювання часу SELECT для: {label}")
+    print(f"\nЗатримка операції з пулом і без для: {label} ({iterations} операцій)")
     conn = get_connection(config)
     if conn is None:
         return
-    # Переконаємось, що таблиця існує
     init_db(conn)
-    start = time.perf_counter()
     with conn.cursor() as cur:
-        cur.execute("SELECT * FROM clients;")
-        cur.fetchall()
-    duration = (time.perf_counter() - start) * 1000
+        cur.execute("SELECT id FROM clients ORDER BY id LIMIT 1;")
+        row = cur.fetchone()
     conn.close()
-    print(f"Час виконання SELECT: {duration:.2f} мс")
+    client_id = row[0] if row else 0
+
+    def direct():
+        c = get_connection(config)
+        if c is None:
+            raise RuntimeError("немає підключення")
+        try:
+            ClientDAO(c).get_by_id(client_id)
+        finally:
+            c.close()
+
+    pool = get_pool(config)
+
+    def pooled():
+        c = pool.getconn()
+        if c is None:
+            raise RuntimeError("немає підключення")
+        try:
+            ClientDAO(c).get_by_id(client_id)
+        finally:
+            c.close()
+
+    results = {}
+    try:
+        for name, op in (("без пулу", direct), ("з пулом", pooled)):
+            for _ in range(min(10, iterations)):
+                op()
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                op()
+                timings.append(time.perf_counter() - start)
+            # ті самі перцентилі, що й у звітах lab9_bench
+            results[name] = lab9_bench.latency_stats(timings)
+    except RuntimeError:
+        print("Вимірювання перервано: не вдалося отримати підключення.")
+        return
+
+    for name, st in results.items():
+        print(f"{name:10} середнє {st['mean_ms']:8.3f} мс, p50 {st['p50_ms']:8.3f} мс, "
+              f"p95 {st['p95_ms']:8.3f} мс")
+    speedup = results["без пулу"]["mean_ms"] / results["з пулом"]["mean_ms"]
+    print(f"Прискорення за рахунок пулу: {speedup:.1f}x")
+
+
+def measure_transaction_scopes(config: dict, label: str, count: int = 10_000):
+    """
+    Пропускна здатність count окремих INSERT: кожен у власній транзакції
+    (autocommit, COMMIT і fsync WAL на кожен рядок), усі в одній
+    dao.transaction(), і в одній транзакції з SAVEPOINT на кожен рядок.
+    Вставлені записи після кожного варіанта видаляються.
+    """
+    print(f"\n{count} INSERT з різними межами транзакцій для: {label}")
+    conn = get_pool(config).getconn()
+    if conn is None:
+        return
+    dao = ClientDAO(conn)
+    stamp = time.time_ns()
+
+    def autocommit(clients):
+        for client in clients:
+            dao.insert(client)
+
+    def single(clients):
+        with dao.transaction():
+            for client in clients:
+                dao.insert(client)
+
+    def savepoints(clients):
+        with dao.transaction():
+            for client in clients:
+                with dao.transaction():
+                    dao.insert(client)
+
+    results = {}
+    try:
+        for name, workflow in (("autocommit", autocommit), ("одна транзакція", single),
+                               ("savepoint на рядок", savepoints)):
+            clients = [
+                ClientRecord(name=f"Tx {i}", email=f"tx-{stamp}-{len(results)}-{i}@bench.example")
+                for i in range(count)
+            ]
+            start = time.perf_counter()
+            try:
+                workflow(clients)
+                elapsed = time.perf_counter() - start
+            finally:
+                dao.delete_many([c for c in clients if c.id is not None])
+            results[name] = count / elapsed
+    except Error as e:
+        print(f"Вимірювання перервано: {e}")
+        return
+    finally:
+        conn.close()
+
+    base = results["autocommit"]
+    for name, throughput in results.items():
+        print(f"{name:20} {throughput:10.1f} INSERT/с  ({throughput / base:.1f}x)")
+
+
+def manage_cache():
+    """Увімкнення / вимкнення кешу для активної БД та його лічильники."""
+    cache = get_cache(ACTIVE_DB_CONFIG)
+    if cache is None:
+        if input("Кеш вимкнено. Увімкнути? [т/н]: ").strip().lower() in ("т", "y"):
+            if enable_cache(ACTIVE_DB_CONFIG) is not None:
+                print("Кеш увімкнено (інвалідація через LISTEN/NOTIFY).")
+        return
+
+    for name, value in cache.stats().items():
+        shown = f"{value:.1%}" if name == "hit_ratio" else value
+        print(f"{name:14} {shown}")
+    if input("Вимкнути кеш? [т/н]: ").strip().lower() in ("т", "y"):
+        drop = input("Видалити тригери NOTIFY з clients (залиште, якщо кеш "
+                     "використовують інші процеси)? [т/н]: ").strip().lower() in ("т", "y")
+        disable_cache(ACTIVE_DB_CONFIG, drop_triggers=drop)
+        print("Кеш вимкнено.")
+
+
+def manage_replica(lookups: int = 10_000):
+    """Репліка clients у пам'яті для активної БД: статистика, затримка, перевірка."""
+    replica = get_replica(ACTIVE_DB_CONFIG)
+    if replica is None:
+        if input("Репліку вимкнено. Увімкнути? [т/н]: ").strip().lower() in ("т", "y"):
+            replica = enable_replica(ACTIVE_DB_CONFIG)
+            if replica is not None:
+                print(f"Репліку завантажено: {len(replica)} рядків за "
+                      f"{replica.bootstrap_seconds:.2f} с.")
+        return
+
+    for name, value in replica.stats().items():
+        print(f"{name:18} {value}")
+    memory = replica.memory_usage()
+    print(f"Пам'ять: {memory['total_bytes'] / 2**20:.1f} МБ, "
+          f"{memory['bytes_per_row']:.0f} байт/рядок (рядки {memory['row_bytes'] / 2**20:.1f} МБ, "
+          f"індекси id/email/вік {memory['id_index_bytes'] / 2**20:.1f}/"
+          f"{memory['email_index_bytes'] / 2**20:.1f}/{memory['age_index_bytes'] / 2**20:.1f} МБ)")
+
+    ids = replica.sample_ids(lookups)
+    if ids:
+        start = time.perf_counter()
+        for client_id in ids:
+            replica.get_by_id(client_id)
+        per_lookup = (time.perf_counter() - start) / len(ids) * 1e6
+        print(f"get_by_id з репліки: {per_lookup:.2f} мкс на запит")
+
+    if input("Перевірити узгодженість з БД? [т/н]: ").strip().lower() in ("т", "y"):
+        try:
+            report = replica.verify()
+        except Error as e:
+            print(f"Помилка перевірки: {e}")
+        else:
+            for name, value in report.items():
+                print(f"{name:18} {value}")
+    if input("Вимкнути репліку? [т/н]: ").strip().lower() in ("т", "y"):
+        drop = input("Видалити тригери NOTIFY з clients (залиште, якщо репліку "
+                     "використовують інші процеси)? [т/н]: ").strip().lower() in ("т", "y")
+        disable_replica(ACTIVE_DB_CONFIG, drop_triggers=drop)
+        print("Репліку вимкнено.")
 
 
 # ----------- Меню -----------
@@ -233,7 +2465,13 @@ def print_menu():
 7. Оновити клієнта (DAO)
 8. Видалити клієнта (DAO)
 
-9. Виміряти час SELECT для обох БД
+9. Бенчмарк операцій AR / DAO для обох БД
+10. Порівняти затримку операцій з пулом підключень і без
+11. Кеш клієнтів за id: увімкнути / вимкнути / статистика
+12. Шардинг: підготувати шарди та показати розподіл клієнтів
+13. Порівняти 10 000 INSERT: autocommit і явна транзакція
+14. Радник індексів для типових запитів за критеріями
+15. Репліка clients у пам'яті: увімкнути / статистика / перевірка
 0. Вихід
 """
     )
@@ -268,8 +2506,7 @@ def main():
 
         # --- Active Record ---
         if action == "1":
-            clients = ClientRecord.all()
-            for c in clients:
+            for c in ClientRecord.iter_all():
                 print(c)
 
         elif action == "2":
@@ -305,22 +2542,23 @@ def main():
 
         # --- DAO ---
         elif action == "5":
-            conn = get_connection(ACTIVE_DB_CONFIG)
+            conn = get_pool(ACTIVE_DB_CONFIG).getconn()
             if conn:
-                dao = ClientDAO(conn)
-                clients = dao.get_all()
-                for c in clients:
-                    print(c)
-                conn.close()
+                dao = ClientDAO(conn, cache=get_cache(ACTIVE_DB_CONFIG))
+                try:
+                    for c in dao.iter_all():
+                        print(c)
+                finally:
+                    conn.close()
 
         elif action == "6":
             name = input("Ім'я: ")
             email = input("Email: ")
             age = input("Вік (ціле число): ")
             age_val = int(age) if age else None
-            conn = get_connection(ACTIVE_DB_CONFIG)
+            conn = get_pool(ACTIVE_DB_CONFIG).getconn()
             if conn:
-                dao = ClientDAO(conn)
+                dao = ClientDAO(conn, cache=get_cache(ACTIVE_DB_CONFIG))
                 client = ClientRecord(name=name, email=email, age=age_val)
                 dao.insert(client)
                 conn.close()
@@ -328,9 +2566,9 @@ def main():
 
         elif action == "7":
             cid = int(input("ID клієнта для оновлення: "))
-            conn = get_connection(ACTIVE_DB_CONFIG)
+            conn = get_pool(ACTIVE_DB_CONFIG).getconn()
             if conn:
-                dao = ClientDAO(conn)
+                dao = ClientDAO(conn, cache=get_cache(ACTIVE_DB_CONFIG))
                 client = dao.get_by_id(cid)
                 if not client:
                     print("Клієнта не знайдено.")
@@ -348,19 +2586,39 @@ def main():
 
         elif action == "8":
             cid = int(input("ID клієнта для видалення: "))
-            conn = get_connection(ACTIVE_DB_CONFIG)
+            conn = get_pool(ACTIVE_DB_CONFIG).getconn()
             if conn:
-                dao = ClientDAO(conn)
+                dao = ClientDAO(conn, cache=get_cache(ACTIVE_DB_CONFIG))
                 dao.delete(cid)
                 conn.close()
                 print("Клієнта видалено (DAO).")
 
         # --- Вимірювання часу ---
         elif action == "9":
-            measure_query_time(LOCAL_DB_CONFIG, "Локальна БД")
-            measure_query_time(DOCKER_DB_CONFIG, "Контейнерна БД")
+            run_benchmarks()
+
+        elif action == "10":
+            measure_pool_latency(LOCAL_DB_CONFIG, "Локальна БД")
+            measure_pool_latency(DOCKER_DB_CONFIG, "Контейнерна БД")
+
+        elif action == "11":
+            manage_cache()
+
+        elif action == "12":
+            manage_shards()
+
+        elif action == "13":
+            measure_transaction_scopes(LOCAL_DB_CONFIG, "Локальна БД")
+            measure_transaction_scopes(DOCKER_DB_CONFIG, "Контейнерна БД")
+
+        elif action == "14":
+            run_index_advisor()
+
+        elif action == "15":
+            manage_replica()
 
         elif action == "0":
+            close_all_pools()
             print("Вихід...")
             break
         else:
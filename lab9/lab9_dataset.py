@@ -0,0 +1,253 @@
+"""
+Генератор синтетичних наборів даних clients для лабораторної №9.
+
+Створює N клієнтів з правдоподібними розподілами:
+  - ім'я та прізвище — з частотних списків (популярні імена трапляються частіше);
+  - email — транслітерація імені, номер клієнта й поштовий домен за частотою;
+  - вік — нормальний розподіл навколо 38 років, 18..90, ~3% без віку (NULL);
+  - created_at — за останні роки з ростом кількості реєстрацій ближче до кінця.
+
+Дані повністю визначаються seed: рядки генеруються порціями, і кожна
+порція має власний генератор випадкових чисел (seed, номер порції), тож
+результат не залежить ні від кількості паралельних завантажувачів, ні від
+порядку їх роботи. id задаються явно (1..N).
+
+Завантаження — COPY кількома процесами паралельно, потім ANALYZE.
+
+Запуск:
+    python lab9_dataset.py --config local --rows 5000000 --workers 4 --truncate
+    python lab9_dataset.py --rows 1000000 --checksum     # лише контрольна сума, без БД
+"""
+import argparse
+import hashlib
+import io
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from psycopg2 import InterfaceError
+
+import lab9_client as lab9
+
+CONFIGS = {
+    "local": lab9.LOCAL_DB_CONFIG,
+    "docker": lab9.DOCKER_DB_CONFIG,
+}
+
+CHUNK_ROWS = 100_000
+DEFAULT_WORKERS = max(1, min(4, multiprocessing.cpu_count()))
+
+# (ім'я, транслітерація, вага)
+FIRST_NAMES = [
+    ("Олександр", "oleksandr", 40), ("Андрій", "andrii", 34), ("Дмитро", "dmytro", 30),
+    ("Сергій", "serhii", 28), ("Максим", "maksym", 26), ("Іван", "ivan", 24),
+    ("Віталій", "vitalii", 14), ("Богдан", "bohdan", 16), ("Тарас", "taras", 10),
+    ("Юрій", "yurii", 15), ("Олег", "oleh", 13), ("Роман", "roman", 14),
+    ("Назар", "nazar", 9), ("Ярослав", "yaroslav", 11), ("Микола", "mykola", 12),
+    ("Олена", "olena", 36), ("Наталія", "nataliia", 30), ("Ірина", "iryna", 28),
+    ("Оксана", "oksana", 26), ("Анна", "anna", 25), ("Марія", "mariia", 24),
+    ("Тетяна", "tetiana", 22), ("Юлія", "yuliia", 20), ("Катерина", "kateryna", 19),
+    ("Світлана", "svitlana", 15), ("Вікторія", "viktoriia", 17), ("Софія", "sofiia", 14),
+    ("Дарина", "daryna", 10), ("Христина", "khrystyna", 9), ("Людмила", "liudmyla", 11),
+]
+
+LAST_NAMES = [
+    ("Мельник", "melnyk", 30), ("Шевченко", "shevchenko", 32), ("Коваленко", "kovalenko", 28),
+    ("Бондаренко", "bondarenko", 26), ("Бойко", "boiko", 24), ("Ткаченко", "tkachenko", 22),
+    ("Кравченко", "kravchenko", 21), ("Ковальчук", "kovalchuk", 20), ("Коваль", "koval", 19),
+    ("Олійник", "oliinyk", 18), ("Шевчук", "shevchuk", 17), ("Поліщук", "polishchuk", 16),
+    ("Бондар", "bondar", 15), ("Ткачук", "tkachuk", 14), ("Марченко", "marchenko", 14),
+    ("Лисенко", "lysenko", 13), ("Руденко", "rudenko", 13), ("Савченко", "savchenko", 12),
+    ("Петренко", "petrenko", 12), ("Мороз", "moroz", 11), ("Павленко", "pavlenko", 11),
+    ("Кузьменко", "kuzmenko", 10), ("Литвиненко", "lytvynenko", 10), ("Гончаренко", "honcharenko", 9),
+    ("Клименко", "klymenko", 9), ("Романенко", "romanenko", 8), ("Левченко", "levchenko", 8),
+    ("Василенко", "vasylenko", 7), ("Карпенко", "karpenko", 7), ("Семенко", "semenko", 6),
+]
+
+EMAIL_DOMAINS = [
+    ("gmail.com", 55), ("ukr.net", 20), ("i.ua", 6), ("outlook.com", 8),
+    ("yahoo.com", 4), ("meta.ua", 3), ("proton.me", 2), ("example.com", 2),
+]
+
+AGE_MEAN, AGE_STDDEV, AGE_MIN, AGE_MAX = 38.0, 13.0, 18, 90
+AGE_NULL_SHARE = 0.03
+
+CREATED_FROM = datetime(2019, 1, 1)
+CREATED_TO = datetime(2025, 1, 1)
+
+
+def _cumulative(items):
+    total, weights = 0, []
+    for item in items:
+        total += item[-1]
+        weights.append(total)
+    return weights
+
+
+_FIRST_CUM = _cumulative(FIRST_NAMES)
+_LAST_CUM = _cumulative(LAST_NAMES)
+_DOMAIN_CUM = _cumulative(EMAIL_DOMAINS)
+
+
+# ----------- Генерація -----------
+
+def chunk_rng(seed: int, chunk_index: int) -> random.Random:
+    """Генератор для порції: залежить лише від seed і номера порції."""
+    return random.Random(seed * 1_000_003 + chunk_index)
+
+
+def generate_chunk(seed: int, chunk_index: int, start_id: int, stop_id: int) -> str:
+    """
+    Рядки з id у [start_id, stop_id) у текстовому форматі COPY
+    (id, name, email, age, created_at; табуляція, NULL — \\N).
+    """
+    rng = chunk_rng(seed, chunk_index)
+    count = stop_id - start_id
+    # choices з k=count значно швидші за окремий виклик на кожен рядок
+    firsts = rng.choices(FIRST_NAMES, cum_weights=_FIRST_CUM, k=count)
+    lasts = rng.choices(LAST_NAMES, cum_weights=_LAST_CUM, k=count)
+    domains = rng.choices(EMAIL_DOMAINS, cum_weights=_DOMAIN_CUM, k=count)
+    span = int((CREATED_TO - CREATED_FROM).total_seconds())
+    gauss, random_ = rng.gauss, rng.random
+    buf = io.StringIO()
+    write = buf.write
+    for client_id, (first, first_lat, _), (last, last_lat, _), (domain, _) in zip(
+            range(start_id, stop_id), firsts, lasts, domains):
+        if random_() < AGE_NULL_SHARE:
+            age = "\\N"
+        else:
+            age = min(AGE_MAX, max(AGE_MIN, round(gauss(AGE_MEAN, AGE_STDDEV))))
+        # sqrt(u): щільність реєстрацій лінійно зростає до CREATED_TO
+        created = CREATED_FROM + timedelta(seconds=int(span * random_() ** 0.5))
+        write(f"{client_id}\t{first} {last}\t{first_lat}.{last_lat}{client_id}@{domain}"
+              f"\t{age}\t{created}\n")
+    return buf.getvalue()
+
+
+def iter_chunks(rows: int, chunk_rows: int = CHUNK_ROWS):
+    """(номер порції, перший id, id після останнього) для rows рядків."""
+    for index, start in enumerate(range(1, rows + 1, chunk_rows)):
+        yield index, start, min(start + chunk_rows, rows + 1)
+
+
+def dataset_checksum(rows: int, seed: int, chunk_rows: int = CHUNK_ROWS) -> str:
+    """SHA-256 згенерованих даних — для перевірки відтворюваності без БД."""
+    digest = hashlib.sha256()
+    for index, start, stop in iter_chunks(rows, chunk_rows):
+        digest.update(generate_chunk(seed, index, start, stop).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ----------- Завантаження -----------
+
+def _load_chunk(args):
+    """Генерує одну порцію й завантажує її через COPY (у робочому процесі)."""
+    config, seed, index, start, stop = args
+    conn = lab9.get_connection(config)
+    if conn is None:
+        raise InterfaceError("Не вдалося підключитися до БД.")
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                "COPY clients (id, name, email, age, created_at) FROM STDIN",
+                io.StringIO(generate_chunk(seed, index, start, stop)),
+            )
+    finally:
+        conn.close()
+    return stop - start
+
+
+def load_dataset(config: dict, rows: int, seed: int = 42, workers: int = DEFAULT_WORKERS,
+                 truncate: bool = False, chunk_rows: int = CHUNK_ROWS) -> bool:
+    """
+    Заповнює clients у БД config rows згенерованими рядками (id 1..rows),
+    виставляє послідовність id після max(id) і виконує ANALYZE.
+    Непорожня таблиця очищується лише з truncate=True, інакше повертається
+    False. Повертає False і без підключення до БД.
+    """
+    conn = lab9.get_connection(config)
+    if conn is None:
+        return False
+    try:
+        lab9.init_db(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM clients);")
+            if cur.fetchone()[0]:
+                if not truncate:
+                    print("Таблиця clients не порожня; використайте truncate, щоб очистити її.")
+                    return False
+                cur.execute("TRUNCATE clients RESTART IDENTITY;")
+
+        print(f"Завантаження {rows} клієнтів (seed={seed}, процесів: {workers})...")
+        started = time.perf_counter()
+        tasks = [(config, seed, index, start, stop)
+                 for index, start, stop in iter_chunks(rows, chunk_rows)]
+        loaded = 0
+        if workers == 1:
+            results = map(_load_chunk, tasks)
+        else:
+            pool = multiprocessing.Pool(workers)
+            results = pool.imap_unordered(_load_chunk, tasks)
+        try:
+            for count in results:
+                loaded += count
+                elapsed = time.perf_counter() - started
+                print(f"\r  {loaded}/{rows} рядків, {loaded / elapsed:,.0f} рядків/с",
+                      end="", flush=True)
+        finally:
+            if workers != 1:
+                pool.close()
+                pool.join()
+        print()
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT setval(pg_get_serial_sequence('clients', 'id'), "
+                "(SELECT max(id) FROM clients));"
+            )
+            cur.execute("ANALYZE clients;")
+        elapsed = time.perf_counter() - started
+        print(f"Готово за {elapsed:.1f} с ({rows / elapsed * 60:,.0f} рядків/хв).")
+    finally:
+        conn.close()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор синтетичних клієнтів (лаб. 9)")
+    parser.add_argument("--config", choices=sorted(CONFIGS), default="local")
+    parser.add_argument("--schema", help="схема для таблиці clients (за замовчуванням public)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="кількість паралельних процесів COPY")
+    parser.add_argument("--truncate", action="store_true",
+                        help="очистити непорожню таблицю перед завантаженням")
+    parser.add_argument("--checksum", action="store_true",
+                        help="лише надрукувати SHA-256 даних для seed, без БД")
+    args = parser.parse_args()
+
+    if args.rows <= 0 or args.workers <= 0:
+        parser.error("--rows і --workers мають бути додатними")
+
+    if args.checksum:
+        print(dataset_checksum(args.rows, args.seed))
+        return
+
+    config = CONFIGS[args.config]
+    if args.schema:
+        conn = lab9.get_connection(config)
+        if conn is None:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE SCHEMA IF NOT EXISTS {args.schema};")
+        finally:
+            conn.close()
+        config = dict(config, options=f"-c search_path={args.schema}")
+    load_dataset(config, args.rows, args.seed, args.workers, args.truncate)
+
+
+if __name__ == "__main__":
+    main()
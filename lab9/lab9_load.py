@@ -0,0 +1,376 @@
+"""
+Генератор навантаження зі змішаними операціями для DAO лабораторної №9.
+
+N робочих потоків (або процесів) протягом заданого часу чи заданої
+кількості операцій виконують випадкову суміш операцій ClientDAO:
+  find   — get_by_id випадкового клієнта;
+  page   — сторінка get_page після випадкового id;
+  insert — новий клієнт;
+  update — читання і зміна віку клієнта в одній транзакції;
+  delete — видалення клієнта, створеного цим же робочим потоком.
+
+Звіт: загальна та по-операційна пропускна здатність, p50/p95/p99
+затримки, помилки за типами, окремо збої серіалізації / deadlock-и
+(SQLSTATE 40001 / 40P01) та час очікування підключення з пулу.
+Дані — у схемі lab9_bench (як у lab9_bench.py), вставлені записи
+після запуску видаляються.
+
+Запуск:
+    python lab9_load.py --config local --workers 16 --duration 30
+    python lab9_load.py --config docker --workers 8 --mode process --ops 100000 \\
+        --mix find=60,page=10,insert=10,update=15,delete=5 --isolation serializable
+"""
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from psycopg2 import Error
+
+import lab9_client as lab9
+import lab9_bench
+
+OPERATIONS = ("find", "page", "insert", "update", "delete")
+DEFAULT_MIX = "find=50,page=15,insert=10,update=20,delete=5"
+DEFAULT_SIZE = 100_000
+DEFAULT_PAGE_SIZE = 50
+
+# SQLSTATE збоїв, після яких транзакцію варто повторити
+RETRYABLE_SQLSTATES = {"40001": "serialization_failure", "40P01": "deadlock_detected"}
+
+ISOLATION_LEVELS = {
+    "read_committed": "READ COMMITTED",
+    "repeatable_read": "REPEATABLE READ",
+    "serializable": "SERIALIZABLE",
+}
+
+
+def parse_mix(text: str) -> dict:
+    """'find=50,insert=10' -> {"find": 50.0, "insert": 10.0}."""
+    mix = {}
+    for part in text.split(","):
+        name, sep, weight = part.strip().partition("=")
+        if not sep or name not in OPERATIONS:
+            raise ValueError(f"Невідома операція в суміші: {part!r}")
+        mix[name] = float(weight)
+        if mix[name] < 0:
+            raise ValueError(f"Вага операції {name} не може бути від'ємною.")
+    if not any(mix.values()):
+        raise ValueError("Суміш операцій порожня.")
+    return mix
+
+
+# ----------- Робочий потік -----------
+
+class _Worker:
+    """
+    Виконує операції в циклі й накопичує виміри. Клієнти, створені
+    insert, використовуються операцією delete, а залишок видаляється
+    в cleanup(), тож набір даних після запуску не змінюється.
+    """
+
+    def __init__(self, worker_id, pool, settings):
+        self.worker_id = worker_id
+        self.pool = pool
+        self.settings = settings
+        self.rng = random.Random(settings["seed"] + worker_id)
+        self.names = list(settings["mix"])
+        self.weights = list(settings["mix"].values())
+        self.target_ids = settings["hot_ids"] or settings["size"]
+        self.created = []
+        self.counter = 0
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.conn_waits = []
+        self.errors = Counter()
+        self.retryable = Counter()
+
+    # --- операції ---
+
+    def _random_id(self):
+        return self.rng.randint(1, self.target_ids)
+
+    def _find(self, dao):
+        dao.get_by_id(self._random_id())
+
+    def _page(self, dao):
+        dao.get_page(self.rng.randint(0, self.settings["size"]), self.settings["page_size"])
+
+    def _insert(self, dao):
+        self.counter += 1
+        client = lab9.ClientRecord(
+            name=f"Load {self.worker_id}-{self.counter}",
+            email=f"load-{self.settings['run_tag']}-{self.worker_id}-{self.counter}"
+                  f"@bench.example",
+            age=self.rng.randint(18, 90),
+        )
+        self.created.append(dao.insert(client))
+
+    def _update(self, dao):
+        with dao.transaction(isolation_level=self.settings["isolation"]):
+            client = dao.get_by_id(self._random_id())
+            if client is not None:
+                client.age = (client.age or 0) % 90 + 1
+                dao.update(client)
+
+    def _delete(self, dao):
+        # зі списку — лише після успішного DELETE, інакше запис залишиться
+        # в таблиці після прибирання наприкінці прогону
+        dao.delete(self.created[-1].id)
+        self.created.pop()
+
+    # --- цикл ---
+
+    def run(self, deadline, max_ops):
+        ops = {
+            "find": self._find, "page": self._page, "insert": self._insert,
+            "update": self._update, "delete": self._delete,
+        }
+        done = 0
+        while (max_ops is None or done < max_ops) and time.perf_counter() < deadline:
+            name = self.rng.choices(self.names, self.weights)[0]
+            if name == "delete" and not self.created:
+                name = "insert"   # видаляти можна лише власні записи
+            done += 1
+
+            started = time.perf_counter()
+            conn = self.pool.getconn()
+            self.conn_waits.append(time.perf_counter() - started)
+            if conn is None:
+                self.errors["no_connection"] += 1
+                continue
+            try:
+                ops[name](lab9.ClientDAO(conn))
+                self.latencies[name].append(time.perf_counter() - started)
+            except Error as e:
+                reason = RETRYABLE_SQLSTATES.get(e.pgcode)
+                if reason:
+                    self.retryable[reason] += 1
+                else:
+                    self.errors[f"{name}: {type(e).__name__}"] += 1
+            finally:
+                conn.close()
+
+    def cleanup(self):
+        if not self.created:
+            return
+        conn = self.pool.getconn()
+        if conn is None:
+            return
+        try:
+            lab9.ClientDAO(conn).delete_many(self.created)
+            self.created = []
+        finally:
+            conn.close()
+
+    def result(self) -> dict:
+        return {
+            "latencies": self.latencies,
+            "conn_waits": self.conn_waits,
+            "errors": dict(self.errors),
+            "retryable": dict(self.retryable),
+        }
+
+
+def _worker_ops(settings, worker_id):
+    """Частка settings["ops"] для одного робочого потоку (None — без ліміту)."""
+    if settings["ops"] is None:
+        return None
+    share, extra = divmod(settings["ops"], settings["workers"])
+    return share + (1 if worker_id < extra else 0)
+
+
+def _process_main(args):
+    """Точка входу робочого процесу: власний пул на одне підключення."""
+    worker_id, settings, deadline_in = args
+    pool = lab9.ConnectionPool(settings["db_config"], min_size=1, max_size=1)
+    worker = _Worker(worker_id, pool, settings)
+    try:
+        worker.run(time.perf_counter() + deadline_in, _worker_ops(settings, worker_id))
+        worker.cleanup()
+    finally:
+        pool.close()
+    return worker.result()
+
+
+def run_threads(settings):
+    """Усі потоки ділять один пул розміром settings["pool_size"]."""
+    pool = lab9.ConnectionPool(settings["db_config"], min_size=1,
+                               max_size=settings["pool_size"])
+    workers = [_Worker(i, pool, settings) for i in range(settings["workers"])]
+    start = threading.Barrier(len(workers) + 1)
+    deadline = [None]
+
+    def target(worker):
+        start.wait()
+        try:
+            worker.run(deadline[0], _worker_ops(settings, worker.worker_id))
+        finally:
+            worker.cleanup()
+
+    threads = [threading.Thread(target=target, args=(w,), daemon=True) for w in workers]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + settings["duration"]
+    started = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pool_stats = pool.stats()
+    pool.close()
+    return [w.result() for w in workers], elapsed, pool_stats
+
+
+def run_processes(settings):
+    """Кожен процес має власне підключення; пул між процесами не спільний."""
+    args = [(i, settings, settings["duration"]) for i in range(settings["workers"])]
+    started = time.perf_counter()
+    with multiprocessing.Pool(settings["workers"]) as processes:
+        results = processes.map(_process_main, args)
+    return results, time.perf_counter() - started, None
+
+
+# ----------- Звіт -----------
+
+def summarize(results, elapsed, pool_stats, settings) -> dict:
+    latencies = {name: [] for name in OPERATIONS}
+    waits = []
+    errors, retryable = Counter(), Counter()
+    for result in results:
+        for name, timings in result["latencies"].items():
+            latencies[name].extend(timings)
+        waits.extend(result["conn_waits"])
+        errors.update(result["errors"])
+        retryable.update(result["retryable"])
+
+    completed = sum(len(t) for t in latencies.values())
+    wait_stats = lab9_bench.latency_stats(waits, elapsed)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "settings": {k: v for k, v in settings.items() if k != "db_config"},
+        "elapsed_s": elapsed,
+        "completed_ops": completed,
+        "throughput_ops_s": completed / elapsed if elapsed else 0.0,
+        "operations": {
+            name: lab9_bench.latency_stats(timings, elapsed)
+            for name, timings in latencies.items() if timings
+        },
+        "errors": dict(errors),
+        "retryable_failures": dict(retryable),
+        "conn_wait": {
+            "mean_ms": wait_stats["mean_ms"],
+            "p95_ms": wait_stats["p95_ms"],
+            "p99_ms": wait_stats["p99_ms"],
+            "max_ms": wait_stats["max_ms"],
+            "total_s": sum(waits),
+        },
+        "pool": pool_stats,
+    }
+
+
+def print_report(report):
+    s = report["settings"]
+    print(f"\n=== {s['config']} | {s['workers']} {s['mode']} | "
+          f"{report['elapsed_s']:.1f} с | ізоляція {s['isolation']} ===")
+    print(f"Виконано операцій: {report['completed_ops']}, "
+          f"{report['throughput_ops_s']:.1f} оп/с")
+    print(f"{'операція':10} {'к-сть':>8} {'оп/с':>9} {'p50 мс':>9} {'p95 мс':>9} {'p99 мс':>9}")
+    print("-" * 58)
+    for name, st in report["operations"].items():
+        print(f"{name:10} {st['iterations']:8} {st['throughput_ops_s']:9.1f} "
+              f"{st['p50_ms']:9.3f} {st['p95_ms']:9.3f} {st['p99_ms']:9.3f}")
+    wait = report["conn_wait"]
+    print(f"Очікування підключення: середнє {wait['mean_ms']:.3f} мс, "
+          f"p95 {wait['p95_ms']:.3f} мс, max {wait['max_ms']:.3f} мс, "
+          f"усього {wait['total_s']:.2f} с")
+    failures = sum(report["retryable_failures"].values())
+    print(f"Збої серіалізації / deadlock: {failures} {report['retryable_failures'] or ''}")
+    print(f"Інші помилки: {sum(report['errors'].values())} {report['errors'] or ''}")
+
+
+def run_load(config_name="local", workers=8, mode="thread", duration=None, ops=None,
+             mix=DEFAULT_MIX, size=DEFAULT_SIZE, hot_ids=None, page_size=DEFAULT_PAGE_SIZE,
+             isolation="read_committed", pool_size=None, seed=42, output=None):
+    """
+    Запускає навантаження й повертає звіт. Потрібно задати duration
+    (секунди) та/або ops (загальна кількість операцій).
+    """
+    config = lab9_bench.CONFIGS[config_name]
+    if not lab9_bench.seed_dataset(config, size, seed):
+        print(f"Немає підключення до {config_name}.")
+        return None
+
+    settings = {
+        "config": config_name,
+        "db_config": lab9_bench.bench_config(config),
+        "workers": workers,
+        "mode": mode,
+        "duration": duration if duration is not None else float("inf"),
+        "ops": ops,
+        "mix": parse_mix(mix),
+        "size": size,
+        "hot_ids": hot_ids,
+        "page_size": page_size,
+        "isolation": ISOLATION_LEVELS[isolation],
+        "pool_size": pool_size or workers,
+        "seed": seed,
+        "run_tag": time.time_ns(),
+    }
+    runner = run_processes if mode == "process" else run_threads
+    results, elapsed, pool_stats = runner(settings)
+    settings["duration"] = duration
+    report = summarize(results, elapsed, pool_stats, settings)
+    print_report(report)
+
+    lab9_bench.write_report(report, "lab9_load", output)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор навантаження для DAO (лаб. 9)")
+    parser.add_argument("--config", choices=sorted(lab9_bench.CONFIGS), default="local")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--duration", type=float, help="тривалість у секундах")
+    parser.add_argument("--ops", type=int, help="загальна кількість операцій")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"ваги операцій (за замовчуванням {DEFAULT_MIX})")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="розмір набору даних у lab9_bench.clients")
+    parser.add_argument("--hot-ids", type=int,
+                        help="find/update лише для перших N id (конкуренція за рядки)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--isolation", choices=sorted(ISOLATION_LEVELS),
+                        default="read_committed", help="рівень ізоляції для update")
+    parser.add_argument("--pool-size", type=int,
+                        help="розмір спільного пулу в режимі thread (за замовчуванням = workers)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл JSON (за замовчуванням bench_results/...)")
+    args = parser.parse_args()
+
+    if args.duration is None and args.ops is None:
+        parser.error("потрібно задати --duration та/або --ops")
+    if args.workers <= 0 or args.size <= 0 or args.page_size <= 0 \
+            or (args.duration is not None and args.duration <= 0) \
+            or (args.ops is not None and args.ops <= 0) \
+            or (args.hot_ids is not None and not 0 < args.hot_ids <= args.size) \
+            or (args.pool_size is not None and args.pool_size <= 0):
+        parser.error("числові параметри мають бути додатними (--hot-ids не більше --size)")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        run_load(args.config, args.workers, args.mode, args.duration, args.ops, args.mix,
+                 args.size, args.hot_ids, args.page_size, args.isolation, args.pool_size,
+                 args.seed, args.output)
+    finally:
+        lab9.close_all_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Бенчмарк пам'яті для представлень результату запиту до clients (лаб. 9).
+
+Порівнюються три способи тримати в пам'яті N рядків:
+  - dict_dataclass — попередній ClientRecord: звичайний @dataclass з __dict__
+    на кожен об'єкт і словником-знімком для відстеження змін;
+  - slotted_record — поточний ClientRecord (__slots__, знімок-кортеж);
+  - columnar       — ClientResultSet: колонки без об'єкта на кожен рядок.
+
+Для кожного представлення вимірюються час побудови з готових кортежів
+(як їх повертає fetchall) та пам'ять, яку займає сама структура після
+звільнення кортежів (tracemalloc), у байтах на рядок. Значення полів
+(рядки, дати) спільні для всіх представлень і в цю оцінку не входять.
+Рядки за замовчуванням синтетичні; з --config вони читаються з таблиці
+схеми lab9_bench.
+
+Запуск:
+    python lab9_memory.py --rows 1000000
+    python lab9_memory.py --rows 1000000 --config docker
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+import lab9_client as lab9
+import lab9_bench
+
+DEFAULT_ROWS = 1_000_000
+
+
+@dataclass
+class DictClientRecord:
+    """Копія попереднього ClientRecord — база для порівняння."""
+    id: Optional[int] = None
+    name: str = ""
+    email: str = ""
+    age: Optional[int] = None
+    created_at: Optional[str] = None
+    _original: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_row(cls, row):
+        client = cls(*row)
+        client._original = {name: getattr(client, name) for name in lab9.TRACKED_FIELDS}
+        return client
+
+
+def build_dict_records(rows):
+    return [DictClientRecord.from_row(row) for row in rows]
+
+
+def build_slotted_records(rows):
+    return [lab9.ClientRecord.from_row(row) for row in rows]
+
+
+REPRESENTATIONS = {
+    "dict_dataclass": build_dict_records,
+    "slotted_record": build_slotted_records,
+    "columnar": lab9.ClientResultSet,
+}
+
+
+# ----------- Джерела рядків -----------
+
+def synthetic_rows(count: int, seed: int = 42):
+    """count кортежів (id, name, email, age, created_at) з новими рядками й датами."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        (i, f"Client {i}", f"client{i}@bench.example",
+         rng.randint(18, 90) if rng.random() > 0.05 else None,
+         start + timedelta(seconds=rng.randint(0, 365 * 24 * 3600)))
+        for i in range(1, count + 1)
+    ]
+
+
+def database_rows(config_name: str, count: int):
+    """Рядки з lab9_bench.clients (таблиця заповнюється за потреби)."""
+    config = lab9_bench.CONFIGS[config_name]
+    if not lab9_bench.seed_dataset(config, count):
+        raise SystemExit(f"Немає підключення до {config_name}.")
+    conn = lab9.get_connection(lab9_bench.bench_config(config))
+    if conn is None:
+        raise SystemExit(f"Немає підключення до {config_name}.")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, name, email, age, created_at FROM clients ORDER BY id;")
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+# ----------- Виміри -----------
+
+def measure_representation(build, make_rows, count):
+    """
+    Повертає час побудови (без tracemalloc, який сповільнює код) та
+    пам'ять, виділену під структуру результату.
+    """
+    rows = make_rows()
+    gc.collect()
+    started = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - started
+    del result, rows
+    gc.collect()
+
+    rows = make_rows()
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = build(rows)
+    del rows
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+
+    return {
+        "build_seconds": elapsed,
+        "build_ns_per_row": elapsed / count * 1e9,
+        "retained_bytes": retained - baseline,
+        "bytes_per_row": (retained - baseline) / count,
+    }
+
+
+def run(count=DEFAULT_ROWS, config_name=None, seed=42, output=None):
+    if config_name:
+        fetched = database_rows(config_name, count)
+        count = len(fetched)
+
+        def make_rows():
+            # кожен вимір отримує нові кортежі, тож рядки звільняються разом з ними
+            return [tuple(row) for row in fetched]
+    else:
+        def make_rows():
+            return synthetic_rows(count, seed)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "rows": count,
+        "source": config_name or "synthetic",
+        "seed": seed,
+        "results": {},
+    }
+    for name, build in REPRESENTATIONS.items():
+        print(f"Вимірювання {name}...")
+        report["results"][name] = measure_representation(build, make_rows, count)
+
+    base = report["results"]["dict_dataclass"]["bytes_per_row"]
+    print(f"\n=== {count} рядків ({report['source']}) ===")
+    print(f"{'представлення':16} {'байт/рядок':>11} {'нс/рядок':>9} {'від бази':>9}")
+    print("-" * 48)
+    for name, st in report["results"].items():
+        print(f"{name:16} {st['bytes_per_row']:11.1f} {st['build_ns_per_row']:9.1f} "
+              f"{st['bytes_per_row'] / base:9.0%}")
+
+    lab9_bench.write_report(report, "lab9_memory", output)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пам'яті ClientRecord (лаб. 9)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--config", choices=["local", "docker"],
+                        help="читати рядки з БД замість синтетичних")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл JSON (за замовчуванням bench_results/...)")
+    args = parser.parse_args()
+    if args.rows <= 0:
+        parser.error("--rows має бути додатним")
+    try:
+        run(args.rows, args.config, args.seed, args.output)
+    finally:
+        lab9.close_all_pools()
+
+
+if __name__ == "__main__":
+    main()